@@ -0,0 +1,45 @@
+"""
+Throughput of RecordsManager.bulk_create against a local stand-in server with artificial latency for different
+batch sizes and concurrency, compared with a single request of all records.
+
+Usage: python benchmarks/bench_bulk_batches.py [records_count] [latency_ms]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stand_in import StandInServer, silence_client_logging  # noqa: E402
+from custodian.client import Client  # noqa: E402
+from custodian.objects import Object  # noqa: E402
+from custodian.objects.fields import IntegerField, StringField  # noqa: E402
+from custodian.records.model import Record  # noqa: E402
+
+
+def make_object():
+    return Object(name='person', key='id', cas=False, objects_manager=None, fields=[
+        IntegerField(name='id', optional=True), StringField(name='name')
+    ])
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.05
+    silence_client_logging()
+    obj = make_object()
+    records = [Record(obj, name='Person {}'.format(i)) for i in range(count)]
+    # the stand-in server does not see the body, so it responds without records and records are left as sent
+    with StandInServer(lambda method, path, query: {'status': 'OK', 'data': []}, latency=latency) as server, \
+            Client(server.url, pool_size=16) as client:
+        print('records: {}, latency: {:.0f} ms'.format(count, latency * 1000))
+        for batch_size, concurrency in ((None, 1), (1000, 1), (1000, 4), (1000, 16), (5000, 4)):
+            started = time.perf_counter()
+            client.records.bulk_create(*records, batch_size=batch_size, concurrency=concurrency)
+            print('batch_size {:>5} concurrency {:2} {:8.3f} s'.format(
+                batch_size or 'all', concurrency, time.perf_counter() - started
+            ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Requests/sec of `Client.execute` against a local stand-in server, with pooled keep-alive connections and with a
+fresh connection per request (the previous behaviour of calling the module-level `requests` functions).
+
+Usage: python benchmarks/bench_connection_pool.py [requests_count]
+"""
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stand_in import StandInServer, silence_client_logging  # noqa: E402
+from custodian.client import Client  # noqa: E402
+from custodian.command import Command, COMMAND_METHOD  # noqa: E402
+
+
+def respond(method, path, query):
+    return {'status': 'OK', 'data': {'id': 1, 'name': 'Ivan', 'age': 20.0}}
+
+
+def bench_pooled(url, count):
+    with Client(url, prewarm=1) as client:
+        command = Command(name='data/single/person/1', method=COMMAND_METHOD.GET)
+        started = time.perf_counter()
+        for _ in range(count):
+            client.execute(command)
+        return count / (time.perf_counter() - started)
+
+
+def bench_unpooled(url, count):
+    started = time.perf_counter()
+    for _ in range(count):
+        requests.get('/'.join([url, 'data/single/person/1']), params='').json()
+    return count / (time.perf_counter() - started)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    silence_client_logging()
+    with StandInServer(respond) as server:
+        unpooled = bench_unpooled(server.url, count)
+        pooled = bench_pooled(server.url, count)
+    print('requests: {}'.format(count))
+    print('without pooling: {:10.1f} req/s'.format(unpooled))
+    print('with pooling:    {:10.1f} req/s ({:.2f}x)'.format(pooled, pooled / unpooled))
+
+
+if __name__ == '__main__':
+    main()
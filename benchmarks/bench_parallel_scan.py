@@ -0,0 +1,79 @@
+"""
+Throughput of Query.parallel_scan against a local stand-in server with artificial latency, for a growing number of
+workers, compared with a sequential Query.iterator.
+
+Usage: python benchmarks/bench_parallel_scan.py [records_count] [latency_ms]
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stand_in import StandInServer, silence_client_logging  # noqa: E402
+from custodian.client import Client  # noqa: E402
+from custodian.objects import Object  # noqa: E402
+from custodian.objects.fields import IntegerField, StringField, NumberField  # noqa: E402
+
+CHUNK_SIZE = 500
+
+
+def make_object():
+    return Object(name='person', key='id', cas=False, objects_manager=None, fields=[
+        IntegerField(name='id'), StringField(name='name'), NumberField(name='age')
+    ])
+
+
+def make_responder(count):
+    records_data = [{'id': i, 'name': 'Person {}'.format(i), 'age': 20 + i % 50} for i in range(1, count + 1)]
+
+    def respond(method, path, query):
+        query_string = query.get('q', [''])[0]
+        lower, upper = 1, count
+        for operator, value in re.findall(r'(ge|gt|lt|le)\(id,(\d+)\)', query_string):
+            value = int(value)
+            if operator == 'ge':
+                lower = max(lower, value)
+            elif operator == 'gt':
+                lower = max(lower, value + 1)
+            elif operator == 'lt':
+                upper = min(upper, value - 1)
+            else:
+                upper = min(upper, value)
+        selected = records_data[lower - 1:upper]
+        if 'sort(-id)' in query_string:
+            selected = selected[::-1]
+        offset, limit = map(int, re.search(r'limit\((\d+),(\d+)\)', query_string).groups())
+        return {'status': 'OK', 'data': selected[offset:offset + limit]}
+
+    return respond
+
+
+def measure(records):
+    started = time.perf_counter()
+    count = sum(1 for _ in records)
+    return count, count / (time.perf_counter() - started)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.05
+    silence_client_logging()
+    obj = make_object()
+    with StandInServer(make_responder(count), latency=latency) as server, \
+            Client(server.url, pool_size=16) as client:
+        query = client.records.query(obj)
+        print('records: {}, latency: {:.0f} ms, chunk size: {}'.format(count, latency * 1000, CHUNK_SIZE))
+        rows, speed = measure(query.iterator(chunk_size=CHUNK_SIZE, keyset=True))
+        print('sequential iterator       {:7} rows {:10.0f} rows/s'.format(rows, speed))
+        for workers in (1, 2, 4, 8, 16):
+            for ordered in (False, True):
+                rows, speed = measure(query.parallel_scan(workers=workers, chunk_size=CHUNK_SIZE, ordered=ordered))
+                print('parallel_scan({:2}, {:9}) {:7} rows {:10.0f} rows/s'.format(
+                    workers, 'ordered' if ordered else 'unordered', rows, speed
+                ))
+
+
+if __name__ == '__main__':
+    main()
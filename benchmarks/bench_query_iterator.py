@@ -0,0 +1,76 @@
+"""
+Time to first row and peak memory of iterating a large query result: a single bulk response compared with
+Query.iterator walking the result in pages.
+
+Usage: python benchmarks/bench_query_iterator.py [records_count] [chunk_size]
+"""
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stand_in import StandInServer, silence_client_logging  # noqa: E402
+from custodian.client import Client  # noqa: E402
+from custodian.objects import Object  # noqa: E402
+from custodian.objects.fields import IntegerField, StringField, NumberField  # noqa: E402
+
+
+def make_object():
+    return Object(name='person', key='id', cas=False, objects_manager=None, fields=[
+        IntegerField(name='id'), StringField(name='name'), NumberField(name='age'), StringField(name='email')
+    ])
+
+
+def make_responder(count):
+    records_data = [{
+        'id': i, 'name': 'Person {}'.format(i), 'age': 20 + i % 50, 'email': 'person{}@example.com'.format(i)
+    } for i in range(count)]
+
+    def respond(method, path, query):
+        match = re.search(r'limit\((\d+),(\d+)\)', query.get('q', [''])[0])
+        if match is None:
+            return {'status': 'OK', 'data': records_data}
+        offset, limit = map(int, match.groups())
+        return {'status': 'OK', 'data': records_data[offset:offset + limit]}
+
+    return respond
+
+
+def measure(get_records):
+    tracemalloc.start()
+    started = time.perf_counter()
+    first_row = None
+    count = 0
+    for _ in get_records():
+        if first_row is None:
+            first_row = time.perf_counter() - started
+        count += 1
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, first_row, elapsed, peak
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    silence_client_logging()
+    obj = make_object()
+    with StandInServer(make_responder(count)) as server, Client(server.url) as client:
+        query = client.records.query(obj)
+        results = [
+            ('single response', measure(lambda: iter(client.records.query(obj)))),
+            ('iterator({})'.format(chunk_size), measure(lambda: query.iterator(chunk_size=chunk_size))),
+        ]
+    print('records: {}'.format(count))
+    for title, (rows, first_row, elapsed, peak) in results:
+        print('{:16} rows {:7} first row {:7.3f} s total {:7.3f} s peak {:7.1f} MB'.format(
+            title, rows, first_row, elapsed, peak / 2 ** 20
+        ))
+
+
+if __name__ == '__main__':
+    main()
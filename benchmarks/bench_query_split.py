@@ -0,0 +1,57 @@
+"""
+Retrieval of records by a large "in" filter against a local stand-in server with artificial latency: the filter is
+split into chunks of max_in_size values which are requested concurrently. Without splitting the request line exceeds
+the server`s limit.
+
+Usage: python benchmarks/bench_query_split.py [ids_count] [latency_ms]
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stand_in import StandInServer, silence_client_logging  # noqa: E402
+from custodian.client import Client  # noqa: E402
+from custodian.objects import Object  # noqa: E402
+from custodian.objects.fields import IntegerField, StringField, NumberField  # noqa: E402
+
+
+def make_object():
+    return Object(name='person', key='id', cas=False, objects_manager=None, fields=[
+        IntegerField(name='id'), StringField(name='name'), NumberField(name='age')
+    ])
+
+
+def respond(method, path, query):
+    ids = re.search(r'in\(id,\(([^)]*)\)\)', query.get('q', [''])[0]).group(1).split(',')
+    return {'status': 'OK', 'data': [{'id': int(x), 'name': 'Person {}'.format(x), 'age': 20} for x in ids]}
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.05
+    silence_client_logging()
+    obj = make_object()
+    ids = list(range(100000, 100000 + count))
+    with StandInServer(respond, latency=latency) as server, Client(server.url, pool_size=16) as client:
+        print('ids: {}, latency: {:.0f} ms'.format(count, latency * 1000))
+        client.records.max_in_size = None
+        try:
+            list(client.records.query(obj).filter(id__in=ids))
+            print('unsplit          ok')
+        except Exception as e:
+            print('unsplit          failed: {}'.format(type(e).__name__))
+        for max_in_size in (250, 500, 1000, 2000):
+            client.records.max_in_size = max_in_size
+            requests_count = server.requests_count
+            started = time.perf_counter()
+            records = list(client.records.query(obj).filter(id__in=ids).order_by('id'))
+            print('max_in_size {:5} {:7} rows {:4} requests {:8.3f} s'.format(
+                max_in_size, len(records), server.requests_count - requests_count, time.perf_counter() - started
+            ))
+
+
+if __name__ == '__main__':
+    main()
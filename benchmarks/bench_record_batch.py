@@ -0,0 +1,56 @@
+"""
+Memory of a bulk response kept as records compared with a columnar RecordBatch.
+
+Usage: python benchmarks/bench_record_batch.py [records_count]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custodian.objects import Object  # noqa: E402
+from custodian.objects.fields import IntegerField, NumberField, BooleanField, DateTimeField  # noqa: E402
+from custodian.records.batch import RecordBatch  # noqa: E402
+from custodian.records.model import RecordClassFactory  # noqa: E402
+
+
+def make_object():
+    return Object(name='measurement', key='id', cas=False, objects_manager=None, fields=[
+        IntegerField(name='id'), NumberField(name='value'), NumberField(name='error'), IntegerField(name='sensor'),
+        BooleanField(name='is_valid'), DateTimeField(name='measured_at')
+    ])
+
+
+def make_data(count):
+    return [{
+        'id': i, 'value': i * 0.5, 'error': i * 0.01, 'sensor': i % 100, 'is_valid': bool(i % 2),
+        'measured_at': '2018-03-{:02d}T12:30:{:02d}.123456Z'.format(i % 28 + 1, i % 60)
+    } for i in range(count)]
+
+
+def measure(build, obj, data):
+    started = time.perf_counter()
+    build(obj, data)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    result = build(obj, data)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size, elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    obj = make_object()
+    data = make_data(count)
+    print('records: {}'.format(count))
+    for title, build in (('records', RecordClassFactory.hydrate), ('batch', RecordBatch.from_records_data)):
+        size, elapsed = measure(build, obj, data)
+        print('{:8} {:8.1f} MB {:8.2f} s'.format(title, size / 2 ** 20, elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Client-side cost and payload size of bulk_update bodies for a batch of received records where 1% of records have a
+changed field: every value of every record compared with changed fields only, and repeated serialization of
+unchanged records.
+
+Usage: python benchmarks/bench_record_changes.py [records_count]
+"""
+import gc
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custodian.objects import Object  # noqa: E402
+from custodian.objects.fields import IntegerField, StringField, NumberField, ObjectField, ArrayField  # noqa: E402
+from custodian.records.model import RecordClassFactory  # noqa: E402
+
+
+def make_object():
+    return Object(name='person', key='id', cas=True, objects_manager=None, fields=[
+        IntegerField(name='id'), NumberField(name='cas'), StringField(name='name'), NumberField(name='age'),
+        ObjectField(name='profile', optional=True), ArrayField(name='tags', optional=True)
+    ])
+
+
+def make_data(count):
+    return [{
+        'id': i, 'cas': 1, 'name': 'Person {}'.format(i), 'age': 20 + i % 50,
+        'profile': {'bio': 'x' * 200, 'links': ['http://example.com/{}'.format(x) for x in range(5)]},
+        'tags': ['tag{}'.format(x) for x in range(10)]
+    } for i in range(count)]
+
+
+def measure(records, serialize):
+    # collections triggered by the bodies themselves would dominate the measurements
+    gc.disable()
+    started = time.perf_counter()
+    body = [serialize(x) for x in records]
+    elapsed = time.perf_counter() - started
+    gc.enable()
+    return elapsed, len(json.dumps(body))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    obj = make_object()
+    records = RecordClassFactory.hydrate(obj, make_data(count))
+    for record in records[::100]:
+        record.age += 1
+    print('records: {}, changed: {}'.format(count, len(records[::100])))
+    for title, serialize in (
+            ('all values       ', lambda x: x.serialize()),
+            ('all values, kept ', lambda x: x.serialize()),
+            ('changed fields   ', lambda x: x.serialize_changes()),
+    ):
+        elapsed, size = measure(records, serialize)
+        print('{} {:8.3f} s {:12} bytes'.format(title, elapsed, size))
+
+
+if __name__ == '__main__':
+    main()
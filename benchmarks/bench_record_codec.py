@@ -0,0 +1,60 @@
+"""
+Decode and encode throughput of records: codecs compiled per object compared with dispatching through
+from_raw/to_raw of every field.
+
+Usage: python benchmarks/bench_record_codec.py [records_count]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custodian.objects import Object  # noqa: E402
+from custodian.objects.fields import IntegerField, StringField, NumberField, BooleanField, ArrayField  # noqa: E402
+from custodian.records.model import Record, RecordClassFactory  # noqa: E402
+
+
+def make_object():
+    return Object(name='person', key='id', cas=False, objects_manager=None, fields=[
+        IntegerField(name='id'), StringField(name='name'), NumberField(name='age'), StringField(name='street'),
+        BooleanField(name='is_active'), StringField(name='email'), NumberField(name='balance'),
+        ArrayField(name='tags', optional=True), StringField(name='city', optional=True)
+    ])
+
+
+def make_data(count):
+    return [{
+        'id': i, 'name': 'Person {}'.format(i), 'age': 20 + i % 50, 'street': 'Street', 'is_active': bool(i % 2),
+        'email': 'person{}@example.com'.format(i), 'balance': i * 1.5, 'tags': ['a', 'b']
+    } for i in range(count)]
+
+
+def measure(function, items):
+    started = time.perf_counter()
+    for item in items:
+        function(item)
+    return len(items) / (time.perf_counter() - started)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    obj = make_object()
+    data = make_data(count)
+    records = RecordClassFactory.hydrate(obj, data)
+    record_class = RecordClassFactory.get_record_class(obj)
+
+    # records are decoded as instances of the plain compiled class, received records track changes afterwards
+    record = Record(obj, **data[0])
+    # the per field implementations kept on Record itself
+    dispatch_decode = measure(lambda x: Record._decode(record, x), data)
+    codec_decode = measure(record._decode, data)
+    dispatch_encode = measure(Record._encode, records)
+    codec_encode = measure(record_class._encode, records)
+    print('records: {}'.format(count))
+    print('decode: per field {:10.0f} records/s, compiled {:10.0f} records/s'.format(dispatch_decode, codec_decode))
+    print('encode: per field {:10.0f} records/s, compiled {:10.0f} records/s'.format(dispatch_encode, codec_encode))
+
+
+if __name__ == '__main__':
+    main()
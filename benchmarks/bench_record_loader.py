@@ -0,0 +1,71 @@
+"""
+Retrieval of 50 related records against a local stand-in server with artificial latency: one RecordsManager.get call
+per record compared with a RecordLoader batch scope and with concurrent get calls batched within a window.
+
+Usage: python benchmarks/bench_record_loader.py [records_count] [latency_ms]
+"""
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stand_in import StandInServer, silence_client_logging  # noqa: E402
+from custodian.client import Client  # noqa: E402
+from custodian.objects import Object  # noqa: E402
+from custodian.objects.fields import IntegerField, StringField  # noqa: E402
+from custodian.records.loader import RecordLoader  # noqa: E402
+
+
+def make_object():
+    return Object(name='person', key='id', cas=False, objects_manager=None, fields=[
+        IntegerField(name='id'), StringField(name='name')
+    ])
+
+
+def respond(method, path, query):
+    if path.startswith('/custodian/data/single/'):
+        record_id = path.rsplit('/', 1)[1]
+        return {'status': 'OK', 'data': {'id': int(record_id), 'name': 'Person {}'.format(record_id)}}
+    ids = re.search(r'in\(id,\(([^)]*)\)\)', query.get('q', [''])[0]).group(1).split(',')
+    return {'status': 'OK', 'data': [{'id': int(x), 'name': 'Person {}'.format(x)} for x in ids]}
+
+
+def measure(server, func):
+    requests_count = server.requests_count
+    started = time.perf_counter()
+    records = func()
+    return len(records), server.requests_count - requests_count, time.perf_counter() - started
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.02
+    silence_client_logging()
+    obj = make_object()
+    ids = list(range(1, count + 1))
+    with StandInServer(respond, latency=latency) as server, Client(server.url, pool_size=16) as client:
+        print('records: {}, latency: {:.0f} ms'.format(count, latency * 1000))
+        result = measure(server, lambda: [client.records.get(obj, x) for x in ids])
+        print('get one by one      {:4} records {:4} requests {:8.3f} s'.format(*result))
+
+        loader = RecordLoader(client.records)
+
+        def load_in_batch():
+            with loader.batch():
+                futures = [loader.load(obj, x) for x in ids]
+            return [x.result() for x in futures]
+
+        result = measure(server, load_in_batch)
+        print('batch scope         {:4} records {:4} requests {:8.3f} s'.format(*result))
+
+        client.records.loader = RecordLoader(client.records, window=0.005)
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            result = measure(server, lambda: list(executor.map(lambda x: client.records.get(obj, x), ids)))
+        print('concurrent, window  {:4} records {:4} requests {:8.3f} s'.format(*result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Memory and hydration throughput of records built from a bulk response: compiled __slots__ record classes compared
+with the former __dict__ based records.
+
+Usage: python benchmarks/bench_record_memory.py [records_count]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custodian.objects import Object  # noqa: E402
+from custodian.objects.fields import IntegerField, StringField, NumberField, BooleanField  # noqa: E402
+from custodian.records.model import RecordClassFactory  # noqa: E402
+
+
+class DictRecord:
+    """
+    The record implementation before compiled record classes
+    """
+    obj = None
+
+    def __init__(self, obj, **values):
+        self.obj = obj
+        for field in obj.fields.values():
+            value = values.get(field.name, None)
+            if value:
+                value = field.from_raw(value)
+            setattr(self, field.name, value)
+
+
+def make_object():
+    return Object(name='person', key='id', cas=False, objects_manager=None, fields=[
+        IntegerField(name='id'), StringField(name='name'), NumberField(name='age'), StringField(name='street'),
+        BooleanField(name='is_active'), StringField(name='email'), NumberField(name='balance'),
+        StringField(name='city')
+    ])
+
+
+def make_data(count):
+    return [{
+        'id': i, 'name': 'Person {}'.format(i), 'age': 20 + i % 50, 'street': 'Street', 'is_active': bool(i % 2),
+        'email': 'person{}@example.com'.format(i), 'balance': i * 1.5, 'city': 'City'
+    } for i in range(count)]
+
+
+def hydrate_dict_records(obj, data):
+    return [DictRecord(obj, **x) for x in data]
+
+
+def measure(hydrate, obj, data):
+    tracemalloc.start()
+    started = time.perf_counter()
+    records = hydrate(obj, data)
+    elapsed = time.perf_counter() - started
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return size, len(data) / elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    obj = make_object()
+    data = make_data(count)
+    dict_size, dict_speed = measure(hydrate_dict_records, obj, data)
+    slots_size, slots_speed = measure(RecordClassFactory.hydrate, obj, data)
+    print('records: {}'.format(count))
+    print('__dict__ records: {:8.1f} MB {:10.0f} records/s'.format(dict_size / 2 ** 20, dict_speed))
+    print('__slots__ records:{:8.1f} MB {:10.0f} records/s'.format(slots_size / 2 ** 20, slots_speed))
+
+
+if __name__ == '__main__':
+    main()
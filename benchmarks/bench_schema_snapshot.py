@@ -0,0 +1,80 @@
+"""
+Client startup time: rebuilding a schema of N objects from the network (per-object `get()` and a single `warm_up()`)
+compared with loading it from a local snapshot file.
+
+Usage: python benchmarks/bench_schema_snapshot.py [objects_count]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stand_in import StandInServer, silence_client_logging  # noqa: E402
+from custodian.client import Client  # noqa: E402
+
+
+def make_schema(count):
+    objects = []
+    for i in range(count):
+        fields = [
+            {'name': 'id', 'type': 'number', 'optional': True, 'default': {'func': 'nextval'}},
+            {'name': 'name', 'type': 'string', 'optional': False},
+            {'name': 'created_at', 'type': 'datetime', 'optional': True},
+            {'name': 'is_active', 'type': 'bool', 'optional': False},
+        ]
+        if i:
+            fields.append({'name': 'parent', 'type': 'object', 'optional': True, 'linkMeta': 'object_{}'.format(i - 1),
+                           'linkType': 'inner'})
+        objects.append({'name': 'object_{}'.format(i), 'key': 'id', 'cas': False, 'fields': fields, 'actions': []})
+    return objects
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    schema = make_schema(count)
+    by_name = {x['name']: x for x in schema}
+    silence_client_logging()
+
+    def respond(method, path, query):
+        name = path.rsplit('/', 1)[-1]
+        return {'status': 'OK', 'data': by_name[name] if name else schema}
+
+    names = [x['name'] for x in schema]
+    with StandInServer(respond, latency=0.002) as server, tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'schema.json')
+
+        started = time.perf_counter()
+        with Client(server.url) as client:
+            for name in names:
+                client.objects.get(name).fields
+        per_object = time.perf_counter() - started
+
+        started = time.perf_counter()
+        with Client(server.url) as client:
+            client.objects.warm_up()
+            for name in names:
+                client.objects.get(name).fields
+        warm_up = time.perf_counter() - started
+
+        with Client(server.url) as client:
+            client.objects.save_snapshot(path)
+
+        requests_before = server.requests_count
+        started = time.perf_counter()
+        with Client(server.url) as client:
+            assert client.objects.load_snapshot(path, max_age=3600)
+            for name in names:
+                client.objects.get(name).fields
+        snapshot = time.perf_counter() - started
+        assert server.requests_count == requests_before
+
+    print('objects: {}'.format(count))
+    print('cold, get() per object: {:8.1f} ms'.format(per_object * 1000))
+    print('cold, warm_up():        {:8.1f} ms'.format(warm_up * 1000))
+    print('snapshot load:          {:8.1f} ms'.format(snapshot * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Writing records one request per record compared with a client.session() unit of work, against a local stand-in
+server with artificial latency.
+
+Usage: python benchmarks/bench_session.py [records_count] [latency_ms]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stand_in import StandInServer, silence_client_logging  # noqa: E402
+from custodian.client import Client  # noqa: E402
+from custodian.objects import Object  # noqa: E402
+from custodian.objects.fields import IntegerField, StringField  # noqa: E402
+from custodian.records.model import Record  # noqa: E402
+
+
+def make_object():
+    return Object(name='person', key='id', cas=False, objects_manager=None, fields=[
+        IntegerField(name='id', optional=True), StringField(name='name')
+    ])
+
+
+def respond(method, path, query):
+    # the stand-in server does not see the body, written records are left as sent
+    if path.startswith('/custodian/data/single/'):
+        record_id = path.rsplit('/', 1)[1]
+        return {'status': 'OK', 'data': {'id': int(record_id), 'name': 'Person {}'.format(record_id)}}
+    return {'status': 'OK', 'data': []}
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.01
+    silence_client_logging()
+    obj = make_object()
+    records = [Record(obj, id=i, name='Person {}'.format(i)) for i in range(1, count + 1)]
+    with StandInServer(respond, latency=latency) as server, Client(server.url) as client:
+        print('records: {}, latency: {:.0f} ms'.format(count, latency * 1000))
+        requests_count, started = server.requests_count, time.perf_counter()
+        for record in records:
+            client.records.update(record)
+        print('update one by one {:5} requests {:8.3f} s'.format(
+            server.requests_count - requests_count, time.perf_counter() - started
+        ))
+        requests_count, started = server.requests_count, time.perf_counter()
+        with client.session() as session:
+            for record in records:
+                session.update(record)
+            pending = len(session)
+        print('session           {:5} requests {:8.3f} s, {} records'.format(
+            server.requests_count - requests_count, time.perf_counter() - started, pending
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+Decode throughput of temporal fields: the strict RFC 3339 path compared with dateparser for the same values.
+
+Usage: python benchmarks/bench_temporal_decode.py [values_count]
+"""
+import os
+import sys
+import time
+
+import dateparser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custodian.objects.fields import DateTimeField, DateField, TimeField  # noqa: E402
+
+
+def measure(function, values):
+    started = time.perf_counter()
+    for value in values:
+        function(value)
+    return len(values) / (time.perf_counter() - started)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    cases = [
+        (DateTimeField(name='created_at'), ['2018-03-{:02d}T12:30:{:02d}.123456+03:00'.format(i % 28 + 1, i % 60)
+                                            for i in range(count)]),
+        (DateField(name='birthday'), ['2018-03-{:02d}'.format(i % 28 + 1) for i in range(count)]),
+        (TimeField(name='opens_at'), ['12:{:02d}:{:02d}'.format(i % 60, i % 60) for i in range(count)]),
+    ]
+    print('values: {}'.format(count))
+    for field, values in cases:
+        # dateparser is much slower, a sample is enough
+        dateparser_speed = measure(dateparser.parse, values[:max(count // 20, 1)])
+        field_speed = measure(field.from_raw, values)
+        print('{:9} dateparser {:10.0f} values/s, from_raw {:10.0f} values/s'.format(
+            field.type, dateparser_speed, field_speed
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+A tiny local stand-in for the Custodian server used by the benchmarks.
+
+It speaks HTTP/1.1 with keep-alive and answers every request with the payload returned by the `responder`
+callable, optionally after an artificial latency.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+
+class StandInServer:
+    def __init__(self, responder, latency: float = 0.0):
+        """
+        :param responder: callable(method, path, query) -> dict, the JSON document to respond with
+        :param latency: seconds to sleep before responding
+        """
+        self.responder = responder
+        self.latency = latency
+        self.requests_count = 0
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{}/custodian'.format(self._server.server_address[1])
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # headers and body are written separately, Nagle would delay keep-alive responses
+            disable_nagle_algorithm = True
+
+            def _respond(self):
+                server.requests_count += 1
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    self.rfile.read(length)
+                if server.latency:
+                    time.sleep(server.latency)
+                split_url = urlsplit(self.path)
+                body = json.dumps(
+                    server.responder(self.command, split_url.path, parse_qs(split_url.query))
+                ).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if self.command != 'HEAD':
+                    self.wfile.write(body)
+
+            do_GET = do_PUT = do_POST = do_DELETE = do_HEAD = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def silence_client_logging():
+    """
+    The client logs every request at DEBUG level, which would dominate the measurements
+    """
+    import logging
+    logging.getLogger('custodian.client').setLevel(logging.WARNING)
@@ -1,12 +1,15 @@
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from custodian.command import Command
 from custodian.exceptions import CommandExecutionFailureException
 from custodian.objects.manager import ObjectsManager
 from custodian.records.manager import RecordsManager
+from custodian.records.session import Session
 
 handler = logging.StreamHandler()
 handler.setLevel(logging.DEBUG)
@@ -22,27 +25,101 @@ class Client:
 
     server_url = None
     authorization_token = None
+    pool_size = None
 
-    def __init__(self, server_url: str, authorization_token: str = None):
+    def __init__(self, server_url: str, authorization_token: str = None, pool_size: int = 10, prewarm: int = 0):
+        """
+        :param server_url: Custodian server URL
+        :param authorization_token: Trood Auth authorization token
+        :param pool_size: maximum number of keep-alive connections kept open per host
+        :param prewarm: number of connections to open at construction time
+        """
         self.server_url = server_url.rstrip('/')
         self.authorization_token = authorization_token
+        self.pool_size = pool_size
+        self._session = self._make_session()
         self.records = self._records_manager_class(self)
         self.objects = self._objects_manager_class(self)
+        if prewarm:
+            self.prewarm(prewarm)
+
+    def _make_session(self) -> requests.Session:
+        """
+        Assembles a requests session which keeps up to `pool_size` keep-alive connections per host
+        :return:
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def prewarm(self, connections: int = 1):
+        """
+        Opens up to `connections` pooled connections to the Custodian server in advance, so the first commands do
+        not pay for TCP/TLS handshakes. Connection errors are ignored here, they will surface on the real commands
+        :param connections:
+        """
+        connections = min(connections, self.pool_size)
+
+        def warm(_):
+            try:
+                self._session.head(self.server_url, headers=self._get_headers())
+            except requests.RequestException:
+                pass
+
+        if connections == 1:
+            warm(0)
+        else:
+            # connections are only opened in parallel when requests are concurrent
+            with ThreadPoolExecutor(max_workers=connections) as executor:
+                list(executor.map(warm, range(connections)))
+
+    def close(self):
+        """
+        Closes all pooled connections
+        """
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def session(self, flush_threshold: int = 1000, batch_size: int = None, concurrency: int = 1) -> Session:
+        """
+        Returns a unit of work which collects record writes and flushes them with bulk requests, see Session
+        :param flush_threshold: number of pending writes which triggers a flush
+        :param batch_size: number of records per bulk request
+        :param concurrency: number of bulk requests sent at once
+        :return:
+        """
+        return Session(self.records, flush_threshold=flush_threshold, batch_size=batch_size, concurrency=concurrency)
+
+    def _get_headers(self) -> dict:
+        if self.authorization_token:
+            return {'Authorization': self.authorization_token}
+        else:
+            return {}
 
     def _make_query_string(self, params: dict):
         queries = []
         for key, value in params.items():
-            queries.append('{}={}'.format(key, value))
+            # lists are sent as repeated parameters
+            for item in value if isinstance(value, (list, tuple)) else [value]:
+                queries.append('{}={}'.format(key, item))
         return '&'.join(queries)
 
-    def execute(self, command: Command, data: dict = None, params: dict = None):
+    def send(self, command: Command, data: dict = None, params: dict = None,
+             headers: dict = None) -> requests.Response:
         """
-        Performs call to the Custodian server API
+        Sends the command to the Custodian server API and returns the raw HTTP response
         :param command:
         :param data:
         :param params:
+        :param headers: extra headers, e.g. for conditional requests
         :return:
-        :raises CommandExecutionFailureException:
         """
         url = '/'.join([self.server_url, command.name])
         logger.debug('Making {} request: url = "{}", json = "{}", query = "{}"'.format(
@@ -52,12 +129,16 @@ class Client:
             self._make_query_string(
                 params or {}))
         )
-        if self.authorization_token:
-            headers = {'Authorization': self.authorization_token}
-        else:
-            headers = {}
-        response = getattr(requests, command.method)(url, json=data, params=self._make_query_string(params or {}),
-                                                     headers=headers)
+        return self._session.request(command.method, url, json=data, params=self._make_query_string(params or {}),
+                                     headers={**self._get_headers(), **(headers or {})})
+
+    def process_response(self, response: requests.Response):
+        """
+        Extracts the command`s result from the Custodian server response
+        :param response:
+        :return:
+        :raises CommandExecutionFailureException:
+        """
         if response.content:
             response_content = response.json()
             if response_content['status'] == 'OK':
@@ -69,3 +150,14 @@ class Client:
                 return None, True
             else:
                 raise CommandExecutionFailureException('Command execution failed')
+
+    def execute(self, command: Command, data: dict = None, params: dict = None):
+        """
+        Performs call to the Custodian server API
+        :param command:
+        :param data:
+        :param params:
+        :return:
+        :raises CommandExecutionFailureException:
+        """
+        return self.process_response(self.send(command, data=data, params=params))
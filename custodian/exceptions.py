@@ -40,3 +40,36 @@ class RecordUpdateException(Exception):
 
 class CasFailureException(RecordUpdateException):
     pass
+
+
+class BulkOperationException(CommandExecutionFailureException):
+    """
+    Some batches of a bulk operation failed, records of other batches were processed
+    """
+    failures = None
+    succeeded = None
+
+    def __init__(self, failures: list, succeeded: list):
+        """
+        :param failures: (records, error message) of every failed batch
+        :param succeeded: records of batches which were processed
+        """
+        self.failures = failures
+        self.succeeded = succeeded
+        super().__init__('{} batch(es) of {} record(s) failed: {}'.format(
+            len(failures), sum(len(x[0]) for x in failures), failures[0][1]
+        ))
+
+
+class BulkUpdateException(BulkOperationException, ObjectUpdateException):
+    """
+    Some batches of a bulk update failed
+    """
+    pass
+
+
+class BulkDeleteException(BulkOperationException, ObjectDeletionException):
+    """
+    Some batches of a bulk deletion failed
+    """
+    pass
@@ -13,6 +13,7 @@ class Object:
     _actions = None
     _evaluated = None
     _objects_manager = None
+    _record_class = None
 
     def __init__(self, name: str, cas: bool, objects_manager, key: str = None, fields: List[BaseField] = None,
                  actions: List[Action] = None):
@@ -47,8 +48,21 @@ class Object:
 
     def _evaluate(self):
         obj = self._objects_manager.get(self.name)
-        self._fields = obj.fields
+        # shared references are resolved by the manager itself while retrieving the definition
+        if not self._evaluated:
+            self._set_definition(obj)
+
+    def _set_definition(self, obj: 'Object'):
+        """
+        Takes over key, fields and actions of the given object of the same name
+        :param obj:
+        """
+        self.cas = obj.cas
         self._key = obj.key
+        self._fields = obj.fields
+        self._actions = obj.actions
+        for field in self._fields.values():
+            field.set_parent_obj(self)
         self._evaluated = True
 
     def serialize(self):
@@ -60,6 +74,17 @@ class Object:
             'actions': [x.serialize() for x in self._actions] if self._actions else []
         }
 
+    def __getstate__(self):
+        # the compiled record class is not importable, it is compiled again on demand;
+        # the manager holds the client, which cannot be pickled, so objects keep the definition they have and
+        # references which are not resolved yet keep their name only
+        state = self.__dict__.copy()
+        state.pop('_record_class', None)
+        state.pop('_objects_manager', None)
+        if self._fields is not None and self._key is not None:
+            state['_evaluated'] = True
+        return state
+
     def __repr__(self):
         return '<Custodian object "{}">'.format(self.name)
 
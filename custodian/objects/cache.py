@@ -0,0 +1,96 @@
+import threading
+import time
+
+
+class SchemaCacheEntry:
+    data = None
+    etag = None
+    expires_at = None
+
+    def __init__(self, data, etag: str = None, expires_at: float = None):
+        self.data = data
+        self.etag = etag
+        self.expires_at = expires_at
+
+    def is_fresh(self) -> bool:
+        return self.expires_at is None or self.expires_at > time.monotonic()
+
+
+class SchemaCache:
+    """
+    Keeps raw object definitions retrieved from the Custodian for `ttl` seconds. Expired entries are kept, so they can
+    be revalidated with their ETag instead of being downloaded again.
+    `ttl=None` keeps entries until they are invalidated, `ttl=0` revalidates every lookup
+    """
+    ttl = None
+    hits = None
+    misses = None
+    revalidations = None
+
+    def __init__(self, ttl: float = 60):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, object_name: str) -> SchemaCacheEntry:
+        """
+        Returns the entry for the object, fresh or expired, and counts the lookup as a hit only if it is fresh
+        :param object_name:
+        :return:
+        """
+        entry = self._entries.get(object_name)
+        with self._lock:
+            if entry is not None and entry.is_fresh():
+                self.hits += 1
+            else:
+                self.misses += 1
+        return entry
+
+    def set(self, object_name: str, data, etag: str = None):
+        """
+        Stores the raw object definition, `None` data means the object does not exist
+        :param object_name:
+        :param data:
+        :param etag:
+        """
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._entries[object_name] = SchemaCacheEntry(data, etag=etag, expires_at=expires_at)
+
+    def revalidate(self, object_name: str, entry: SchemaCacheEntry) -> SchemaCacheEntry:
+        """
+        Renews the entry after the server has confirmed it is not modified. An entry invalidated in the meantime is
+        not brought back
+        :param object_name:
+        :param entry:
+        :return:
+        """
+        entry.expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self.revalidations += 1
+        return entry
+
+    def invalidate(self, *object_names: str):
+        """
+        Drops entries of the given objects or the whole cache if no names are given
+        :param object_names:
+        """
+        if object_names:
+            for object_name in object_names:
+                self._entries.pop(object_name, None)
+        else:
+            self._entries.clear()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'size': len(self._entries)
+        }
+
+    def __len__(self):
+        return len(self._entries)
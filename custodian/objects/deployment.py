@@ -0,0 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from custodian.objects.planner import MigrationPlan, MigrationStep
+
+
+class DeploymentReport:
+    """
+    Outcome of a deployment: applied steps, failures per object and steps skipped because a step they depend on
+    has failed
+    """
+    applied = None
+    failed = None
+    skipped = None
+
+    def __init__(self):
+        self.applied = []
+        self.failed = {}
+        self.skipped = []
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed and not self.skipped
+
+    def __repr__(self):
+        return '<DeploymentReport applied={} failed={} skipped={}>'.format(
+            len(self.applied), sorted(self.failed.keys()), [x.obj.name for x in self.skipped]
+        )
+
+
+class DeploymentScheduler:
+    """
+    Applies a migration plan in waves: all steps of a wave depend only on steps of previous waves, so they are sent
+    concurrently on a bounded pool of workers
+    """
+
+    def __init__(self, plan: MigrationPlan, workers: int = 8):
+        self.plan = plan
+        self.workers = workers
+
+    def get_waves(self) -> List[List[MigrationStep]]:
+        """
+        Groups plan steps by their depth in the dependency graph
+        :return:
+        """
+        levels = {}
+        waves = []
+        # steps of a plan are already ordered by their dependencies
+        for step in self.plan.steps:
+            level = max([levels[id(x)] + 1 for x in step.dependencies], default=0)
+            levels[id(step)] = level
+            if level == len(waves):
+                waves.append([])
+            waves[level].append(step)
+        return waves
+
+    def run(self) -> DeploymentReport:
+        """
+        Applies the plan, a failed step does not stop independent steps
+        :return:
+        """
+        report = DeploymentReport()
+        failed_steps = set()
+
+        def apply(step):
+            try:
+                self.plan.apply_step(step)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for wave in self.get_waves():
+                steps = []
+                for step in wave:
+                    if any(id(x) in failed_steps for x in step.dependencies):
+                        failed_steps.add(id(step))
+                        report.skipped.append(step)
+                    else:
+                        steps.append(step)
+                for step, error in zip(steps, executor.map(apply, steps)):
+                    if error is None:
+                        report.applied.append(step)
+                    else:
+                        failed_steps.add(id(step))
+                        report.failed[step.obj.name] = error
+        return report
@@ -5,14 +5,16 @@ from custodian.objects.fields import RelatedObjectField, GenericField
 class ObjectFactory:
     @classmethod
     def _factory_field(cls, field_data, objects_manager):
+        # raw data may be kept by the schema cache, so it must stay untouched
+        field_data = dict(field_data)
         if field_data.get('linkMeta') or field_data.get('linkMetaList'):
 
             if field_data.get('linkMeta'):
-                field_data['obj'] = Object(name=field_data['linkMeta'], cas=False, objects_manager=objects_manager)
+                field_data['obj'] = objects_manager.get_reference(field_data['linkMeta'])
                 del field_data['linkMeta']
 
             if field_data.get('linkMetaList'):
-                field_data['objs'] = [Object(name=object_name, cas=False, objects_manager=objects_manager) for
+                field_data['objs'] = [objects_manager.get_reference(object_name) for
                                       object_name in field_data['linkMetaList']]
                 del field_data['linkMetaList']
 
@@ -33,9 +35,12 @@ class ObjectFactory:
         :param object_data:
         :return:
         """
+        object_data = dict(object_data)
         fields = []
         for field_data in object_data['fields']:
             fields.append(cls._factory_field(field_data, objects_manager))
         object_data['fields'] = fields
         object_data['objects_manager'] = objects_manager
+        if object_data.get('actions'):
+            object_data['actions'] = list(object_data['actions'])
         return Object(**object_data)
@@ -4,9 +4,14 @@ from typing import NamedTuple, List
 import dateparser
 
 from custodian.exceptions import FieldDoesNotExistException, ImproperlyConfiguredFieldException
+from custodian.objects.temporal import ISO8601Parser
 
 LINK_TYPES = NamedTuple('LINK_TYPE', [('INNER', str), ('OUTER', str)])(INNER='inner', OUTER='outer')
 
+TIMEZONE_POLICY = NamedTuple('TIMEZONE_POLICY', [('PRESERVE', str), ('UTC', str), ('NAIVE', str)])(
+    PRESERVE='preserve', UTC='utc', NAIVE='naive'
+)
+
 
 class BaseField:
     type = None
@@ -69,30 +74,68 @@ class StringField(BaseField):
     cast_func = str
 
 
-class DateTimeField(BaseField):
-    type: str = 'datetime'
-    cast_func = datetime.datetime
+class BaseTemporalField(BaseField):
+    """
+    Decodes values with the strict RFC 3339 parser and falls back to dateparser for non-conforming input.
+    Decoded values are brought to the field`s timezone policy:
+    +   preserve - values keep the offset they were sent with, values without offset stay naive
+    +   utc - values are converted to UTC, values without offset are considered to be in UTC
+    +   naive - values are converted to UTC and their tzinfo is dropped
+    """
+    timezone_policy = TIMEZONE_POLICY.PRESERVE
+
+    def __init__(self, name: str, optional: bool = False, default=None, timezone_policy: str = None, **kwargs):
+        super(BaseTemporalField, self).__init__(name, optional=optional, default=default, **kwargs)
+        if timezone_policy is not None:
+            self.timezone_policy = timezone_policy
+
+    def _parse(self, value: str):
+        raise NotImplementedError
+
+    def _apply_timezone_policy(self, value: datetime.datetime) -> datetime.datetime:
+        if self.timezone_policy == TIMEZONE_POLICY.PRESERVE:
+            return value
+        if value.tzinfo is None:
+            return value.replace(tzinfo=datetime.timezone.utc) if self.timezone_policy == TIMEZONE_POLICY.UTC \
+                else value
+        value = value.astimezone(datetime.timezone.utc)
+        return value if self.timezone_policy == TIMEZONE_POLICY.UTC else value.replace(tzinfo=None)
 
     def from_raw(self, value):
         if value and isinstance(value, str):
-            return dateparser.parse(value)
+            return self._parse(value)
         return value
 
-    def to_raw(self, value: datetime.datetime):
+    def to_raw(self, value):
         return value.isoformat() if value else None
 
 
-class TimeField(BaseField):
+class DateTimeField(BaseTemporalField):
+    type: str = 'datetime'
+    cast_func = datetime.datetime
+
+    def _parse(self, value: str):
+        parsed_value = ISO8601Parser.parse_datetime(value) or dateparser.parse(value)
+        return self._apply_timezone_policy(parsed_value) if parsed_value is not None else None
+
+
+class TimeField(BaseTemporalField):
     type: str = 'time'
     cast_func = datetime.time
 
-    def from_raw(self, value):
-        if value and isinstance(value, str):
-            return dateparser.parse(value)
-        return value
-
-    def to_raw(self, value: datetime.time):
-        return value.isoformat() if value else None
+    def _parse(self, value: str):
+        parsed_value = ISO8601Parser.parse_time(value)
+        if parsed_value is None:
+            parsed_value = dateparser.parse(value)
+            if parsed_value is None:
+                return None
+            parsed_value = parsed_value.timetz()
+        if self.timezone_policy == TIMEZONE_POLICY.PRESERVE:
+            return parsed_value
+        # offsets are fixed, so any date gives the same conversion
+        return self._apply_timezone_policy(
+            datetime.datetime.combine(datetime.date(2000, 1, 1), parsed_value)
+        ).timetz()
 
 
 class DateField(BaseField):
@@ -101,7 +144,10 @@ class DateField(BaseField):
 
     def from_raw(self, value):
         if value and isinstance(value, str):
-            return dateparser.parse(value).date()
+            parsed_value = ISO8601Parser.parse_date(value) or ISO8601Parser.parse_datetime(value)
+            if parsed_value is None:
+                parsed_value = dateparser.parse(value)
+            return parsed_value.date() if isinstance(parsed_value, datetime.datetime) else parsed_value
         return value
 
     def to_raw(self, value: datetime.date):
@@ -115,12 +161,12 @@ class BooleanField(BaseField):
 
 class ArrayField(BaseField):
     type: str = 'array'
-    cast_func = lambda x: x
+    cast_func = lambda x, y: y
 
 
 class ObjectField(BaseField):
     type: str = 'object'
-    cast_func = lambda x: x
+    cast_func = lambda x, y: y
 
 
 class RelatedObjectField(BaseField):
@@ -157,10 +203,17 @@ class RelatedObjectField(BaseField):
         if self.link_type == LINK_TYPES.OUTER:
             return None
         else:
-            if isinstance(value, dict):
-                return value.get(self.get_pk(), None)
-            else:
-                return value
+            if isinstance(value, list):
+                return [self._get_raw_pk(x) for x in value]
+            return self._get_raw_pk(value)
+
+    def _get_raw_pk(self, value):
+        # related records are sent as their keys
+        if hasattr(value, 'get_pk'):
+            return value.get_pk()
+        if isinstance(value, dict):
+            return value.get(self.get_pk(), None)
+        return value
 
     def from_raw(self, value):
         # Try to cast potential ids from string to int
@@ -179,7 +232,12 @@ class RelatedObjectField(BaseField):
     @property
     def reverse_field(self):
         if not self._reverse_field:
-            if self.link_type == LINK_TYPES.INNER:
+            relation_index = getattr(getattr(self.parent_obj, '_objects_manager', None), 'relation_index', None)
+            relation = relation_index.get_reverse(self.parent_obj.name, self.name) if relation_index is not None \
+                else None
+            if relation is not None and relation.obj_name == self.obj.name:
+                self._reverse_field = self.obj.fields.get(relation.field_name)
+            elif self.link_type == LINK_TYPES.INNER:
                 for field in self.obj.fields.values():
                     if isinstance(field, RelatedObjectField):
                         if field.outer_link_field == self.name and field.obj.name == self.parent_obj.name:
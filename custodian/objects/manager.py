@@ -1,17 +1,31 @@
+from typing import List
+
 from custodian.command import Command, COMMAND_METHOD
 from custodian.exceptions import ObjectUpdateException, ObjectCreateException, \
-    ObjectDeletionException
+    ObjectDeletionException, CommandExecutionFailureException
 from custodian.objects import Object
+from custodian.objects.cache import SchemaCache
+from custodian.objects.deployment import DeploymentScheduler, DeploymentReport
 from custodian.objects.factory import ObjectFactory
-from custodian.objects.fields import RelatedObjectField, LINK_TYPES
+from custodian.objects.fields import RelatedObjectField, LINK_TYPES, GenericField
+from custodian.objects.planner import MigrationPlanner, MigrationPlan
+from custodian.objects.relations import RelationIndex
+from custodian.objects.snapshot import SchemaSnapshot
 
 
 class ObjectsManager:
     _base_command_name = 'meta'
 
-    def __init__(self, client):
+    def __init__(self, client, cache_ttl: float = 60):
+        """
+        :param client:
+        :param cache_ttl: seconds during which retrieved object definitions are served from the schema cache
+        """
         self.client = client
+        self.cache = SchemaCache(ttl=cache_ttl)
         self._pending_objects = []
+        self._references = {}
+        self.relation_index = None
 
     def create(self, obj: Object) -> Object:
         """
@@ -32,6 +46,7 @@ class ObjectsManager:
             data=safe_obj.serialize()
         )
         if ok:
+            self._invalidate_cache(safe_obj)
             for field in fields_to_add_later:
                 # process referenced fields` objects
                 if not self.get(field.obj.name):
@@ -61,6 +76,7 @@ class ObjectsManager:
             data=obj.serialize()
         )
         if ok:
+            self._invalidate_cache(obj)
             return obj
         else:
             raise ObjectUpdateException(data.get('msg'))
@@ -76,19 +92,33 @@ class ObjectsManager:
             command=Command(name=self._get_object_command_name(obj.name), method=COMMAND_METHOD.DELETE)
         )
         if ok:
+            self._invalidate_cache(obj)
             return obj
         else:
             raise ObjectDeletionException(data.get('msg'))
 
     def get(self, object_name):
         """
-        Retrieves existing object from Custodian by name
+        Retrieves existing object from Custodian by name. Definitions are served from the schema cache while they
+        are fresh, expired ones are revalidated with their ETag
         :param object_name:
         """
-        data, ok = self.client.execute(
-            command=Command(name=self._get_object_command_name(object_name), method=COMMAND_METHOD.GET)
-        )
-        obj = ObjectFactory.factory(data, objects_manager=self) if ok else None
+        entry = self.cache.get(object_name)
+        if entry is not None and entry.is_fresh():
+            data = entry.data
+        else:
+            command = Command(name=self._get_object_command_name(object_name), method=COMMAND_METHOD.GET)
+            headers = {'If-None-Match': entry.etag} if entry is not None and entry.etag else None
+            response = self.client.send(command, headers=headers)
+            if response.status_code == 304:
+                data = self.cache.revalidate(object_name, entry).data
+            else:
+                data, ok = self.client.process_response(response)
+                data = data if ok else None
+                self.cache.set(object_name, data, etag=response.headers.get('ETag'))
+        obj = ObjectFactory.factory(data, objects_manager=self) if data else None
+        if obj:
+            self._resolve_reference(data)
         return obj
 
     def get_all(self):
@@ -96,14 +126,170 @@ class ObjectsManager:
         Retrieves a list of existing objects from Custodian
         :return:
         """
+        return [ObjectFactory.factory(object_data, self) for object_data in self._retrieve_all()]
+
+    def _retrieve_all(self):
+        """
+        Retrieves raw definitions of all existing objects, caches them and resolves requested references
+        :return:
+        """
         data, ok = self.client.execute(
             command=Command(name=self._get_object_command_name(''), method=COMMAND_METHOD.GET)
         )
         if ok and data:
-            return [ObjectFactory.factory(object_data, self) for object_data in data]
+            for object_data in data:
+                self.cache.set(object_data['name'], object_data)
+                self._resolve_reference(object_data)
+            return data
         else:
             return []
 
+    def get_reference(self, object_name: str) -> Object:
+        """
+        Returns the canonical lazy object for the given name. Relation fields of retrieved objects share these
+        references, so each referenced object is resolved at most once
+        :param object_name:
+        :return:
+        """
+        reference = self._references.get(object_name)
+        if reference is None:
+            reference = self._references.setdefault(
+                object_name, Object(name=object_name, cas=False, objects_manager=self)
+            )
+        return reference
+
+    def warm_up(self):
+        """
+        Resolves references of all existing objects with a single request
+        """
+        self._load_definitions(self._retrieve_all())
+
+    def plan(self, objects: List[Object]) -> MigrationPlan:
+        """
+        Plans the minimal ordered list of meta requests which bring the Custodian schema to the given objects
+        :param objects:
+        :return:
+        """
+        return MigrationPlanner(self).plan(objects)
+
+    def build_relation_index(self) -> RelationIndex:
+        """
+        Resolves all existing objects with a single request and indexes their link fields. The index is used for
+        reverse fields lookups until the schema is changed via this manager
+        :return:
+        """
+        objects_data = self._retrieve_all()
+        self._load_definitions(objects_data)
+        self.relation_index = RelationIndex([self.get_reference(x['name']) for x in objects_data])
+        return self.relation_index
+
+    def deploy(self, objects: List[Object], workers: int = 8) -> DeploymentReport:
+        """
+        Plans the migration to the given objects and applies it, independent meta requests are sent concurrently.
+        The number of workers is bounded by the client`s connection pool size
+        :param objects:
+        :param workers:
+        :return:
+        """
+        plan = self.plan(objects)
+        return DeploymentScheduler(plan, workers=min(workers, self.client.pool_size or workers)).run()
+
+    def save_snapshot(self, path: str) -> SchemaSnapshot:
+        """
+        Retrieves all objects with a single request and stores their definitions to a local snapshot file
+        :param path:
+        :return:
+        """
+        response = self.client.send(Command(name=self._get_object_command_name(''), method=COMMAND_METHOD.GET))
+        data, ok = self.client.process_response(response)
+        if not ok:
+            raise CommandExecutionFailureException(data.get('msg') if data else 'Command execution failed')
+        snapshot = SchemaSnapshot(objects=data or [], etag=response.headers.get('ETag'))
+        snapshot.dump(path)
+        self._load_definitions(snapshot.objects)
+        return snapshot
+
+    def load_snapshot(self, path: str, max_age: float = None, revalidate: bool = False) -> bool:
+        """
+        Rebuilds the schema from a local snapshot file without requesting the Custodian.
+        Returns False if the snapshot is missing, broken or older than `max_age` seconds. With `revalidate` the
+        snapshot is checked against the server with a single conditional request: a changed schema is loaded from the
+        response and written to the snapshot file instead
+        :param path:
+        :param max_age:
+        :param revalidate:
+        :return: True if the snapshot was up to date
+        """
+        try:
+            snapshot = SchemaSnapshot.load(path)
+        except (OSError, ValueError, KeyError):
+            return False
+        if max_age is not None and snapshot.age > max_age:
+            return False
+        if revalidate:
+            response = self.client.send(
+                Command(name=self._get_object_command_name(''), method=COMMAND_METHOD.GET),
+                headers={'If-None-Match': snapshot.etag} if snapshot.etag else None
+            )
+            if response.status_code != 304:
+                data, ok = self.client.process_response(response)
+                if not ok:
+                    return False
+                actual_snapshot = SchemaSnapshot(objects=data or [], etag=response.headers.get('ETag'))
+                if actual_snapshot.fingerprint != snapshot.fingerprint:
+                    actual_snapshot.dump(path)
+                    self._load_definitions(actual_snapshot.objects)
+                    return False
+        self._load_definitions(snapshot.objects)
+        return True
+
+    def _load_definitions(self, objects_data: list):
+        """
+        Fills the schema cache and resolves references of all given objects with their definitions
+        :param objects_data:
+        """
+        self.relation_index = None
+        for object_data in objects_data:
+            self.cache.set(object_data['name'], object_data)
+            self.get_reference(object_data['name'])._evaluated = False
+        for object_data in objects_data:
+            self._resolve_reference(object_data)
+
+    def _resolve_reference(self, object_data: dict):
+        """
+        Resolves an already requested reference with the retrieved definition
+        :param object_data:
+        """
+        reference = self._references.get(object_data['name'])
+        if reference is not None and not reference._evaluated:
+            reference._set_definition(ObjectFactory.factory(object_data, objects_manager=self))
+
+    def _invalidate_cache(self, obj: Object):
+        """
+        Drops cached definitions and resolved references of the object and of the objects it links to, because the
+        Custodian maintains reverse relation fields on them
+        :param obj:
+        """
+        self.relation_index = None
+        # avoid fetching definition of a lazy object just to find out its links
+        if not obj._evaluated:
+            self.cache.invalidate()
+            for reference in self._references.values():
+                reference._evaluated = False
+            return
+        object_names = [obj.name]
+        for field in obj.fields.values():
+            if isinstance(field, (RelatedObjectField, GenericField)):
+                if field.obj is not None:
+                    object_names.append(field.obj.name)
+                if getattr(field, 'objs', None):
+                    object_names.extend([x.name for x in field.objs])
+        self.cache.invalidate(*object_names)
+        # references will be resolved again on the next access
+        for object_name in object_names:
+            if object_name in self._references:
+                self._references[object_name]._evaluated = False
+
     @classmethod
     def _get_object_command_name(cls, object_name: str):
         """
@@ -0,0 +1,251 @@
+from typing import List
+
+from custodian.command import Command, COMMAND_METHOD
+from custodian.exceptions import ObjectCreateException, ObjectUpdateException
+from custodian.objects import Object
+from custodian.objects.fields import RelatedObjectField, GenericField, LINK_TYPES
+from custodian.objects.snapshot import SchemaSnapshot
+
+
+class MIGRATION_ACTION:
+    CREATE = 'create'
+    UPDATE = 'update'
+
+
+class MigrationStep:
+    """
+    A single meta request of a migration plan
+    """
+    action = None
+    obj = None
+    dependencies = None
+
+    def __init__(self, action: str, obj: Object, dependencies: List['MigrationStep'] = None):
+        self.action = action
+        self.obj = obj
+        self.dependencies = dependencies or []
+
+    @property
+    def command(self) -> Command:
+        if self.action == MIGRATION_ACTION.CREATE:
+            return Command(name='meta', method=COMMAND_METHOD.PUT)
+        else:
+            return Command(name='/'.join(['meta', self.obj.name]), method=COMMAND_METHOD.POST)
+
+    def __repr__(self):
+        return '<MigrationStep {} "{}">'.format(self.action, self.obj.name)
+
+
+class MigrationPlan:
+    """
+    Ordered list of meta requests which bring the Custodian schema to the desired state.
+    Every step depends only on steps placed before it
+    """
+    steps = None
+    unchanged = None
+
+    def __init__(self, objects_manager, steps: List[MigrationStep], unchanged: List[str]):
+        self._objects_manager = objects_manager
+        self.steps = steps
+        self.unchanged = unchanged
+
+    @property
+    def http_calls(self) -> int:
+        """
+        Number of requests which applying the plan will make
+        """
+        return len(self.steps)
+
+    def apply_step(self, step: MigrationStep):
+        """
+        Sends the step`s request to the Custodian
+        :param step:
+        :raises ObjectCreateException, ObjectUpdateException:
+        """
+        data, ok = self._objects_manager.client.execute(command=step.command, data=step.obj.serialize())
+        self._objects_manager._invalidate_cache(step.obj)
+        if not ok:
+            exception_class = ObjectCreateException if step.action == MIGRATION_ACTION.CREATE \
+                else ObjectUpdateException
+            raise exception_class(data.get('msg') if data else None)
+
+    def apply(self):
+        """
+        Applies all steps one by one
+        :return:
+        """
+        for step in self.steps:
+            self.apply_step(step)
+        return self
+
+    def __iter__(self):
+        return iter(self.steps)
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __str__(self):
+        lines = ['{} step(s), {} unchanged object(s)'.format(len(self.steps), len(self.unchanged))]
+        for i, step in enumerate(self.steps):
+            lines.append('{}. {} {} {}'.format(i + 1, step.command.method.upper(), step.command.name, step.obj.name))
+        return '\n'.join(lines)
+
+
+class MigrationPlanner:
+    """
+    Diffs desired objects against the actual Custodian schema, which is retrieved with a single request, and plans
+    the minimal ordered list of meta requests. Objects missing in the desired list are left untouched
+    """
+
+    def __init__(self, objects_manager):
+        self._objects_manager = objects_manager
+
+    @classmethod
+    def _normalize(cls, object_data: dict, desired_field_names=None) -> dict:
+        """
+        Brings object definition to a comparable form: empty values are dropped, fields are sorted by name.
+        Outer link fields which are not desired are maintained by the Custodian itself and are ignored
+        :param object_data:
+        :param desired_field_names:
+        :return:
+        """
+        fields = []
+        for field_data in object_data.get('fields') or []:
+            if desired_field_names is not None and field_data['name'] not in desired_field_names \
+                    and field_data.get('linkType') == LINK_TYPES.OUTER:
+                continue
+            fields.append({key: value for key, value in field_data.items() if value is not None})
+        return {
+            'name': object_data['name'],
+            'key': object_data.get('key'),
+            'cas': bool(object_data.get('cas')),
+            'fields': sorted(fields, key=lambda x: x['name']),
+            'actions': object_data.get('actions') or []
+        }
+
+    @classmethod
+    def fingerprint(cls, object_data: dict, desired_field_names=None) -> str:
+        return SchemaSnapshot.compute_fingerprint(cls._normalize(object_data, desired_field_names))
+
+    @classmethod
+    def _get_linked_names(cls, field) -> List[str]:
+        if isinstance(field, GenericField):
+            if field.link_type == LINK_TYPES.INNER:
+                return [x.name for x in field.objs or []]
+            return [field.obj.name] if field.obj is not None else []
+        if isinstance(field, RelatedObjectField):
+            return [field.obj.name]
+        return []
+
+    @classmethod
+    def _sort_objects_to_create(cls, objects: List[Object]) -> List[Object]:
+        """
+        Sorts new objects so that objects referenced by inner links go first. Cycles are broken by taking the object
+        with the least number of unsatisfied references
+        :param objects:
+        :return:
+        """
+        pending = {obj.name: obj for obj in objects}
+        dependencies = {}
+        for obj in objects:
+            dependencies[obj.name] = set()
+            for field in obj.fields.values():
+                if getattr(field, 'link_type', None) == LINK_TYPES.INNER:
+                    dependencies[obj.name].update(
+                        x for x in cls._get_linked_names(field) if x in pending and x != obj.name
+                    )
+        ordered = []
+        while pending:
+            ready = [name for name in pending if not dependencies[name] & set(pending)]
+            if not ready:
+                ready = [min(pending, key=lambda x: len(dependencies[x] & set(pending)))]
+            for name in ready:
+                ordered.append(pending.pop(name))
+        return ordered
+
+    def plan(self, objects: List[Object]) -> MigrationPlan:
+        """
+        Builds the migration plan for the desired objects
+        :param objects:
+        :return:
+        """
+        actual = {x['name']: x for x in self._objects_manager._retrieve_all()}
+        new_objects = [obj for obj in objects if obj.name not in actual]
+        changed_objects = [
+            obj for obj in objects if obj.name in actual and
+            self.fingerprint(obj.serialize()) != self.fingerprint(actual[obj.name], set(obj.fields.keys()))
+        ]
+        unchanged = [obj.name for obj in objects if obj.name in actual and obj not in changed_objects]
+
+        steps = []
+        # (object name, field name) -> step after which the object has the field
+        field_steps = {}
+        create_steps = {}
+        deferred = {}
+
+        for obj in self._sort_objects_to_create(new_objects):
+            safe_fields, dependencies = [], []
+            for field in obj.fields.values():
+                linked_names = self._get_linked_names(field)
+                if not linked_names:
+                    safe_fields.append(field)
+                elif field.link_type == LINK_TYPES.INNER and \
+                        all(x in actual or x in create_steps for x in linked_names):
+                    safe_fields.append(field)
+                    dependencies.extend(create_steps[x] for x in linked_names if x in create_steps)
+                else:
+                    deferred.setdefault(obj.name, []).append(field)
+            step = MigrationStep(
+                MIGRATION_ACTION.CREATE,
+                Object(name=obj.name, cas=obj.cas, objects_manager=self._objects_manager, key=obj.key,
+                       fields=safe_fields, actions=obj.actions) if obj.name in deferred else obj,
+                dependencies=dependencies
+            )
+            for field in safe_fields:
+                field_steps[(obj.name, field.name)] = step
+            create_steps[obj.name] = step
+            steps.append(step)
+
+        update_objects = [obj for obj in new_objects if obj.name in deferred] + changed_objects
+        update_steps = []
+        for obj in update_objects:
+            step = MigrationStep(MIGRATION_ACTION.UPDATE, obj)
+            for field in obj.fields.values():
+                field_steps.setdefault((obj.name, field.name), step)
+            update_steps.append(step)
+
+        for step in update_steps:
+            dependencies = [create_steps[step.obj.name]] if step.obj.name in create_steps else []
+            for field in step.obj.fields.values():
+                for linked_name in self._get_linked_names(field):
+                    if field.link_type == LINK_TYPES.OUTER:
+                        # the linked object must have the inner field first
+                        dependency = field_steps.get((linked_name, field.outer_link_field))
+                    else:
+                        dependency = create_steps.get(linked_name)
+                    if dependency is not None and dependency is not step and dependency not in dependencies:
+                        dependencies.append(dependency)
+            step.dependencies = dependencies
+        steps.extend(self._sort_steps(update_steps))
+        return MigrationPlan(self._objects_manager, steps, unchanged)
+
+    @classmethod
+    def _sort_steps(cls, steps: List[MigrationStep]) -> List[MigrationStep]:
+        """
+        Sorts update steps by their dependencies on each other. Dependencies which form a cycle are dropped, the step
+        with the least number of unsatisfied dependencies goes first
+        :param steps:
+        :return:
+        """
+        pending = list(steps)
+        ordered = []
+        while pending:
+            ready = [x for x in pending if not any(d in pending for d in x.dependencies)]
+            if not ready:
+                step = min(pending, key=lambda x: len([d for d in x.dependencies if d in pending]))
+                step.dependencies = [d for d in step.dependencies if d not in pending]
+                ready = [step]
+            for step in ready:
+                pending.remove(step)
+                ordered.append(step)
+        return ordered
@@ -0,0 +1,100 @@
+from typing import List
+
+from custodian.objects import Object
+from custodian.objects.fields import RelatedObjectField, GenericField, LINK_TYPES
+
+
+class Relation:
+    """
+    A link field of an object
+    """
+    obj_name = None
+    field_name = None
+    link_type = None
+    target_names = None
+    outer_link_field = None
+    generic = None
+
+    def __init__(self, obj_name: str, field_name: str, link_type: str, target_names: List[str],
+                 outer_link_field: str = None, generic: bool = False):
+        self.obj_name = obj_name
+        self.field_name = field_name
+        self.link_type = link_type
+        self.target_names = target_names
+        self.outer_link_field = outer_link_field
+        self.generic = generic
+
+    def __repr__(self):
+        return '<Relation {}.{} {} {}>'.format(self.obj_name, self.field_name, self.link_type, self.target_names)
+
+
+class RelationIndex:
+    """
+    Index of all link fields of a schema, built once from resolved objects. Maps inner links to their outer
+    counterparts and back, and generic links to their target objects
+    """
+
+    def __init__(self, objects: List[Object]):
+        self._relations = {}
+        self._reverse = {}
+        self._by_object = {}
+        self._by_target = {}
+        for obj in objects:
+            for field in obj.fields.values():
+                if isinstance(field, GenericField):
+                    if field.link_type == LINK_TYPES.INNER:
+                        target_names = [x.name for x in field.objs or []]
+                    else:
+                        target_names = [field.obj.name] if field.obj is not None else []
+                    self._add(Relation(obj.name, field.name, field.link_type, target_names,
+                                       outer_link_field=field.outer_link_field, generic=True))
+                elif isinstance(field, RelatedObjectField):
+                    self._add(Relation(obj.name, field.name, field.link_type, [field.obj.name],
+                                       outer_link_field=field.outer_link_field))
+        # outer links point to the inner links they reflect
+        for relation in self._relations.values():
+            if relation.link_type == LINK_TYPES.OUTER and relation.target_names:
+                inner_relation = self._relations.get((relation.target_names[0], relation.outer_link_field))
+                if inner_relation is not None and relation.obj_name in inner_relation.target_names:
+                    self._reverse[(relation.obj_name, relation.field_name)] = inner_relation
+                    self._reverse[(inner_relation.obj_name, inner_relation.field_name)] = relation
+
+    def _add(self, relation: Relation):
+        self._relations[(relation.obj_name, relation.field_name)] = relation
+        self._by_object.setdefault(relation.obj_name, []).append(relation)
+        for target_name in relation.target_names:
+            self._by_target.setdefault(target_name, []).append(relation)
+
+    def get(self, obj_name: str, field_name: str) -> Relation:
+        """
+        Returns the relation of the given link field or None
+        """
+        return self._relations.get((obj_name, field_name))
+
+    def get_reverse(self, obj_name: str, field_name: str) -> Relation:
+        """
+        Returns the outer relation of an inner link field and vice versa
+        """
+        return self._reverse.get((obj_name, field_name))
+
+    def get_relations(self, obj_name: str) -> List[Relation]:
+        """
+        Returns link fields of the object
+        """
+        return self._by_object.get(obj_name, [])
+
+    def get_referencing_relations(self, obj_name: str) -> List[Relation]:
+        """
+        Returns link fields of any object which point to the given object
+        """
+        return self._by_target.get(obj_name, [])
+
+    def get_generic_targets(self, obj_name: str, field_name: str) -> List[str]:
+        """
+        Returns names of objects the generic field can point to
+        """
+        relation = self._relations.get((obj_name, field_name))
+        return relation.target_names if relation is not None and relation.generic else []
+
+    def __len__(self):
+        return len(self._relations)
@@ -0,0 +1,74 @@
+import hashlib
+import json
+import os
+import time
+from typing import List
+
+
+class SchemaSnapshot:
+    """
+    Raw definitions of all Custodian objects stored in a compact local file, so a client can rebuild its schema
+    without requesting the server
+    """
+    _format_version = 1
+
+    objects = None
+    created_at = None
+    etag = None
+
+    def __init__(self, objects: List[dict], created_at: float = None, etag: str = None):
+        self.objects = objects
+        self.created_at = created_at if created_at is not None else time.time()
+        self.etag = etag
+
+    @classmethod
+    def compute_fingerprint(cls, objects: List[dict]) -> str:
+        """
+        Returns a digest of the definitions, which does not depend on keys order
+        :param objects:
+        :return:
+        """
+        return hashlib.sha1(
+            json.dumps(objects, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        ).hexdigest()
+
+    @property
+    def fingerprint(self) -> str:
+        return self.compute_fingerprint(self.objects)
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+    def dump(self, path: str):
+        """
+        Writes the snapshot to the file, the file is replaced atomically
+        :param path:
+        """
+        tmp_path = '{}.tmp{}'.format(path, os.getpid())
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'version': self._format_version,
+                'created_at': self.created_at,
+                'etag': self.etag,
+                'fingerprint': self.fingerprint,
+                'objects': self.objects
+            }, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'SchemaSnapshot':
+        """
+        Reads the snapshot from the file
+        :param path:
+        :return:
+        :raises ValueError: if the file is not a valid snapshot
+        """
+        with open(path) as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or data.get('version') != cls._format_version:
+            raise ValueError('Unsupported schema snapshot format')
+        snapshot = cls(objects=data['objects'], created_at=data['created_at'], etag=data.get('etag'))
+        if snapshot.fingerprint != data.get('fingerprint'):
+            raise ValueError('Schema snapshot is corrupted')
+        return snapshot
@@ -0,0 +1,90 @@
+import datetime
+import re
+
+
+class ISO8601Parser:
+    """
+    Strict parser of the RFC 3339 profile of ISO 8601 which the Custodian uses for datetime, date and time values.
+    Methods return None for input which does not conform, so callers can fall back to a heuristic parser
+    """
+    _date_re = re.compile(r'(\d{4})-(\d{2})-(\d{2})$')
+    _time_re = re.compile(
+        r'(\d{2}):(\d{2})(?::(\d{2})(?:[.,](\d{1,9}))?)?([Zz]|[+-]\d{2}(?::?\d{2})?)?$'
+    )
+    _datetime_re = re.compile(
+        r'(\d{4})-(\d{2})-(\d{2})[Tt ](\d{2}):(\d{2})(?::(\d{2})(?:[.,](\d{1,9}))?)?([Zz]|[+-]\d{2}(?::?\d{2})?)?$'
+    )
+    # offsets seen in responses are few, their tzinfo instances are shared
+    _timezones = {'Z': datetime.timezone.utc, 'z': datetime.timezone.utc}
+
+    @classmethod
+    def _get_timezone(cls, offset: str):
+        if offset is None:
+            return None
+        timezone = cls._timezones.get(offset)
+        if timezone is None:
+            digits = offset[1:].replace(':', '')
+            minutes = int(digits[:2]) * 60 + int(digits[2:] or 0)
+            if minutes == 0:
+                timezone = datetime.timezone.utc
+            else:
+                timezone = datetime.timezone(datetime.timedelta(minutes=-minutes if offset[0] == '-' else minutes))
+            cls._timezones[offset] = timezone
+        return timezone
+
+    @classmethod
+    def _get_microseconds(cls, fraction: str) -> int:
+        return int(fraction[:6].ljust(6, '0')) if fraction else 0
+
+    @classmethod
+    def parse_datetime(cls, value: str):
+        """
+        Returns datetime.datetime or None if the value is not an RFC 3339 datetime
+        :param value:
+        :return:
+        """
+        match = cls._datetime_re.match(value)
+        if match is None:
+            return None
+        year, month, day, hour, minute, second, fraction, offset = match.groups()
+        try:
+            return datetime.datetime(
+                int(year), int(month), int(day), int(hour), int(minute), int(second or 0),
+                cls._get_microseconds(fraction), cls._get_timezone(offset)
+            )
+        except ValueError:
+            return None
+
+    @classmethod
+    def parse_date(cls, value: str):
+        """
+        Returns datetime.date or None if the value is not an RFC 3339 date
+        :param value:
+        :return:
+        """
+        match = cls._date_re.match(value)
+        if match is None:
+            return None
+        year, month, day = match.groups()
+        try:
+            return datetime.date(int(year), int(month), int(day))
+        except ValueError:
+            return None
+
+    @classmethod
+    def parse_time(cls, value: str):
+        """
+        Returns datetime.time or None if the value is not an RFC 3339 time
+        :param value:
+        :return:
+        """
+        match = cls._time_re.match(value)
+        if match is None:
+            return None
+        hour, minute, second, fraction, offset = match.groups()
+        try:
+            return datetime.time(
+                int(hour), int(minute), int(second or 0), cls._get_microseconds(fraction), cls._get_timezone(offset)
+            )
+        except ValueError:
+            return None
@@ -0,0 +1,188 @@
+import datetime
+from array import array
+from typing import List
+
+from custodian.objects import Object
+from custodian.objects.fields import BaseField, NumberField, IntegerField, BooleanField, DateTimeField, DateField
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+_EPOCH_DATE = datetime.date(1970, 1, 1)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+# field class, array typecode and NumPy dtype of typed columns, other fields are kept in lists
+_TYPED_COLUMNS = (
+    (BooleanField, 'b', 'bool'),
+    (IntegerField, 'q', 'int64'),
+    (NumberField, 'd', 'float64'),
+    (DateTimeField, 'q', 'datetime64[us]'),
+    (DateField, 'q', 'datetime64[D]'),
+)
+
+
+class RecordBatch:
+    """
+    Columnar container of records: one array per field, built straight from a bulk response without instantiating
+    records. Datetime columns keep microseconds since the epoch in UTC, values without offset are considered to be in
+    UTC; date columns keep days since the epoch
+    """
+    obj = None
+
+    def __init__(self, obj: Object, columns: dict, nulls: dict, length: int):
+        """
+        :param obj:
+        :param columns: field name -> array or list of values
+        :param nulls: field name -> bytearray where 1 marks a null value, only for typed columns with nulls
+        :param length:
+        """
+        self.obj = obj
+        self._columns = columns
+        self._nulls = nulls
+        self._length = length
+
+    @classmethod
+    def _get_column_type(cls, field: BaseField):
+        """
+        Returns (typecode, dtype) of the field`s column, (None, 'object') for columns kept as lists
+        """
+        for field_class, typecode, dtype in _TYPED_COLUMNS:
+            if isinstance(field, field_class):
+                return typecode, dtype
+        return None, 'object'
+
+    @classmethod
+    def _to_storage_value(cls, field: BaseField, value):
+        if isinstance(field, DateTimeField):
+            value = field.from_raw(value)
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=datetime.timezone.utc)
+            return (value - _EPOCH) // _MICROSECOND
+        if isinstance(field, DateField):
+            return (field.from_raw(value) - _EPOCH_DATE).days
+        return field.from_raw(value)
+
+    @classmethod
+    def from_records_data(cls, obj: Object, records_data: List[dict], field_names: List[str] = None) -> 'RecordBatch':
+        """
+        Builds a batch from a list of raw record values
+        :param obj:
+        :param records_data:
+        :param field_names: fields to keep, all fields of the object by default
+        :return:
+        """
+        columns, nulls = {}, {}
+        for field in obj.fields.values():
+            if field_names is not None and field.name not in field_names:
+                continue
+            name = field.name
+            typecode, _ = cls._get_column_type(field)
+            raw_values = [x.get(name) for x in records_data]
+            if typecode is None:
+                columns[name] = [field.from_raw(x) if x else x for x in raw_values]
+                continue
+            column = array(typecode, bytes(array(typecode).itemsize * len(raw_values)))
+            mask = None
+            for i, value in enumerate(raw_values):
+                if value is None:
+                    if mask is None:
+                        mask = bytearray(len(raw_values))
+                    mask[i] = 1
+                elif value:
+                    # falsy values are zeros already
+                    column[i] = cls._to_storage_value(field, value)
+            columns[name] = column
+            if mask is not None:
+                nulls[name] = mask
+        return cls(obj, columns, nulls, len(records_data))
+
+    @property
+    def field_names(self) -> List[str]:
+        return list(self._columns.keys())
+
+    def column(self, name: str):
+        """
+        Returns values of the field, null values of typed columns are stored as zeros
+        :param name:
+        :return:
+        """
+        return self._columns[name]
+
+    def is_null(self, name: str, index: int) -> bool:
+        column = self._columns[name]
+        if name in self._nulls:
+            return bool(self._nulls[name][index])
+        return isinstance(column, list) and column[index] is None
+
+    def select(self, *names: str) -> 'RecordBatch':
+        """
+        Returns a batch of the given columns, columns are shared with the current batch
+        :param names:
+        :return:
+        """
+        return RecordBatch(
+            self.obj, {x: self._columns[x] for x in names}, {x: self._nulls[x] for x in names if x in self._nulls},
+            self._length
+        )
+
+    def __getitem__(self, name: str):
+        return self.column(name)
+
+    def __contains__(self, name: str):
+        return name in self._columns
+
+    def __len__(self):
+        return self._length
+
+    def __repr__(self):
+        return '<RecordBatch of "{}" object, {} record(s), columns: {}>'.format(
+            self.obj.name, self._length, ', '.join(self._columns)
+        )
+
+    @classmethod
+    def _check_numpy(cls):
+        if numpy is None:
+            raise ImportError('NumPy is required to export a RecordBatch')
+
+    def _get_dtype(self, name: str) -> str:
+        return self._get_column_type(self.obj.fields[name])[1]
+
+    def _to_numpy_column(self, name: str):
+        column = self._columns[name]
+        dtype = self._get_dtype(name)
+        if isinstance(column, list):
+            values = numpy.empty(len(column), dtype=object)
+            values[:] = column
+            return values
+        # typed columns are viewed without copying
+        values = numpy.frombuffer(column, dtype='int8' if dtype == 'bool' else column.typecode)
+        return values.view(dtype) if values.dtype != numpy.dtype(dtype) else values
+
+    def to_numpy(self, name: str = None):
+        """
+        Exports a column as a NumPy array, typed columns with nulls are exported as masked arrays.
+        Without a name exports all columns as a structured array, where nulls are NaN for number columns, NaT for
+        datetime columns and zeros for other typed columns
+        :param name:
+        :return:
+        """
+        self._check_numpy()
+        if name is not None:
+            values = self._to_numpy_column(name)
+            if name in self._nulls:
+                return numpy.ma.MaskedArray(values, mask=numpy.frombuffer(self._nulls[name], dtype=bool))
+            return values
+        structured = numpy.empty(self._length, dtype=[(x, self._get_dtype(x)) for x in self._columns])
+        for column_name in self._columns:
+            values = self._to_numpy_column(column_name)
+            structured[column_name] = values
+            if column_name in self._nulls:
+                mask = numpy.frombuffer(self._nulls[column_name], dtype=bool)
+                if values.dtype.kind == 'f':
+                    structured[column_name][mask] = numpy.nan
+                elif values.dtype.kind == 'M':
+                    structured[column_name][mask] = numpy.datetime64('NaT')
+        return structured
@@ -0,0 +1,142 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class QueryCacheEntry:
+    data = None
+    size = None
+    expires_at = None
+
+    def __init__(self, data, size: int, expires_at: float = None):
+        self.data = data
+        self.size = size
+        self.expires_at = expires_at
+
+    def is_fresh(self) -> bool:
+        return self.expires_at is None or self.expires_at > time.monotonic()
+
+
+class QueryCache:
+    """
+    Keeps raw responses of bulk queries for `ttl` seconds, they are decoded on every hit. Least recently used entries
+    are evicted once there are more than `max_entries` entries or their responses take more than `max_size` bytes.
+    Entries of an object are invalidated by writes to the object made through the RecordsManager; a result which was
+    requested before the invalidation is not stored
+    """
+    ttl = None
+    max_entries = None
+    max_size = None
+    hits = None
+    misses = None
+    evictions = None
+    invalidations = None
+    size = None
+
+    def __init__(self, ttl: float = 5, max_entries: int = 256, max_size: int = 32 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.size = 0
+        self._entries = OrderedDict()
+        self._generations = {}
+        # bumped when the whole cache is invalidated
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_key(cls, object_name: str, query_string: str, params: dict) -> tuple:
+        return object_name, query_string, tuple(sorted((key, str(value)) for key, value in params.items()))
+
+    def get(self, key: tuple):
+        """
+        Returns cached data for the key or None
+        :param key:
+        :return:
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not entry.is_fresh():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.data
+
+    def get_generation(self, object_name: str) -> tuple:
+        """
+        Returns the invalidation counters of the object, which are passed to `set` to detect results outdated while
+        they were being requested
+        :param object_name:
+        :return:
+        """
+        return self._epoch, self._generations.get(object_name, 0)
+
+    def set(self, key: tuple, data, size: int, generation: tuple = None):
+        """
+        Stores the query result, results larger than the cache are not stored
+        :param key:
+        :param data:
+        :param size: size of the response in bytes
+        :param generation: generation of the object the query was sent at
+        """
+        if size > self.max_size or self.max_entries < 1:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if generation is not None and generation != (self._epoch, self._generations.get(key[0], 0)):
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = QueryCacheEntry(data, size, expires_at=expires_at)
+            self.size += size
+            while len(self._entries) > self.max_entries or self.size > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: tuple):
+        self.size -= self._entries.pop(key).size
+
+    def invalidate(self, *object_names: str):
+        """
+        Drops entries of the given objects or the whole cache if no names are given
+        :param object_names:
+        """
+        with self._lock:
+            if object_names:
+                for object_name in object_names:
+                    self._generations[object_name] = self._generations.get(object_name, 0) + 1
+                keys = [x for x in self._entries if x[0] in object_names]
+            else:
+                self._epoch += 1
+                keys = list(self._entries)
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hit_ratio,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'entries': len(self._entries),
+            'size': self.size
+        }
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,175 @@
+from custodian.exceptions import FieldValidationException
+from custodian.objects import Object
+from custodian.objects.fields import BaseField, ArrayField, ObjectField, GenericField, DateTimeField, DateField, \
+    TimeField, StringField, NumberField, IntegerField, BooleanField
+
+
+class RecordCodec:
+    """
+    Generates decode and encode functions specialised for the object`s fields, so hydrating and serializing a record
+    does not dispatch through from_raw/to_raw of every field:
+    +   array, object and generic values are passed as is
+    +   number, string and bool values are cast with the builtin type directly
+    +   not-null validation is fused into encoding
+    +   raw values of lazily hydrated records are sent as is unless the field has been accessed, values of other
+        than scalar and temporal fields are decoded and encoded again, since their raw form differs from the sent one
+    +   fields which were not loaded are skipped unless they have been assigned
+    Fields with custom from_raw/to_raw are still called through them
+    """
+    _temporal_fields = (DateTimeField, DateField, TimeField)
+    # fields which raw values are sent in the form they are received
+    _raw_safe_fields = (StringField, NumberField, IntegerField, BooleanField) + _temporal_fields
+
+    @classmethod
+    def _get_decoder(cls, field: BaseField):
+        """
+        Returns the callable which converts a raw value of the field, None means the value is used as is
+        :param field:
+        :return:
+        """
+        field_class = type(field)
+        if field_class.from_raw is BaseField.from_raw:
+            if isinstance(field, (ArrayField, ObjectField)):
+                return None
+            if isinstance(field.cast_func, type):
+                return field.cast_func
+        elif field_class.from_raw is GenericField.from_raw:
+            return None
+        return field.from_raw
+
+    @classmethod
+    def _get_encoder(cls, field: BaseField):
+        """
+        Returns the expression template which converts a not-null value of the field to its raw form and whether the
+        result may be None
+        :param field:
+        :return:
+        """
+        field_class = type(field)
+        if field_class.to_raw is BaseField.to_raw:
+            if isinstance(field, (ArrayField, ObjectField)):
+                return '{value}', False
+            if isinstance(field.cast_func, type):
+                return '{cast}({value})', False
+        if any(field_class.to_raw is x.to_raw for x in cls._temporal_fields):
+            return '{value}.isoformat()', False
+        return '{to_raw}({value})', True
+
+    @classmethod
+    def _get_attribute(cls, name: str) -> str:
+        if name.isidentifier():
+            return 'record.{}'.format(name)
+        return 'getattr(record, {!r})'.format(name)
+
+    @classmethod
+    def _set_attribute(cls, name: str, value: str) -> str:
+        if name.isidentifier():
+            return 'record.{} = {}'.format(name, value)
+        return 'setattr(record, {!r}, {})'.format(name, value)
+
+    @classmethod
+    def compile_decoder(cls, obj: Object):
+        """
+        Returns decode(record, values) function which assigns converted raw values to the record
+        :param obj:
+        :return:
+        """
+        namespace = {}
+        lines = ['def decode(record, values):', '    get = values.get']
+        for i, field in enumerate(obj.fields.values()):
+            decoder = cls._get_decoder(field)
+            lines.append('    value = get({!r})'.format(field.name))
+            if decoder is None:
+                lines.append('    ' + cls._set_attribute(field.name, 'value'))
+            else:
+                namespace['decode_{}'.format(i)] = decoder
+                # empty values are assigned as is
+                lines.append('    ' + cls._set_attribute(field.name, 'decode_{}(value) if value else value'.format(i)))
+        exec('\n'.join(lines), namespace)
+        return namespace['decode']
+
+    @classmethod
+    def _get_loader(cls, record_class, name: str):
+        """
+        Returns the callable which returns the value already assigned to the record and raises AttributeError or
+        KeyError if it is not, without decoding the raw value
+        """
+        descriptor = record_class.__dict__.get(name)
+        if descriptor is not None:
+            return descriptor.__get__
+        return lambda record: record.__dict__[name]
+
+    @classmethod
+    def _get_encoding_lines(cls, field: BaseField, i: int, indent: str) -> list:
+        expression, nullable = cls._get_encoder(field)
+        expression = expression.format(value='value', cast='cast_{}'.format(i), to_raw='to_raw_{}'.format(i))
+        lines = ['if value is None:']
+        if field.optional:
+            lines.append('    pass')
+        else:
+            lines.append('    raise FieldValidationException({!r})'.format(
+                'Null value in "{}" violates not-null constraint'.format(field.name)
+            ))
+        lines.append('else:')
+        if nullable:
+            # custom to_raw may return None, such values are skipped
+            lines.append('    value = ' + expression)
+            lines.append('    if value is not None:')
+            lines.append('        data[{!r}] = value'.format(field.name))
+        else:
+            lines.append('    data[{!r}] = {}'.format(field.name, expression))
+        return [indent + x for x in lines]
+
+    @classmethod
+    def compile_encoder(cls, obj: Object, record_class):
+        """
+        Returns encode(record) function which validates record values and returns them in raw form, empty values are
+        skipped. Values of lazily hydrated records which have not been accessed are returned as they were received,
+        fields which were not loaded and have not been assigned since are skipped
+        :param obj:
+        :param record_class:
+        :return:
+        """
+        namespace = {'FieldValidationException': FieldValidationException}
+        lines = ['def encode(record):', '    raw = record._raw', '    unloaded = record._unloaded',
+                 '    if raw is not None or unloaded is not None:',
+                 '        return encode_partial(record, raw or {}, unloaded or ())', '    data = {}']
+        partial_lines = ['def encode_partial(record, raw, unloaded):', '    data = {}']
+        for i, field in enumerate(obj.fields.values()):
+            namespace['cast_{}'.format(i)] = field.cast_func
+            namespace['to_raw_{}'.format(i)] = field.to_raw
+            namespace['load_{}'.format(i)] = cls._get_loader(record_class, field.name)
+            lines.append('    value = ' + cls._get_attribute(field.name))
+            lines.extend(cls._get_encoding_lines(field, i, '    '))
+            partial_lines.extend([
+                '    try:',
+                '        value = load_{}(record)'.format(i),
+                '    except (AttributeError, KeyError):',
+                '        value = raw.get({!r})'.format(field.name),
+                '        if {!r} in unloaded:'.format(field.name),
+                '            pass',
+            ])
+            if type(field) in cls._raw_safe_fields:
+                partial_lines.extend([
+                    '        elif value is None:',
+                    '            ' + ('pass' if field.optional else 'raise FieldValidationException({!r})'.format(
+                        'Null value in "{}" violates not-null constraint'.format(field.name)
+                    )),
+                    '        else:',
+                    '            data[{!r}] = value'.format(field.name),
+                ])
+            else:
+                # the raw value is converted as if the field had been accessed
+                namespace['from_raw_{}'.format(i)] = field.from_raw
+                partial_lines.extend([
+                    '        else:',
+                    '            if value:',
+                    '                value = from_raw_{}(value)'.format(i),
+                ])
+                partial_lines.extend(cls._get_encoding_lines(field, i, '            '))
+            partial_lines.append('    else:')
+            partial_lines.extend(cls._get_encoding_lines(field, i, '        '))
+        lines.append('    return data')
+        partial_lines.append('    return data')
+        exec('\n'.join(partial_lines + lines), namespace)
+        return namespace['encode']
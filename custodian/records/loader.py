@@ -0,0 +1,119 @@
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+from custodian.objects import Object
+
+
+class RecordFuture(Future):
+    """
+    Future of a record requested from a RecordLoader. Waiting for a record requested within a batch scope dispatches
+    pending requests at once, so a scope never waits for itself
+    """
+
+    def __init__(self, loader: 'RecordLoader', dispatch_on_wait: bool = False):
+        super().__init__()
+        self._loader = loader
+        self._dispatch_on_wait = dispatch_on_wait
+
+    def result(self, timeout=None):
+        if self._dispatch_on_wait and not self.done():
+            self._loader.dispatch()
+        return super().result(timeout=timeout)
+
+
+class RecordLoader:
+    """
+    Batches retrieval of single records: records requested within a time window, or within a batch scope, are
+    retrieved with one "in" query per object, and each caller gets its own record or None. Duplicate requests of a
+    record share the same future
+    """
+    window = None
+
+    def __init__(self, manager, window: float = 0.005):
+        """
+        :param manager: RecordsManager
+        :param window: seconds requests are collected for before they are dispatched
+        """
+        self.manager = manager
+        self.window = window
+        self._pending = {}
+        self._timer = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _in_batch(self) -> bool:
+        return getattr(self._local, 'depth', 0) > 0
+
+    def load(self, obj: Object, record_id) -> RecordFuture:
+        """
+        Requests the record, returns the future of the record or None if it does not exist
+        :param obj:
+        :param record_id:
+        :return:
+        """
+        in_batch = self._in_batch()
+        with self._lock:
+            obj_futures = self._pending.setdefault(obj.name, (obj, {}))[1]
+            future = obj_futures.get(record_id)
+            if future is None:
+                future = obj_futures[record_id] = RecordFuture(self, dispatch_on_wait=in_batch)
+            if not in_batch and self._timer is None:
+                self._timer = threading.Timer(self.window, self.dispatch)
+                self._timer.daemon = True
+                self._timer.start()
+        return future
+
+    def get(self, obj: Object, record_id):
+        """
+        Requests the record and waits for it
+        :param obj:
+        :param record_id:
+        :return:
+        """
+        return self.load(obj, record_id).result()
+
+    @contextmanager
+    def batch(self):
+        """
+        Collects records requested by the current thread within the scope and dispatches them at its end or once
+        any of them is waited for
+        """
+        self._local.depth = getattr(self._local, 'depth', 0) + 1
+        try:
+            yield self
+        finally:
+            self._local.depth -= 1
+            if not self._local.depth:
+                self.dispatch()
+
+    def dispatch(self):
+        """
+        Retrieves all pending records
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        for obj, futures in pending.values():
+            self._resolve(obj, futures)
+
+    def _resolve(self, obj: Object, futures: dict):
+        futures = {x: y for x, y in futures.items() if y.set_running_or_notify_cancel()}
+        if not futures:
+            return
+        try:
+            # oversized filters are split into chunks by the query
+            records = self.manager.query(obj).filter(**{'{}__in'.format(obj.key): list(futures)})._evaluate()
+        except Exception as e:
+            for future in futures.values():
+                future.set_exception(e)
+            return
+        # keys may be requested as strings
+        records_by_pk = {}
+        for record in records:
+            records_by_pk[record.get_pk()] = record
+            records_by_pk[str(record.get_pk())] = record
+        for record_id, future in futures.items():
+            future.set_result(records_by_pk.get(record_id, records_by_pk.get(str(record_id))))
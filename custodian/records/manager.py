@@ -1,8 +1,17 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import requests
+
 from custodian.command import Command, COMMAND_METHOD
-from custodian.exceptions import CommandExecutionFailureException, RecordAlreadyExistsException, ObjectUpdateException, \
-    RecordUpdateException, CasFailureException, ObjectDeletionException
+from custodian.exceptions import CommandExecutionFailureException, RecordAlreadyExistsException, \
+    RecordUpdateException, CasFailureException, QueryException, BulkOperationException, BulkUpdateException, \
+    BulkDeleteException
 from custodian.objects import Object
-from custodian.records.model import Record
+from custodian.records.cache import QueryCache
+from custodian.records.loader import RecordLoader
+from custodian.records.model import Record, RecordClassFactory
 from custodian.records.query import Query
 
 
@@ -10,8 +19,25 @@ class RecordsManager:
     _base_single_command_name = 'data/single'
     _base_bulk_command_name = 'data/bulk'
 
-    def __init__(self, client):
+    def __init__(self, client, lazy: bool = False, cache: QueryCache = None, max_in_size: int = 500,
+                 loader: RecordLoader = None):
+        """
+        :param client:
+        :param lazy: hydrate queried records lazily, fields are decoded on first access
+        :param cache: cache of query results, results are not cached by default
+        :param max_in_size: number of values of an "in" filter above which queries are split into several requests,
+        None disables splitting
+        :param loader: batches `get` calls without projection, records are retrieved one by one by default
+        """
         self.client = client
+        self.lazy = lazy
+        self.cache = cache
+        self.max_in_size = max_in_size
+        self.loader = loader
+
+    def _invalidate_cache(self, obj: Object):
+        if self.cache is not None:
+            self.cache.invalidate(obj.name)
 
     def _get_single_record_command_name(self, obj: Object, record_id=None) -> str:
         """
@@ -46,7 +72,10 @@ class RecordsManager:
             params=kwargs
         )
         if ok:
-            return Record(obj=record.obj, **data)
+            self._invalidate_cache(record.obj)
+            created_record = Record(obj=record.obj, **data)
+            created_record.mark_clean()
+            return created_record
         elif data.get('msg', '').find('duplicate') != -1:
             raise RecordAlreadyExistsException
         else:
@@ -59,11 +88,13 @@ class RecordsManager:
         data, ok = self.client.execute(
             command=Command(name=self._get_single_record_command_name(record.obj, record.get_pk()),
                             method=COMMAND_METHOD.POST),
-            data=record.serialize(),
+            data=record.serialize_changes(),
             params=kwargs
         )
         if ok:
+            self._invalidate_cache(record.obj)
             record.__init__(obj=record.obj, **data)
+            record.mark_clean()
             return record
         else:
             if data.get('code') == 'cas_failed':
@@ -83,37 +114,130 @@ class RecordsManager:
                 method=COMMAND_METHOD.DELETE
             )
         )
+        self._invalidate_cache(record.obj)
         setattr(record, record.obj.key, None)
 
-    def get(self, obj: Object, record_id: str, **kwargs):
+    def get(self, obj: Object, record_id: str, only: List[str] = None, exclude: List[str] = None, **kwargs):
         """
         Retrieves an existing record from Custodian
         :param obj:
         :param record_id:
+        :param only: fields to retrieve, related fields are referenced with "__", e.g. "address__city"
+        :param exclude: fields not to retrieve
         :return:
         """
+        if self.loader is not None and not (only or exclude or kwargs):
+            return self.loader.get(obj, record_id)
+        params = {**kwargs, **self._get_projection_params(obj, only, exclude)}
         data, ok = self.client.execute(
             command=Command(name=self._get_single_record_command_name(obj, record_id), method=COMMAND_METHOD.GET),
-            params=kwargs
+            params=params
         )
-        return Record(obj=obj, **data) if ok else None
+        if not ok:
+            return None
+        return Record.from_raw(obj, data, lazy=self.lazy, unloaded=self._get_unloaded_fields(obj, **params))
 
-    def _query(self, obj: Object, query_string: str, **kwargs):
+    @classmethod
+    def _get_projection_params(cls, obj: Object, only: List[str] = None, exclude: List[str] = None) -> dict:
+        """
+        Returns query parameters of the projection, the object`s key is always retrieved
+        :param obj:
+        :param only:
+        :param exclude:
+        :return:
+        """
+        params = {}
+        if only:
+            only = [x.replace('__', '.') for x in only]
+            params['only'] = only if obj.key in only else [obj.key] + only
+        if exclude:
+            exclude = [x.replace('__', '.') for x in exclude]
+            if obj.key in exclude:
+                raise QueryException('The object`s key cannot be excluded')
+            params['exclude'] = exclude
+        return params
+
+    @classmethod
+    def _get_unloaded_fields(cls, obj: Object, only: List[str] = None, exclude: List[str] = None, **kwargs):
+        """
+        Returns names of the object`s fields which are not retrieved with the projection or None
+        :param obj:
+        :param only:
+        :param exclude:
+        :return:
+        """
+        unloaded = set()
+        if only:
+            # related fields with projection of their own fields are retrieved
+            loaded = {x.split('.')[0] for x in only}
+            unloaded.update(x for x in obj.fields if x not in loaded)
+        if exclude:
+            unloaded.update(x for x in exclude if '.' not in x and x in obj.fields)
+        return frozenset(unloaded) if unloaded else None
+
+    def _query(self, obj: Object, query_string: str, lazy: bool = None, **kwargs):
         """
         Performs an Custodian API call and returns a list of records
         :param obj:
         :param query_string:
+        :param lazy: overrides the manager`s hydration mode
         :return:
         """
-        data, _ = self.client.execute(
-            command=Command(name=self._get_bulk_command_name(obj), method=COMMAND_METHOD.GET),
-            params={'q': query_string, **kwargs}
+        return self._hydrate(obj, self._query_raw(obj, query_string, **kwargs), lazy=lazy, **kwargs)
+
+    def _hydrate(self, obj: Object, data: list, lazy: bool = None, **kwargs):
+        """
+        Instantiates records of raw record values retrieved with the given query parameters
+        :param obj:
+        :param data:
+        :param lazy: overrides the manager`s hydration mode
+        :return:
+        """
+        return RecordClassFactory.hydrate(
+            obj, data, lazy=self.lazy if lazy is None else lazy, unloaded=self._get_unloaded_fields(obj, **kwargs)
         )
 
-        records = []
-        for record_data in data:
-            records.append(Record(obj=obj, **record_data))
-        return records
+    def _query_raw(self, obj: Object, query_string: str, **kwargs) -> list:
+        """
+        Performs an Custodian API call and returns a list of raw record values
+        :param obj:
+        :param query_string:
+        :return:
+        """
+        command = Command(name=self._get_bulk_command_name(obj), method=COMMAND_METHOD.GET)
+        params = {'q': query_string, **kwargs}
+        if self.cache is None:
+            data, _ = self.client.execute(command=command, params=params)
+            return data
+        key = QueryCache.get_key(obj.name, query_string, kwargs)
+        content = self.cache.get(key)
+        if content is not None:
+            # responses are decoded on every hit, so records never share mutable values with the cache
+            return json.loads(content).get('data')
+        generation = self.cache.get_generation(obj.name)
+        response = self.client.send(command, params=params)
+        data, ok = self.client.process_response(response)
+        if ok and response.content:
+            self.cache.set(key, response.content, len(response.content), generation=generation)
+        return data
+
+    def _count(self, obj: Object, query_string: str, **kwargs):
+        """
+        Performs an Custodian API call with a single record page and returns the total number of matching records.
+        The "total_count" member of the response is optional, None is returned if the server does not report it or
+        responds with no content
+        :param obj:
+        :param query_string: query with limit(0,1) applied
+        :return:
+        """
+        response = self.client.send(
+            Command(name=self._get_bulk_command_name(obj), method=COMMAND_METHOD.GET),
+            params={'q': query_string, **kwargs}
+        )
+        data, ok = self.client.process_response(response)
+        if not ok:
+            raise CommandExecutionFailureException(data.get('msg') if data else None)
+        return response.json().get('total_count') if response.content else None
 
     def query(self, obj: Object, depth=1) -> Query:
         """
@@ -134,59 +258,122 @@ class RecordsManager:
             assert obj.name == record.obj.name, 'Attempted to perform bulk operation on the list of diverse records'
         return True
 
-    def bulk_create(self, *records: Record):
+    def _execute_bulk(self, obj: Object, method: str, records: tuple, get_record_data, apply_result,
+                      batch_size: int = None, concurrency: int = 1,
+                      exception_class=BulkOperationException) -> list:
+        """
+        Sends records in batches of batch_size records, up to `concurrency` batches at once. All records are
+        serialized before any batch is sent, so records failing validation raise without anything being written. The
+        result of every batch is applied to its records. Batches are sent even if some of them are rejected by the
+        server, fail to be transported or their result fails to be applied
+        :param obj:
+        :param method:
+        :param records:
+        :param get_record_data: callable(record) -> data of the record to send
+        :param apply_result: callable(records, data) applying the batch`s result to its records
+        :param batch_size: number of records per request, all records are sent with one request by default
+        :param concurrency: number of batches sent at once, bounded by the client`s connection pool size
+        :param exception_class: BulkOperationException subclass raised if any batch failed
+        :return:
+        :raises BulkOperationException: if any batch failed
+        """
+        batch_size = batch_size or len(records)
+        batches = [records[i:i + batch_size] for i in range(0, len(records), batch_size)]
+        batches_data = [[get_record_data(x) for x in batch] for batch in batches]
+        command = Command(name=self._get_bulk_command_name(obj), method=method)
+        local_errors = []
+
+        def execute(batch, batch_data):
+            try:
+                data, ok = self.client.execute(command=command, data=batch_data)
+                if not ok:
+                    return data.get('msg') if data else None
+                apply_result(batch, data)
+            except (CommandExecutionFailureException, requests.RequestException) as e:
+                return str(e)
+            except Exception as e:
+                # the batch may be written already, so the operation is not interrupted
+                local_errors.append(e)
+                return str(e)
+            return None
+
+        workers = min(concurrency, self.client.pool_size or concurrency, len(batches))
+        try:
+            if workers > 1:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    errors = list(executor.map(execute, batches, batches_data))
+            else:
+                errors = [execute(x, y) for x, y in zip(batches, batches_data)]
+        finally:
+            if batches:
+                self._invalidate_cache(obj)
+        failures = [(list(x), y) for x, y in zip(batches, errors) if y is not None]
+        succeeded = [record for batch, error in zip(batches, errors) if error is None for record in batch]
+        if failures:
+            raise exception_class(failures, succeeded) from (local_errors[0] if local_errors else None)
+        return succeeded
+
+    def bulk_create(self, *records: Record, batch_size: int = None, concurrency: int = 1):
         """
         Creates new records in the Custodian
         :param records:
+        :param batch_size: number of records per request, all records are sent with one request by default
+        :param concurrency: number of requests sent at once
         :return:
+        :raises BulkOperationException: with records of failed batches
         """
         self._check_records_have_same_object(*records)
         obj = records[0].obj
-        data, ok = self.client.execute(
-            command=Command(name=self._get_bulk_command_name(obj), method=COMMAND_METHOD.PUT),
-            data=[record.serialize() for record in records]
+        return self._execute_bulk(
+            obj, COMMAND_METHOD.PUT, records, lambda x: x.serialize(), self._apply_bulk_result(obj),
+            batch_size=batch_size, concurrency=concurrency
         )
-        if ok:
-            for i in range(0, len(data)):
-                records[i].__init__(obj, **data[i])
-            return list(records)
-        else:
-            raise CommandExecutionFailureException(data.get('msg'))
 
-    def bulk_update(self, *records: Record):
+    def bulk_update(self, *records: Record, batch_size: int = None, concurrency: int = 1):
         """
+        Updates existing records in the Custodian
+        :param records:
+        :param batch_size: number of records per request, all records are sent with one request by default
+        :param concurrency: number of requests sent at once
         :return:
+        :raises BulkUpdateException: with records of failed batches
         """
         self._check_records_have_same_object(*records)
         obj = records[0].obj
-        data, ok = self.client.execute(
-            command=Command(name=self._get_bulk_command_name(obj), method=COMMAND_METHOD.POST),
-            data=[record.serialize() for record in records]
+        return self._execute_bulk(
+            obj, COMMAND_METHOD.POST, records, lambda x: x.serialize_changes(), self._apply_bulk_result(obj),
+            batch_size=batch_size, concurrency=concurrency, exception_class=BulkUpdateException
         )
-        if ok:
-            for i in range(0, len(data)):
-                records[i].__init__(obj, **data[i])
-            return list(records)
-        else:
-            raise ObjectUpdateException(data.get('msg'))
 
-    def bulk_delete(self, *records: Record):
+    @classmethod
+    def _apply_bulk_result(cls, obj: Object):
+        def apply_result(records, data):
+            for record, record_data in zip(records, data):
+                record.__init__(obj, **record_data)
+                record.mark_clean()
+
+        return apply_result
+
+    def bulk_delete(self, *records: Record, batch_size: int = None, concurrency: int = 1):
         """
         Deletes records from the Custodian
+        :param records:
+        :param batch_size: number of records per request, all records are sent with one request by default
+        :param concurrency: number of requests sent at once
         :return:
+        :raises BulkDeleteException: with records of failed batches
         """
         if records:
             self._check_records_have_same_object(*records)
             obj = records[0].obj
-            data, ok = self.client.execute(
-                command=Command(name=self._get_bulk_command_name(obj), method=COMMAND_METHOD.DELETE),
-                data=[{obj.key: record.get_pk()} for record in records]
+
+            def apply_result(batch, data):
+                for record in batch:
+                    setattr(record, obj.key, None)
+
+            return self._execute_bulk(
+                obj, COMMAND_METHOD.DELETE, records, lambda x: {obj.key: x.get_pk()}, apply_result,
+                batch_size=batch_size, concurrency=concurrency, exception_class=BulkDeleteException
             )
-            if ok:
-                for record in records:
-                    record.id = None
-                return list(records)
-            else:
-                raise ObjectDeletionException(data.get('msg'))
         else:
             return []
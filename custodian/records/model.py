@@ -1,9 +1,52 @@
-from custodian.exceptions import FieldValidationException
+from copy import deepcopy
+
+from custodian.exceptions import FieldValidationException, FieldDoesNotExistException
 from custodian.objects import Object
+from custodian.records.codec import RecordCodec
 
 
 class Record:
-    obj = None
+    # _raw keeps values received from the Custodian for fields which are not decoded yet,
+    # _unloaded keeps names of fields which were not retrieved,
+    # _dirty keeps names of fields changed since the record was received, None if changes are not tracked,
+    # _serialized keeps the serialized form of a tracked record until a field is changed
+    __slots__ = ('obj', '_raw', '_unloaded', '_dirty', '_serialized')
+    # compiled classes of the object: records are decoded as instances of the plain class, which assigns values
+    # directly, and track changes as instances of its subclass
+    _plain_class = None
+    _tracked_class = None
+
+    def __new__(cls, obj: Object = None, **values):
+        # plain Record instantiation produces an instance of the object`s compiled record class
+        if cls is Record and obj is not None:
+            cls = RecordClassFactory.get_record_class(obj)
+        return super(Record, cls).__new__(cls)
+
+    def __reduce__(self):
+        # compiled classes are not importable, records are rebuilt from their object and get their slot values back
+        return _restore_record, (self.obj, self._dirty is not None), self.__getstate__()
+
+    def __getstate__(self):
+        # only assigned slots are kept, fields of lazy records are not decoded
+        state = {}
+        for name in Record.__slots__[1:] + self._plain_class.__slots__:
+            try:
+                state[name] = object.__getattribute__(self, name)
+            except AttributeError:
+                pass
+        return state
+
+    def __setstate__(self, state: dict):
+        # restoring values is not a change
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+    def __deepcopy__(self, memo: dict):
+        # copies share the object, which is a schema definition rather than a value of the record
+        record = _restore_record(self.obj, self._dirty is not None)
+        memo[id(self)] = record
+        record.__setstate__(deepcopy(self.__getstate__(), memo))
+        return record
 
     def __init__(self, obj: Object, **values):
         """
@@ -11,33 +54,168 @@ class Record:
         :param obj:
         :param values:
         """
+        plain_class = self._plain_class
+        if plain_class is not None and type(self) is not plain_class:
+            # values assigned by the constructor are not changes
+            self.__class__ = plain_class
         self.obj = obj
-        for field in obj.fields.values():
+        self._raw = None
+        self._unloaded = None
+        self._dirty = None
+        self._serialized = None
+        # converts values with the codec compiled for the object`s fields
+        self._decode(values)
+
+    @classmethod
+    def from_raw(cls, obj: Object, data: dict, lazy: bool = False, unloaded: frozenset = None) -> 'Record':
+        """
+        Assembles a record from values received from the Custodian. Lazy records keep the raw values and decode
+        a field only the first time it is accessed
+        :param obj:
+        :param data:
+        :param lazy:
+        :param unloaded: names of fields which were not retrieved
+        :return:
+        """
+        return RecordClassFactory.hydrate(obj, [data], lazy=lazy, unloaded=unloaded)[0]
+
+    def __getattr__(self, name: str):
+        # called only for attributes which are not assigned yet
+        if name in Record.__slots__:
+            raise AttributeError(name)
+        if self._unloaded is not None and name in self._unloaded:
+            raise AttributeError('"{}" field of the record is not loaded'.format(name))
+        raw = self._raw
+        field = self.obj.fields.get(name)
+        if raw is None or field is None:
+            raise AttributeError(
+                '\'{}\' object has no attribute \'{}\''.format(type(self).__name__, name)
+            )
+        value = raw.get(name)
+        # convert value if it is set
+        if value:
+            value = field.from_raw(value)
+        # decoding is not a change
+        object.__setattr__(self, name, value)
+        return value
+
+    def _set_tracked_attribute(self, name: str, value):
+        # __setattr__ of tracked record classes
+        object.__setattr__(self, name, value)
+        if name in Record.__slots__:
+            return
+        if self._serialized is not None:
+            object.__setattr__(self, '_serialized', None)
+        dirty = self._dirty
+        if dirty is not None:
+            if dirty:
+                dirty.add(name)
+            else:
+                object.__setattr__(self, '_dirty', {name})
+
+    def mark_dirty(self, *field_names: str):
+        """
+        Marks fields as changed, e.g. after values of object or array fields are changed in place
+        :param field_names:
+        """
+        for field_name in field_names:
+            if field_name not in self.obj.fields:
+                raise FieldDoesNotExistException('"{}" object has no "{}" field'.format(self.obj.name, field_name))
+        self._serialized = None
+        if self._dirty is not None:
+            self._dirty = set(self._dirty).union(field_names)
+
+    def mark_clean(self):
+        """
+        Starts tracking changes of the record, current values are considered to be stored in the Custodian
+        """
+        self._dirty = ()
+        self._serialized = None
+        self.__class__ = self._tracked_class
+
+    def get_dirty_fields(self) -> frozenset:
+        """
+        Returns names of fields changed since the record was received from the Custodian, all fields of records
+        which changes are not tracked
+        :return:
+        """
+        if self._dirty is None:
+            return frozenset(self.obj.fields)
+        return frozenset(self._dirty)
+
+    def _decode(self, values: dict):
+        for field in self.obj.fields.values():
             value = values.get(field.name, None)
             # convert value if it is set
             if value:
                 value = field.from_raw(value)
             setattr(self, field.name, value)
 
+    def _get_loaded_values(self):
+        for field in self.obj.fields.values():
+            try:
+                yield field, getattr(self, field.name)
+            except AttributeError:
+                # fields which were not retrieved are skipped unless assigned
+                if self._unloaded is None or field.name not in self._unloaded:
+                    raise
+
+    def _encode(self) -> dict:
+        self._validate_values()
+        data = {}
+        for field, value in self._get_loaded_values():
+            raw_value = field.to_raw(value)
+            if raw_value is not None:
+                data[field.name] = raw_value
+        return data
+
     def _validate_values(self):
         """
         Check record`s values
         """
-        for field_name, field in self.obj.fields.items():
-            if not field.optional and getattr(self, field.name) is None:
-                raise FieldValidationException('Null value in "{}" violates not-null constraint'.format(field_name))
+        for field, value in self._get_loaded_values():
+            if not field.optional and value is None:
+                raise FieldValidationException('Null value in "{}" violates not-null constraint'.format(field.name))
+
+    def _get_serialized(self) -> dict:
+        serialized = self._serialized
+        if serialized is None:
+            serialized = self._encode()
+            if self._dirty is not None:
+                self._serialized = serialized
+        return serialized
 
     def serialize(self):
         """
-        Serialize record values, empty values are skipped
+        Serialize record values, empty values are skipped. The serialized form of a tracked record is kept until any
+        of its fields is assigned or marked as changed
         :return:
         """
-        self._validate_values()
+        if self._dirty is None:
+            return self._encode()
+        return dict(self._get_serialized())
+
+    def serialize_changes(self):
+        """
+        Serialize values of changed fields along with the key and the CAS version of the record, changed fields
+        which are empty are sent as null. Records which changes are not tracked are serialized entirely
+        :return:
+        """
+        dirty = self._dirty
+        if dirty is None:
+            return self.serialize()
+        serialized = self._get_serialized()
+        obj = self.obj
         data = {}
-        for field_name, field in self.obj.fields.items():
-            raw_value = field.to_raw(getattr(self, field.name))
-            if raw_value is not None:
-                data[field.name] = raw_value
+        if obj.key in serialized:
+            data[obj.key] = serialized[obj.key]
+        if obj.cas and 'cas' in serialized:
+            data['cas'] = serialized['cas']
+        for name in dirty:
+            if name in serialized:
+                data[name] = serialized[name]
+            elif name in obj.fields and getattr(self, name, None) is None:
+                data[name] = None
         return data
 
     def __repr__(self):
@@ -55,4 +233,90 @@ class Record:
         :return:
         """
         # TODO: add check via API call
-        return self.get_pk() is not None
\ No newline at end of file
+        return self.get_pk() is not None
+
+
+class RecordClassFactory:
+    @classmethod
+    def get_record_class(cls, obj: Object):
+        """
+        Returns a Record subclass with __slots__ for the object`s fields, so its instances have no __dict__, and with
+        decode/encode functions compiled for the fields. Received records are instances of its subclass which tracks
+        assigned fields. The class is cached on the object and compiled again once the object`s fields are added,
+        removed or replaced
+        :param obj:
+        :return:
+        """
+        fields_key = tuple(obj.fields.values())
+        record_class = obj._record_class
+        if record_class is None or record_class._fields_key != fields_key:
+            slots = tuple(x for x in obj.fields if x not in Record.__slots__)
+            if not all(x.isidentifier() for x in slots):
+                # such fields can only be kept in the instance`s __dict__
+                slots = tuple(x for x in slots if x.isidentifier()) + ('__dict__',)
+            record_class = type(
+                '{}Record'.format(''.join(x.capitalize() for x in obj.name.split('_'))),
+                (Record,),
+                {
+                    '__slots__': slots,
+                    '__module__': Record.__module__,
+                    '_fields_key': fields_key,
+                    '_decode': RecordCodec.compile_decoder(obj)
+                }
+            )
+            # the encoder reads values through the slots of the class
+            record_class._encode = RecordCodec.compile_encoder(obj, record_class)
+            record_class._plain_class = record_class
+            record_class._tracked_class = type(record_class.__name__, (record_class,), {
+                '__slots__': (),
+                '__module__': Record.__module__,
+                '__setattr__': Record._set_tracked_attribute
+            })
+            obj._record_class = record_class
+        return record_class
+
+    @classmethod
+    def hydrate(cls, obj: Object, records_data: list, lazy: bool = False, unloaded: frozenset = None) -> list:
+        """
+        Assembles records of the object`s compiled record class from a list of raw values
+        :param obj:
+        :param records_data:
+        :param lazy: keep raw values and decode fields on access
+        :param unloaded: names of fields which were not retrieved, such fields stay unassigned
+        :return:
+        """
+        record_class = cls.get_record_class(obj)
+        tracked_class = record_class._tracked_class
+        # skip Record.__new__ dispatching, the class is already known
+        new = object.__new__
+        records = []
+        for record_data in records_data:
+            record = new(record_class)
+            if lazy:
+                record.obj = obj
+                record._raw = record_data
+                record._unloaded = unloaded
+                record._serialized = None
+            else:
+                record.__init__(obj, **record_data)
+                if unloaded:
+                    for field_name in unloaded:
+                        delattr(record, field_name)
+                    record._unloaded = unloaded
+            # changes of received records are tracked
+            record._dirty = ()
+            record.__class__ = tracked_class
+            records.append(record)
+        return records
+
+
+def _restore_record(obj: Object, tracked: bool = False) -> Record:
+    """
+    Creates an empty record of the object`s compiled class for a pickled or copied record, its slots are restored
+    with __setstate__
+    """
+    record = Record.__new__(Record, obj)
+    object.__setattr__(record, 'obj', obj)
+    if tracked:
+        record.__class__ = record._tracked_class
+    return record
@@ -0,0 +1,132 @@
+from typing import List
+
+from custodian.exceptions import QueryException
+from custodian.objects import Object
+from custodian.objects.fields import RelatedObjectField, LINK_TYPES
+
+
+class RelatedRecordsPrefetcher:
+    """
+    Resolves related records of a list of records with a few bulk requests instead of a request per record:
+    distinct keys of every related field are retrieved with chunked "in" queries and resolved records are assigned
+    to the field. Outer links are resolved by their outer link field and grouped by the record they point to
+    """
+
+    def __init__(self, manager, chunk_size: int = 100):
+        """
+        :param manager: RecordsManager
+        :param chunk_size: number of keys per request
+        """
+        self.manager = manager
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def _get_pk_value(cls, value, key: str):
+        """
+        Returns the key of a related value which is either a key, a dict of values or a record
+        """
+        if hasattr(value, 'get_pk'):
+            return value.get_pk()
+        if isinstance(value, dict):
+            return value.get(key)
+        return value
+
+    @classmethod
+    def _get_field(cls, obj: Object, field_name: str) -> RelatedObjectField:
+        field = obj.fields.get(field_name)
+        if not isinstance(field, RelatedObjectField):
+            raise QueryException('"{}" is not a related object field of "{}" object'.format(field_name, obj.name))
+        return field
+
+    @classmethod
+    def _get_link(cls, obj: Object, field: RelatedObjectField) -> tuple:
+        """
+        Returns the link type of the field and, for outer links, the field of the related object which points back.
+        The relation index of the objects manager is used once it is built, fields are inspected otherwise
+        """
+        relation_index = getattr(obj._objects_manager, 'relation_index', None)
+        relation = relation_index.get(obj.name, field.name) if relation_index is not None else None
+        if relation is None:
+            return field.link_type, field.outer_link_field
+        if relation.link_type != LINK_TYPES.OUTER:
+            return relation.link_type, None
+        inner_relation = relation_index.get_reverse(obj.name, field.name)
+        return relation.link_type, inner_relation.field_name if inner_relation is not None \
+            else relation.outer_link_field
+
+    def _retrieve(self, obj: Object, field_name: str, values: list) -> list:
+        """
+        Retrieves records of the object which field value is in the given values, in chunks
+        """
+        records = []
+        for i in range(0, len(values), self.chunk_size):
+            query = self.manager.query(obj).filter(**{'{}__in'.format(field_name): values[i:i + self.chunk_size]})
+            records.extend(query._evaluate())
+        return records
+
+    def _prefetch_inner(self, field: RelatedObjectField, records: list) -> list:
+        key = field.obj.key
+        values = {}
+        for record in records:
+            value = getattr(record, field.name)
+            if value is None:
+                continue
+            for item in value if field.many else [value]:
+                values.setdefault(self._get_pk_value(item, key), None)
+        if not values:
+            return []
+        related_records = self._retrieve(field.obj, key, list(values))
+        related_by_pk = {x.get_pk(): x for x in related_records}
+        for record in records:
+            value = getattr(record, field.name)
+            if value is None:
+                continue
+            # related records are sent as the same keys, so the field is not changed
+            if field.many:
+                object.__setattr__(record, field.name, [
+                    related_by_pk.get(self._get_pk_value(x, key), x) for x in value
+                ])
+            else:
+                object.__setattr__(record, field.name, related_by_pk.get(self._get_pk_value(value, key), value))
+        return related_records
+
+    def _prefetch_outer(self, field: RelatedObjectField, outer_link_field: str, records: list) -> list:
+        pks = list({x.get_pk(): None for x in records if x.get_pk() is not None})
+        related_records = self._retrieve(field.obj, outer_link_field, pks) if pks else []
+        # the outer link field points to records of the parent object
+        key = records[0].obj.key
+        groups = {}
+        for related_record in related_records:
+            pk = self._get_pk_value(getattr(related_record, outer_link_field), key)
+            groups.setdefault(pk, []).append(related_record)
+        for record in records:
+            group = groups.get(record.get_pk(), [])
+            object.__setattr__(record, field.name, group if field.many else (group[0] if group else None))
+        return related_records
+
+    def prefetch(self, obj: Object, records: list, paths: List[str]) -> list:
+        """
+        Resolves related records of the records along the given paths, e.g. "address" or "address__city"
+        :param obj:
+        :param records:
+        :param paths:
+        :return:
+        """
+        tree = {}
+        for path in paths:
+            field_name, _, tail = path.replace('.', '__').partition('__')
+            tree.setdefault(field_name, [])
+            if tail:
+                tree[field_name].append(tail)
+        for field_name, tails in tree.items():
+            field = self._get_field(obj, field_name)
+            if not records:
+                continue
+            link_type, outer_link_field = self._get_link(obj, field)
+            if link_type == LINK_TYPES.OUTER:
+                related_records = self._prefetch_outer(field, outer_link_field, records)
+            else:
+                related_records = self._prefetch_inner(field, records)
+            if tails and related_records:
+                self.prefetch(field.obj, related_records, tails)
+        return records
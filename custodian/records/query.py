@@ -1,60 +1,120 @@
+import heapq
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
+from functools import cmp_to_key
+from itertools import chain
+from urllib.parse import quote
 
 from custodian.exceptions import QueryException
 from custodian.objects import Object
+from custodian.records.batch import RecordBatch
+from custodian.records.prefetch import RelatedRecordsPrefetcher
 
 
 class Q:
+    """
+    Immutable RQL expression. Combining expressions with &, | and ~ creates new nodes in constant time, nested
+    "and"/"or" nodes are flattened into n-ary ones, duplicate operands are dropped and the compiled string is memoised
+    """
     _query = None
-    _logical_expressions = None
-    _inverted = None
+    _connector = None
+    _children = None
+    _string = None
 
     _KNOWN_OPERATORS = ('in', 'like', 'eq', 'ne', 'gt', 'ge', 'lt', 'le', 'eq(null())')
+    _AND, _OR, _NOT = 'and', 'or', 'not'
 
     def __init__(self, **kwargs):
-        self._query = deepcopy(kwargs)
-        self._logical_expressions = []
-        self._inverted = False
+        self._string = None
+        if len(kwargs) > 1:
+            # several conditions of a Q are its "and" operands
+            self._query = {}
+            self._connector = self._AND
+            self._children = tuple(Q(**{key: value}) for key, value in kwargs.items())
+        else:
+            self._query = deepcopy(kwargs)
+            self._connector = None
+            self._children = ()
+
+    @classmethod
+    def _combine(cls, connector: str, *children: 'Q') -> 'Q':
+        q_object = cls.__new__(cls)
+        q_object._query = {}
+        q_object._connector = connector
+        q_object._children = children
+        q_object._string = None
+        return q_object
 
     def __and__(self, other):
-        self._logical_expressions.append({
-            'operator': 'and',
-            'query': other
-        })
-        return self
+        return self._combine(self._AND, self, other)
 
     def __or__(self, other):
-        self._logical_expressions.append({
-            'operator': 'or',
-            'query': other
-        })
-        return self
+        return self._combine(self._OR, self, other)
 
     def __invert__(self):
-        self._inverted = not self._inverted
-        return self
+        if self._connector == self._NOT:
+            return self._children[0]
+        return self._combine(self._NOT, self)
 
-    def to_string(self):
+    def _get_operands(self) -> list:
         """
-        Constructs a string representation of RQL query
-        :return:
+        Returns operands of the node with nested nodes of the same connector flattened, without recursion
         """
-        # construct query first
+        if self._connector == self._NOT:
+            return list(self._children)
+        operands = []
+        stack = list(reversed(self._children))
+        while stack:
+            node = stack.pop()
+            if node._connector == self._connector:
+                stack.extend(reversed(node._children))
+            else:
+                operands.append(node)
+        return operands
+
+    def _compile_term(self) -> str:
         expressions = []
         for key, value in self._query.items():
             operator, field = self._parse_key(key)
             value = self._normalize_value(value)
             expressions.append('{}({},{})'.format(operator, field, value))
-        query_string = ','.join(expressions)
-        # and then apply logical operators
-        for logical_expression in self._logical_expressions:
-            query_string = '{}({},{})'.format(
-                logical_expression['operator'], query_string, logical_expression['query'].to_string()
-            )
-        # apply inversion operator
-        if self._inverted:
-            query_string = 'not({})'.format(query_string)
-        return query_string
+        return ','.join(expressions)
+
+    def _compile(self, operand_strings: list) -> str:
+        # duplicates and empty expressions are dropped
+        strings = list(dict.fromkeys(x for x in operand_strings if x))
+        if self._connector == self._NOT:
+            return 'not({})'.format(strings[0]) if strings else ''
+        if len(strings) == 1:
+            return strings[0]
+        return '{}({})'.format(self._connector, ','.join(strings)) if strings else ''
+
+    def to_string(self):
+        """
+        Constructs a string representation of RQL query
+        :return:
+        """
+        if self._string is not None:
+            return self._string
+        # nodes are compiled after their operands, with an explicit stack instead of recursion
+        operands = {}
+        stack = [self]
+        while stack:
+            node = stack[-1]
+            if node._string is not None:
+                stack.pop()
+                continue
+            if node._connector is None:
+                node._string = node._compile_term()
+                stack.pop()
+                continue
+            if id(node) not in operands:
+                operands[id(node)] = node._get_operands()
+                stack.extend(x for x in operands[id(node)] if x._string is None)
+                continue
+            node._string = node._compile([x._string for x in operands.pop(id(node))])
+            stack.pop()
+        return self._string
 
     def _parse_key(self, key):
         """
@@ -98,6 +158,10 @@ class Query:
     _is_evaluated = None
     _result = None
     _depth = 1
+    _lazy = None
+    _only = None
+    _exclude = None
+    _prefetch = None
 
     def __init__(self, obj: Object, manager, depth=1):
         self._obj = obj
@@ -108,6 +172,10 @@ class Query:
         self._is_evaluated = False
         self._result = None
         self._depth = depth
+        self._lazy = None
+        self._only = []
+        self._exclude = []
+        self._prefetch = []
 
     def filter(self, q_object: Q = None, **filters):
         """
@@ -131,11 +199,7 @@ class Query:
         """
         # queries
         if self._q_objects:
-            query_string = self._q_objects[0].to_string()
-            for q_object in self._q_objects[1:]:
-                query_string = '{}({},{})'.format(
-                    'and', query_string, q_object.to_string()
-                )
+            query_string = Q._combine(Q._AND, *self._q_objects).to_string()
         else:
             query_string = ''
         # ordering options
@@ -163,6 +227,270 @@ class Query:
             new_query._orderings.append(ordering)
         return new_query
 
+    def only(self, *fields: str):
+        """
+        Retrieves only the given fields, other fields of records are not loaded. Fields of related objects are
+        referenced with "__", e.g. "address__city". The object`s key is always retrieved
+        :param fields:
+        :return:
+        """
+        new_query = QueryFactory.clone(self)
+        new_query._only.extend(fields)
+        return new_query
+
+    def exclude(self, *fields: str):
+        """
+        Does not retrieve the given fields, such fields of records are not loaded
+        :param fields:
+        :return:
+        """
+        new_query = QueryFactory.clone(self)
+        new_query._exclude.extend(fields)
+        return new_query
+
+    def prefetch(self, *relation_paths: str):
+        """
+        Resolves related records of the query`s records with a few bulk requests once records are retrieved, related
+        fields are assigned with records instead of keys. Paths of nested relations are joined with "__",
+        e.g. "address__city"
+        :param relation_paths:
+        :return:
+        """
+        new_query = QueryFactory.clone(self)
+        new_query._prefetch.extend(relation_paths)
+        return new_query
+
+    def _get_params(self) -> dict:
+        return {'depth': self._depth, **self._manager._get_projection_params(self._obj, self._only, self._exclude)}
+
+    def lazy(self, lazy: bool = True):
+        """
+        Sets hydration mode of the query`s records, lazy records decode a field only the first time it is accessed.
+        By default the RecordsManager`s mode is used
+        :param lazy:
+        :return:
+        """
+        new_query = QueryFactory.clone(self)
+        new_query._lazy = lazy
+        return new_query
+
+    def iterator(self, chunk_size: int = 100, keyset: bool = False):
+        """
+        Walks the query`s result in pages of chunk_size records and yields records as pages arrive, so only one
+        page is kept in memory. Offset and limit of a sliced query are respected.
+        By default pages are fetched with limit(offset, chunk_size), queries without ordering are ordered by the
+        object`s key to keep pages stable.
+        In keyset mode every page after the first one is fetched with a filter on the ordering values of the last
+        seen record instead of an offset, so each page costs the same and rows inserted during the scan do not shift
+        pages. The query is ordered by its orderings, which must be the object`s own not-null fields, followed by
+        the object`s key
+        :param chunk_size:
+        :param keyset:
+        :return:
+        """
+        if chunk_size < 1:
+            raise QueryException('chunk_size must be positive')
+        if keyset:
+            orderings = self._orderings[:]
+            field_names = [x.lstrip('-') for x in orderings]
+            for field_name in field_names:
+                if field_name not in self._obj.fields:
+                    raise QueryException(
+                        'Keyset pagination supports ordering by the object`s own fields only, got "{}"'.format(
+                            field_name
+                        )
+                    )
+            if self._obj.key not in field_names:
+                orderings.append(self._obj.key)
+            return chain.from_iterable(self._iterate_keyset_pages(chunk_size, orderings))
+        return chain.from_iterable(self._iterate_pages(chunk_size))
+
+    def _get_seek_value(self, record, field_name: str):
+        value = getattr(record, field_name)
+        if value is None:
+            raise QueryException('Keyset pagination requires not-null values of "{}"'.format(field_name))
+        value = self._obj.fields[field_name].to_raw(value)
+        # strings and temporal values may contain RQL delimiters and characters the query string changes, e.g. "+"
+        return quote(value, safe='') if isinstance(value, str) else value
+
+    def _get_seek_q(self, orderings: list, record) -> Q:
+        """
+        Builds the filter of records which go after the record in the given orderings:
+        or(gt(a,x),and(eq(a,x),gt(b,y)),...)
+        :param orderings:
+        :param record:
+        :return:
+        """
+        values = {x.lstrip('-'): self._get_seek_value(record, x.lstrip('-')) for x in orderings}
+        seek_q = None
+        for i, ordering in enumerate(orderings):
+            field_name = ordering.lstrip('-')
+            operator = 'lt' if ordering.startswith('-') else 'gt'
+            q_object = Q(**{'{}__{}'.format(field_name, operator): values[field_name]})
+            for previous_ordering in orderings[:i]:
+                previous_field_name = previous_ordering.lstrip('-')
+                q_object = Q(**{'{}__eq'.format(previous_field_name): values[previous_field_name]}) & q_object
+            seek_q = q_object if seek_q is None else seek_q | q_object
+        return seek_q
+
+    def _iterate_keyset_pages(self, chunk_size: int, orderings: list):
+        query = QueryFactory.clone(self)
+        query._orderings = orderings
+        offset, remaining = self._limit or (0, None)
+        seek_q = None
+        while remaining is None or remaining > 0:
+            page_size = chunk_size if remaining is None else min(chunk_size, remaining)
+            page_query = query.filter(seek_q)
+            page_query._limit = (offset, page_size)
+            records = page_query._evaluate()
+            yield records
+            if len(records) < page_size:
+                break
+            # the offset of a sliced query applies to the first page only
+            offset = 0
+            if remaining is not None:
+                remaining -= page_size
+            seek_q = self._get_seek_q(orderings, records[-1])
+
+    def _iterate_pages(self, chunk_size: int):
+        query = self if self._orderings else self.order_by(self._obj.key)
+        offset, remaining = self._limit or (0, None)
+        while remaining is None or remaining > 0:
+            page_size = chunk_size if remaining is None else min(chunk_size, remaining)
+            page_query = QueryFactory.clone(query)
+            page_query._limit = (offset, page_size)
+            records = page_query._evaluate()
+            yield records
+            if len(records) < page_size:
+                break
+            offset += page_size
+            if remaining is not None:
+                remaining -= page_size
+
+    def parallel_scan(self, workers: int = 4, chunk_size: int = 100, ordered: bool = False):
+        """
+        Scans the query`s result with concurrent workers, see ParallelScan
+        :param workers: number of concurrent requests, bounded by the client`s connection pool size
+        :param chunk_size: number of records per request
+        :param ordered: yield records in the query`s order instead of the order pages arrive in
+        :return:
+        """
+        # scan module depends on this one
+        from custodian.records.scan import ParallelScan
+        return ParallelScan(self, workers=workers, chunk_size=chunk_size, ordered=ordered)
+
+    def _get_oversized_term(self, operands: list):
+        """
+        Returns the largest "in" term of the query`s conditions with more than max_in_size values or None
+        """
+        max_in_size = self._manager.max_in_size
+        oversized_term, oversized_size = None, max_in_size
+        for operand in operands:
+            if operand._connector is not None or len(operand._query) != 1:
+                continue
+            key, value = next(iter(operand._query.items()))
+            if key.endswith('__in') and isinstance(value, (list, tuple)) and len(value) > oversized_size:
+                oversized_term, oversized_size = operand, len(value)
+        return oversized_term
+
+    def _get_split_queries(self):
+        """
+        Returns queries each of which filters by a chunk of values of the oversized "in" conditions of the query, or
+        None if the query fits a single request. Only conditions which the whole filter is conjunction with are split,
+        so chunks of distinct values match distinct records. Sliced queries are split into queries of the first
+        offset + limit records of each chunk
+        :return:
+        """
+        if not self._manager.max_in_size or not self._q_objects:
+            return None
+        operands = Q._combine(Q._AND, *self._q_objects)._get_operands()
+        oversized_term = self._get_oversized_term(operands)
+        if oversized_term is None:
+            return None
+        key, value = next(iter(oversized_term._query.items()))
+        values = list(dict.fromkeys(value))
+        other_operands = [x for x in operands if x is not oversized_term]
+        chunk_size = self._manager.max_in_size
+        queries = []
+        for i in range(0, len(values), chunk_size):
+            query = QueryFactory.clone(self)
+            query._q_objects = other_operands + [Q(**{key: values[i:i + chunk_size]})]
+            query._limit = (0, sum(self._limit)) if self._limit else None
+            # other oversized conditions are split within the chunk
+            queries.extend(query._get_split_queries() or [query])
+        return queries
+
+    def _compare_records_data(self, first: dict, second: dict) -> int:
+        """
+        Compares raw values of records in the query`s orderings, null values go first
+        """
+        for ordering in self._orderings:
+            first_value, second_value = first, second
+            for field_name in ordering.lstrip('-').split('.'):
+                first_value = first_value.get(field_name) if isinstance(first_value, dict) else None
+                second_value = second_value.get(field_name) if isinstance(second_value, dict) else None
+            if first_value == second_value:
+                continue
+            if first_value is None or (second_value is not None and first_value < second_value):
+                result = -1
+            else:
+                result = 1
+            return -result if ordering.startswith('-') else result
+        return 0
+
+    def _merge_results(self, results: list) -> list:
+        """
+        Merges raw results of split queries: results are merged in the query`s orderings, records matched by several
+        queries are kept once and the query`s slice is applied
+        """
+        if self._orderings:
+            merged = heapq.merge(*results, key=cmp_to_key(self._compare_records_data))
+        else:
+            merged = chain.from_iterable(results)
+        key = self._obj.key
+        seen, data = set(), []
+        for record_data in merged:
+            pk = record_data.get(key)
+            if pk in seen:
+                continue
+            seen.add(pk)
+            data.append(record_data)
+        if self._limit:
+            offset, limit = self._limit
+            data = data[offset:offset + limit]
+        return data
+
+    def _query_raw(self, params: dict) -> list:
+        """
+        Retrieves raw values of the query`s records. Queries with oversized "in" conditions are split into several
+        requests, which are sent concurrently, and their results are merged
+        :param params:
+        :return:
+        """
+        split_queries = self._get_split_queries()
+        if split_queries is None:
+            return self._manager._query_raw(self._obj, self.to_string(), **params)
+        pool_size = self._manager.client.pool_size
+        with ThreadPoolExecutor(max_workers=min(len(split_queries), pool_size or len(split_queries))) as executor:
+            results = list(executor.map(
+                lambda x: self._manager._query_raw(self._obj, x.to_string(), **params), split_queries
+            ))
+        return self._merge_results(results)
+
+    def to_batch(self, *field_names: str) -> RecordBatch:
+        """
+        Retrieves the query`s records as a columnar RecordBatch, records are not instantiated
+        :param field_names: fields to keep, all retrieved fields by default
+        :return:
+        """
+        params = self._get_params()
+        data = self._query_raw(params)
+        if not field_names:
+            # fields which are not retrieved have no columns
+            unloaded = self._manager._get_unloaded_fields(self._obj, **params) or ()
+            field_names = [x for x in self._obj.fields if x not in unloaded]
+        return RecordBatch.from_records_data(self._obj, data, field_names=field_names)
+
     def __getitem__(self, item):
         """
         If slice is used __getitem__ returns new query with offset-limit applied,
@@ -183,6 +511,71 @@ class Query:
                 self._evaluate()
             return self._result[item]
 
+    def _get_page_query(self, offset: int, limit: int) -> 'Query':
+        # pages of a sliced query stay within the slice
+        if self._limit:
+            offset, limit = self._limit[0] + offset, max(min(limit, self._limit[1] - offset), 0)
+        page_query = QueryFactory.clone(self)
+        page_query._limit = (offset, limit)
+        return page_query
+
+    def count(self) -> int:
+        """
+        Returns the number of matching records. Uses the total count reported by the Custodian for a single record
+        page and falls back to retrieving keys of matching records without instantiating records
+        :return:
+        """
+        if self._is_evaluated:
+            return len(self._result)
+        split_queries = self._get_split_queries()
+        if split_queries is not None:
+            for split_query in split_queries:
+                split_query._limit = None
+            total_count = sum(x.count() for x in split_queries)
+            if self._limit:
+                return max(min(total_count - self._limit[0], self._limit[1]), 0)
+            return total_count
+        count_query = QueryFactory.clone(self)
+        count_query._orderings = []
+        count_query._limit = (0, 1)
+        total_count = self._manager._count(self._obj, count_query.to_string(), depth=1)
+        if total_count is not None:
+            if self._limit:
+                return max(min(total_count - self._limit[0], self._limit[1]), 0)
+            return total_count
+        count_query._limit = self._limit
+        return len(self._manager._query_raw(self._obj, count_query.to_string(), depth=1, only=[self._obj.key]))
+
+    def exists(self) -> bool:
+        """
+        True if any record matches the query, retrieves a single record at most
+        :return:
+        """
+        if self._is_evaluated:
+            return bool(self._result)
+        if self._get_split_queries() is not None:
+            return self.count() > 0
+        page_query = self._get_page_query(0, 1)
+        if not page_query._limit[1]:
+            return False
+        page_query._orderings = []
+        return bool(self._manager._query_raw(self._obj, page_query.to_string(), depth=1, only=[self._obj.key]))
+
+    def first(self):
+        """
+        Returns the first matching record or None, retrieves a single record at most. Queries without ordering are
+        ordered by the object`s key
+        :return:
+        """
+        if self._is_evaluated:
+            return self._result[0] if self._result else None
+        query = self if self._orderings else self.order_by(self._obj.key)
+        page_query = query._get_page_query(0, 1)
+        if not page_query._limit[1]:
+            return None
+        records = page_query._evaluate()
+        return records[0] if records else None
+
     @evaluate
     def __iter__(self):
         return self._result.__iter__()
@@ -195,7 +588,10 @@ class Query:
         """
         Evaluates the query using RecordsManager
         """
-        records = self._manager._query(self._obj, self.to_string(), depth=self._depth)
+        params = self._get_params()
+        records = self._manager._hydrate(self._obj, self._query_raw(params), lazy=self._lazy, **params)
+        if self._prefetch:
+            RelatedRecordsPrefetcher(self._manager).prefetch(self._obj, records, self._prefetch)
         self._result = records
         self._is_evaluated = True
         return self._result
@@ -209,4 +605,8 @@ class QueryFactory:
         new_query._orderings = query._orderings[:]
         new_query._limit = query._limit
         new_query._depth = query._depth
+        new_query._lazy = query._lazy
+        new_query._only = query._only[:]
+        new_query._exclude = query._exclude[:]
+        new_query._prefetch = query._prefetch[:]
         return new_query
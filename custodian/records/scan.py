@@ -0,0 +1,173 @@
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue, Full
+from threading import Event
+
+from custodian.exceptions import QueryException
+from custodian.objects.fields import IntegerField, NumberField
+from custodian.records.query import Query, QueryFactory, Q
+
+
+class ParallelScan:
+    """
+    Scans the query`s result with concurrent workers, each worker fetches its partition of the result page by page.
+    Queries without ordering over a numeric key are split by ranges of the key, each range is paged with keyset
+    pagination. Other queries are split by offsets: worker N fetches every N-th page.
+    Records are yielded as pages arrive or, if ordered, in the query`s order (the key order for key ranges), later
+    partitions are buffered meanwhile. Buffers are bounded, so workers wait while the consumer is behind
+    """
+    # a partition is exhausted
+    _DONE = object()
+
+    def __init__(self, query: Query, workers: int = 4, chunk_size: int = 100, ordered: bool = False,
+                 buffer_size: int = 4):
+        """
+        :param query:
+        :param workers: number of concurrent requests, bounded by the client`s connection pool size
+        :param chunk_size: number of records per request
+        :param ordered: yield records in the query`s order
+        :param buffer_size: number of pages a partition can fetch ahead of the consumer
+        """
+        if query._limit:
+            raise QueryException('Sliced queries cannot be scanned in parallel')
+        if workers < 1 or chunk_size < 1:
+            raise QueryException('workers and chunk_size must be positive')
+        pool_size = query._manager.client.pool_size
+        self.query = query
+        self.workers = min(workers, pool_size or workers)
+        self.chunk_size = chunk_size
+        self.ordered = ordered
+        self.buffer_size = buffer_size
+        self._stopped = Event()
+
+    def _get_key_field(self):
+        key_field = self.query._obj.fields.get(self.query._obj.key)
+        if not self.query._orderings and isinstance(key_field, (IntegerField, NumberField)):
+            return key_field
+        return None
+
+    def _get_bound(self, ordering: str):
+        # only the key of a single record is retrieved, records are neither hydrated nor prefetched
+        query = QueryFactory.clone(self.query)
+        query._orderings = [ordering]
+        query._limit = (0, 1)
+        query._prefetch = []
+        key = self.query._obj.key
+        data = query._query_raw({'depth': 1, 'only': [key]})
+        return self._get_key_field().from_raw(data[0][key]) if data else None
+
+    def get_partitions(self) -> list:
+        """
+        Returns queries of the key ranges or None if the result is split by offsets
+        :return:
+        """
+        key_field = self._get_key_field()
+        if key_field is None:
+            return None
+        key = self.query._obj.key
+        lower_bound, upper_bound = self._get_bound(key), self._get_bound('-' + key)
+        if lower_bound is None:
+            return []
+        if isinstance(key_field, IntegerField):
+            size = upper_bound - lower_bound + 1
+            bounds = [lower_bound + size * i // self.workers for i in range(self.workers)]
+        else:
+            bounds = [lower_bound + (upper_bound - lower_bound) * i / self.workers for i in range(self.workers)]
+        # small ranges give less partitions than workers
+        bounds = sorted(set(bounds))
+        partitions = []
+        for i, bound in enumerate(bounds):
+            if i + 1 < len(bounds):
+                q_object = Q(**{'{}__ge'.format(key): bound}) & Q(**{'{}__lt'.format(key): bounds[i + 1]})
+            else:
+                q_object = Q(**{'{}__ge'.format(key): bound}) & Q(**{'{}__le'.format(key): upper_bound})
+            partitions.append(self.query.filter(q_object))
+        return partitions
+
+    def _put(self, queue: Queue, item) -> bool:
+        # waits for the consumer unless the scan is stopped
+        while not self._stopped.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def _scan_key_range(self, query: Query, queue: Queue):
+        try:
+            for page in query._iterate_keyset_pages(self.chunk_size, [query._obj.key]):
+                if page and not self._put(queue, page):
+                    return
+        except Exception as e:
+            self._put(queue, e)
+        self._put(queue, self._DONE)
+
+    def _scan_offsets(self, worker: int, queue: Queue):
+        query = self.query if self.query._orderings else self.query.order_by(self.query._obj.key)
+        page_number = worker
+        try:
+            while True:
+                page_query = QueryFactory.clone(query)
+                page_query._limit = (page_number * self.chunk_size, self.chunk_size)
+                page = page_query._evaluate()
+                if page and not self._put(queue, page):
+                    return
+                if len(page) < self.chunk_size:
+                    break
+                page_number += self.workers
+        except Exception as e:
+            self._put(queue, e)
+        self._put(queue, self._DONE)
+
+    def _read(self, queue: Queue):
+        item = queue.get()
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def __iter__(self):
+        self._stopped.clear()
+        partitions = self.get_partitions()
+        tasks_count = len(partitions) if partitions is not None else self.workers
+        if not tasks_count:
+            return
+        if self.ordered:
+            queues = [Queue(maxsize=self.buffer_size) for _ in range(tasks_count)]
+        else:
+            queues = [Queue(maxsize=self.buffer_size * tasks_count)] * tasks_count
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            for i in range(tasks_count):
+                if partitions is not None:
+                    executor.submit(self._scan_key_range, partitions[i], queues[i])
+                else:
+                    executor.submit(self._scan_offsets, i, queues[i])
+            if not self.ordered:
+                done_count = 0
+                while done_count < tasks_count:
+                    item = self._read(queues[0])
+                    if item is self._DONE:
+                        done_count += 1
+                    else:
+                        yield from item
+            elif partitions is not None:
+                # key ranges follow each other
+                for queue in queues:
+                    item = self._read(queue)
+                    while item is not self._DONE:
+                        yield from item
+                        item = self._read(queue)
+            else:
+                # pages are taken from workers in turn
+                page_number = 0
+                while True:
+                    item = self._read(queues[page_number % tasks_count])
+                    if item is self._DONE:
+                        break
+                    yield from item
+                    if len(item) < self.chunk_size:
+                        break
+                    page_number += 1
+        finally:
+            self._stopped.set()
+            executor.shutdown(wait=True)
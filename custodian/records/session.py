@@ -0,0 +1,164 @@
+from collections import OrderedDict
+
+from custodian.exceptions import BulkOperationException
+from custodian.objects.fields import RelatedObjectField, LINK_TYPES
+from custodian.records.model import Record
+
+
+class Session:
+    """
+    Unit of work: records to create, update and delete are collected and written with bulk requests, grouped by
+    object. Records of objects are created and updated after records of objects they link to, and deleted before
+    them. Repeated updates of a record are written once with changes of all of them.
+    Pending writes are flushed at the end of the `with` block, unless it raises, or once `flush_threshold` writes
+    are pending. Writes which fail stay pending
+    """
+    flush_threshold = None
+
+    def __init__(self, manager, flush_threshold: int = 1000, batch_size: int = None, concurrency: int = 1):
+        """
+        :param manager: RecordsManager
+        :param flush_threshold: number of pending writes which triggers a flush
+        :param batch_size: number of records per bulk request
+        :param concurrency: number of bulk requests sent at once
+        """
+        self.manager = manager
+        self.flush_threshold = flush_threshold
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self._objects = OrderedDict()
+        self._new = OrderedDict()
+        self._dirty = OrderedDict()
+        self._deleted = OrderedDict()
+
+    def _get_key(self, record: Record) -> tuple:
+        return record.obj.name, record.get_pk()
+
+    def _track(self, writes: OrderedDict, key, record: Record):
+        self._objects.setdefault(record.obj.name, record.obj)
+        writes[key] = record
+        if self.flush_threshold and len(self) >= self.flush_threshold:
+            self.flush()
+
+    def create(self, record: Record):
+        """
+        Creates the record on flush, its key is assigned once it is created
+        :param record:
+        """
+        self._track(self._new, id(record), record)
+
+    def update(self, record: Record):
+        """
+        Updates the record on flush, records of the same key are updated once with the last of them, changes of
+        earlier records it has not changed itself are merged into it. Records without a key are created
+        :param record:
+        """
+        if id(record) in self._new:
+            return
+        if record.get_pk() is None:
+            self.create(record)
+            return
+        key = self._get_key(record)
+        if key in self._deleted:
+            return
+        previous = self._dirty.pop(key, None)
+        if previous is not None and previous is not record:
+            self._merge(previous, record)
+        self._track(self._dirty, key, record)
+
+    @classmethod
+    def _merge(cls, previous: Record, record: Record):
+        """
+        Copies values of fields changed in the previous record but not in the given one, the copied fields are
+        marked as changed
+        :param previous:
+        :param record:
+        """
+        changed = record.get_dirty_fields()
+        for name in previous.serialize_changes():
+            if name not in changed and name in record.obj.fields and name not in (record.obj.key, 'cas'):
+                setattr(record, name, getattr(previous, name))
+
+    def delete(self, record: Record):
+        """
+        Deletes the record on flush, a pending creation of the record is cancelled instead
+        :param record:
+        """
+        if self._new.pop(id(record), None) is not None or record.get_pk() is None:
+            return
+        key = self._get_key(record)
+        self._dirty.pop(key, None)
+        self._track(self._deleted, key, record)
+
+    def add(self, record: Record):
+        """
+        Creates the record on flush if it has no key, updates it otherwise
+        :param record:
+        """
+        self.update(record)
+
+    def _get_object_order(self) -> list:
+        """
+        Returns names of the session`s objects, objects go after objects they link to. Objects of cyclic links keep
+        the order they were added to the session in
+        """
+        dependencies = {}
+        for name, obj in self._objects.items():
+            linked_names = {
+                getattr(x.obj, 'name', x.obj) for x in obj.fields.values()
+                if isinstance(x, RelatedObjectField) and x.link_type == LINK_TYPES.INNER
+            }
+            # links to records of the same object cannot be ordered by object
+            dependencies[name] = {x for x in linked_names if x in self._objects and x != name}
+        order = []
+        while dependencies:
+            ready = [x for x, y in dependencies.items() if not y - set(order)] or [next(iter(dependencies))]
+            for name in ready:
+                order.append(name)
+                del dependencies[name]
+        return order
+
+    def _write(self, writes: OrderedDict, name: str, bulk_operation):
+        """
+        Writes pending records of the object with the bulk operation, records stay pending until they are written.
+        Bulk operations either raise before sending anything or report written records with BulkOperationException
+        :param writes:
+        :param name:
+        :param bulk_operation:
+        """
+        keys = [x for x, y in writes.items() if y.obj.name == name]
+        if not keys:
+            return
+        try:
+            bulk_operation(*[writes[x] for x in keys], batch_size=self.batch_size, concurrency=self.concurrency)
+        except BulkOperationException as e:
+            succeeded = {id(x) for x in e.succeeded}
+            for key in keys:
+                if id(writes[key]) in succeeded:
+                    del writes[key]
+            raise
+        for key in keys:
+            del writes[key]
+
+    def flush(self):
+        """
+        Writes pending records with bulk requests. Records which failed to be written stay pending, so the flush
+        can be retried
+        """
+        order = self._get_object_order()
+        for name in order:
+            self._write(self._new, name, self.manager.bulk_create)
+            self._write(self._dirty, name, self.manager.bulk_update)
+        for name in reversed(order):
+            self._write(self._deleted, name, self.manager.bulk_delete)
+        self._objects = OrderedDict()
+
+    def __len__(self):
+        return len(self._new) + len(self._dirty) + len(self._deleted)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.flush()
@@ -0,0 +1,126 @@
+import json
+
+import requests
+import requests_mock
+from hamcrest import *
+
+from custodian.client import Client
+from custodian.exceptions import BulkOperationException, FieldValidationException, ObjectUpdateException, \
+    ObjectDeletionException
+from custodian.objects import Object
+from custodian.records.cache import QueryCache
+from custodian.records.model import Record
+
+
+def make_records(person_object: Object, count: int, with_ids: bool = False):
+    return [
+        Record(person_object, name='Person {}'.format(i), is_active=True, age=20, street='street',
+               id=i if with_ids else None)
+        for i in range(1, count + 1)
+    ]
+
+
+def respond_created(request, context):
+    return {'status': 'OK', 'data': [{**x, 'id': int(x['name'].split()[1])} for x in json.loads(request.body)]}
+
+
+def test_bulk_create_sends_batches_and_maps_results(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    records = make_records(person_object, 7)
+    with requests_mock.Mocker() as mocker:
+        mocker.put('http://mocked/custodian/data/bulk/person', json=respond_created)
+        created_records = client.records.bulk_create(*records, batch_size=3, concurrency=3)
+        assert_that(mocker.call_count, equal_to(3))
+        assert_that(sorted(len(x.json()) for x in mocker.request_history), equal_to([1, 3, 3]))
+    assert_that(created_records, equal_to(records))
+    assert_that([x.id for x in records], equal_to(list(range(1, 8))))
+
+
+def test_bulk_operation_reports_failed_batches(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    records = make_records(person_object, 5, with_ids=True)
+
+    def respond(request, context):
+        data = json.loads(request.body)
+        if any(x['id'] == 4 for x in data):
+            return {'status': 'FAIL', 'error': {'msg': 'Record 4 is invalid'}}
+        return {'status': 'OK', 'data': data}
+
+    with requests_mock.Mocker() as mocker:
+        mocker.post('http://mocked/custodian/data/bulk/person', json=respond)
+        try:
+            client.records.bulk_update(*records, batch_size=2, concurrency=2)
+        except BulkOperationException as e:
+            exception = e
+        assert_that(mocker.call_count, equal_to(3))
+    assert_that(exception, instance_of(ObjectUpdateException))
+    assert_that(exception.failures, equal_to([(records[2:4], 'Record 4 is invalid')]))
+    assert_that(exception.succeeded, equal_to(records[:2] + records[4:]))
+
+
+def test_bulk_operation_reports_transport_failures_and_validates_records_before_sending(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    records = make_records(person_object, 4, with_ids=True)
+    with requests_mock.Mocker() as mocker:
+        mocker.post('http://mocked/custodian/data/bulk/person', [
+            {'json': {'status': 'OK', 'data': [x.serialize() for x in records[:2]]}},
+            {'exc': requests.ConnectionError('Connection refused')}
+        ])
+        try:
+            client.records.bulk_update(*records, batch_size=2)
+        except BulkOperationException as e:
+            exception = e
+    assert_that(exception.failures, equal_to([(records[2:], 'Connection refused')]))
+    assert_that(exception.succeeded, equal_to(records[:2]))
+
+    records[3].name = None
+    with requests_mock.Mocker() as mocker:
+        mocker.post('http://mocked/custodian/data/bulk/person', json={'status': 'OK', 'data': []})
+        assert_that(calling(client.records.bulk_update).with_args(*records, batch_size=2),
+                    raises(FieldValidationException))
+        assert_that(mocker.call_count, equal_to(0))
+
+
+def test_bulk_operation_reports_batches_which_result_failed_to_apply(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    client.records.cache = QueryCache()
+    records = make_records(person_object, 3, with_ids=True)
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/data/bulk/person', json={'status': 'OK', 'data': []})
+        mocker.post('http://mocked/custodian/data/bulk/person', [
+            {'json': {'status': 'OK', 'data': [records[0].serialize()]}},
+            {'json': {'status': 'OK', 'data': 'unexpected'}},
+            {'json': {'status': 'OK', 'data': [records[2].serialize()]}}
+        ])
+        list(client.records.query(person_object))
+        try:
+            client.records.bulk_update(*records, batch_size=1)
+        except BulkOperationException as e:
+            exception = e
+        assert_that(mocker.call_count, equal_to(4))
+    assert_that(exception.failures, has_length(1))
+    assert_that(exception.failures[0][0], equal_to(records[1:2]))
+    assert_that(exception.__cause__, instance_of(TypeError))
+    assert_that(exception.succeeded, equal_to([records[0], records[2]]))
+    assert_that(client.records.cache, has_length(0))
+
+
+def test_bulk_delete_sends_keys_in_batches(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    records = make_records(person_object, 5, with_ids=True)
+    with requests_mock.Mocker() as mocker:
+        mocker.delete('http://mocked/custodian/data/bulk/person', json={'status': 'OK'})
+        client.records.bulk_delete(*records, batch_size=2)
+        assert_that([x.json() for x in mocker.request_history], equal_to([
+            [{'id': 1}, {'id': 2}], [{'id': 3}, {'id': 4}], [{'id': 5}]
+        ]))
+    assert_that([x.exists() for x in records], only_contains(False))
+
+
+def test_bulk_delete_failure_is_deletion_exception(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    records = make_records(person_object, 2, with_ids=True)
+    with requests_mock.Mocker() as mocker:
+        mocker.delete('http://mocked/custodian/data/bulk/person', json={'status': 'FAIL', 'error': {'msg': 'Failed'}})
+        assert_that(calling(client.records.bulk_delete).with_args(*records),
+                    raises(ObjectDeletionException, 'Failed'))
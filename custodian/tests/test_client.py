@@ -0,0 +1,32 @@
+import requests_mock
+from hamcrest import *
+
+from custodian.client import Client
+from custodian.command import Command, COMMAND_METHOD
+
+
+def test_client_reuses_pooled_session_for_commands():
+    client = Client(server_url='http://mocked/custodian', pool_size=4)
+    adapter = client._session.get_adapter('http://mocked/custodian')
+    assert_that(adapter._pool_maxsize, equal_to(4))
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/meta/person', json={'status': 'OK', 'data': {'name': 'person'}})
+        data, ok = client.execute(Command(name='meta/person', method=COMMAND_METHOD.GET))
+        assert_that(ok)
+        assert_that(data, has_entry('name', 'person'))
+        assert_that(mocker.call_count, equal_to(1))
+
+
+def test_client_prewarms_connections_on_construction():
+    with requests_mock.Mocker() as mocker:
+        mocker.head('http://mocked/custodian', status_code=200)
+        client = Client(server_url='http://mocked/custodian', pool_size=2, prewarm=2)
+        assert_that(mocker.call_count, equal_to(2))
+        client.close()
+
+
+def test_client_closes_its_session_when_used_as_context_manager():
+    closed = []
+    with Client(server_url='http://mocked/custodian') as client:
+        client._session.close = lambda: closed.append(True)
+    assert_that(closed, has_length(1))
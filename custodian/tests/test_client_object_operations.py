@@ -139,3 +139,42 @@ class TestCustodianIntegrationSeries:
         assert_that(client.objects.get('account'), instance_of(Object))
         client.objects.delete(account_object)
         assert_that(client.objects.get(account_object.name), is_(None))
+
+
+def _make_account_object_data(field_name: str) -> dict:
+    return {
+        'name': 'account_{}'.format(field_name), 'key': 'id', 'cas': False,
+        'fields': [
+            {'name': 'id', 'type': 'number', 'optional': True},
+            {'name': field_name, 'type': 'object', 'optional': False, 'linkMeta': 'person', 'linkType': 'inner'}
+        ]
+    }
+
+
+def test_related_fields_share_one_resolved_object(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        for field_name in ('owner', 'manager'):
+            mocker.get('http://mocked/custodian/meta/account_{}'.format(field_name),
+                       json={'status': 'OK', 'data': _make_account_object_data(field_name)})
+        mocker.get('http://mocked/custodian/meta/person', json={'status': 'OK', 'data': person_object.serialize()})
+        owner_field = client.objects.get('account_owner').fields['owner']
+        manager_field = client.objects.get('account_manager').fields['manager']
+        assert_that(owner_field.obj, same_instance(manager_field.obj))
+        assert_that(owner_field.obj.key, equal_to('id'))
+        assert_that(manager_field.obj.fields, has_key('name'))
+        assert_that(owner_field.obj.fields['name'].parent_obj, same_instance(owner_field.obj))
+        assert_that(mocker.call_count, equal_to(3))
+
+
+def test_references_are_resolved_with_single_request(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/meta/', json={
+            'status': 'OK', 'data': [person_object.serialize(), _make_account_object_data('owner')]
+        })
+        client.objects.warm_up()
+        account_object = client.objects.get_reference('account_owner')
+        assert_that(account_object.fields['owner'].obj.fields, has_key('name'))
+        assert_that(account_object.fields['owner'].obj.cas, is_(True))
+        assert_that(mocker.call_count, equal_to(1))
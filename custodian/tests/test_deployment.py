@@ -0,0 +1,50 @@
+import requests_mock
+from hamcrest import *
+
+from custodian.client import Client
+from custodian.objects import Object
+from custodian.objects.deployment import DeploymentScheduler
+from custodian.objects.fields import NumberField, RelatedObjectField, LINK_TYPES
+
+
+def _make_object(client: Client, name: str, *fields):
+    return Object(name=name, key='id', cas=False, objects_manager=client.objects,
+                  fields=[NumberField(name='id', optional=True)] + list(fields))
+
+
+def test_independent_objects_are_deployed_in_one_wave():
+    client = Client(server_url='http://mocked/custodian')
+    person_object = _make_object(client, 'person')
+    address_object = _make_object(client, 'address')
+    account_object = _make_object(
+        client, 'account', RelatedObjectField(name='person', obj=person_object, link_type=LINK_TYPES.INNER)
+    )
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/meta/', json={'status': 'OK', 'data': []})
+        plan = client.objects.plan([person_object, address_object, account_object])
+    waves = DeploymentScheduler(plan).get_waves()
+    assert_that([[x.obj.name for x in wave] for wave in waves], equal_to([['person', 'address'], ['account']]))
+
+
+def test_failures_are_reported_per_object():
+    client = Client(server_url='http://mocked/custodian')
+    person_object = _make_object(client, 'person')
+    address_object = _make_object(client, 'address')
+    account_object = _make_object(
+        client, 'account', RelatedObjectField(name='person', obj=person_object, link_type=LINK_TYPES.INNER)
+    )
+
+    def respond(request, context):
+        if request.json()['name'] == 'person':
+            return {'status': 'FAIL', 'error': {'msg': 'person failed'}}
+        return {'status': 'OK'}
+
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/meta/', json={'status': 'OK', 'data': []})
+        mocker.put('http://mocked/custodian/meta', json=respond)
+        report = client.objects.deploy([person_object, address_object, account_object], workers=4)
+    assert_that(report.ok, is_(False))
+    assert_that([x.obj.name for x in report.applied], equal_to(['address']))
+    assert_that(report.failed, has_key('person'))
+    assert_that(str(report.failed['person']), equal_to('person failed'))
+    assert_that([x.obj.name for x in report.skipped], equal_to(['account']))
@@ -0,0 +1,76 @@
+import requests_mock
+from hamcrest import *
+
+from custodian.client import Client
+from custodian.objects import Object
+from custodian.objects.fields import NumberField, StringField, RelatedObjectField, LINK_TYPES
+from custodian.objects.planner import MIGRATION_ACTION
+
+
+def _make_object(client: Client, name: str, *fields):
+    return Object(name=name, key='id', cas=False, objects_manager=client.objects,
+                  fields=[NumberField(name='id', optional=True)] + list(fields))
+
+
+def test_unchanged_objects_are_skipped(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    actual_person_data = person_object.serialize()
+    # reverse relation field maintained by the Custodian
+    actual_person_data['fields'].append({'name': 'account_set', 'type': 'array', 'optional': True,
+                                         'linkMeta': 'account', 'linkType': 'outer', 'outerLinkField': 'person'})
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/meta/', json={'status': 'OK', 'data': [actual_person_data]})
+        plan = client.objects.plan([person_object])
+        assert_that(plan.http_calls, equal_to(0))
+        assert_that(plan.unchanged, equal_to(['person']))
+
+
+def test_objects_are_created_after_objects_they_reference():
+    client = Client(server_url='http://mocked/custodian')
+    person_object = _make_object(client, 'person', StringField(name='name'))
+    account_object = _make_object(
+        client, 'account', RelatedObjectField(name='person', obj=person_object, link_type=LINK_TYPES.INNER)
+    )
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/meta/', json={'status': 'OK', 'data': []})
+        plan = client.objects.plan([account_object, person_object])
+        assert_that([(x.action, x.obj.name) for x in plan], equal_to([
+            (MIGRATION_ACTION.CREATE, 'person'),
+            (MIGRATION_ACTION.CREATE, 'account')
+        ]))
+        assert_that(plan.steps[1].dependencies, equal_to([plan.steps[0]]))
+        assert_that(plan.steps[1].obj.serialize()['fields'], has_length(2))
+
+
+def test_cyclic_references_are_added_with_update():
+    client = Client(server_url='http://mocked/custodian')
+    a_object = _make_object(client, 'a')
+    b_object = _make_object(client, 'b', RelatedObjectField(name='a', obj=a_object, link_type=LINK_TYPES.INNER))
+    a_object.fields['b'] = RelatedObjectField(name='b', obj=b_object, link_type=LINK_TYPES.INNER)
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/meta/', json={'status': 'OK', 'data': []})
+        plan = client.objects.plan([a_object, b_object])
+    assert_that([(x.action, x.obj.name) for x in plan], equal_to([
+        (MIGRATION_ACTION.CREATE, 'a'),
+        (MIGRATION_ACTION.CREATE, 'b'),
+        (MIGRATION_ACTION.UPDATE, 'a')
+    ]))
+    assert_that([x['name'] for x in plan.steps[0].obj.serialize()['fields']], equal_to(['id']))
+    assert_that(plan.steps[2].obj, same_instance(a_object))
+
+
+def test_plan_is_applied_with_exact_number_of_requests(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    person_object._objects_manager = client.objects
+    actual_person_data = person_object.serialize()
+    person_object.fields['last_name'] = StringField(name='last_name')
+    address_object = _make_object(client, 'address', StringField(name='street'))
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/meta/', json={'status': 'OK', 'data': [actual_person_data]})
+        mocker.put('http://mocked/custodian/meta', json={'status': 'OK'})
+        mocker.post('http://mocked/custodian/meta/person', json={'status': 'OK'})
+        plan = client.objects.plan([person_object, address_object])
+        assert_that(plan.http_calls, equal_to(2))
+        plan.apply()
+        assert_that([x.method for x in mocker.request_history], equal_to(['GET', 'PUT', 'POST']))
+        assert_that(mocker.request_history[2].json()['fields'], has_item(has_entry('name', 'last_name')))
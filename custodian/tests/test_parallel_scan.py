@@ -0,0 +1,79 @@
+import re
+from unittest import mock
+
+import requests_mock
+from hamcrest import *
+
+from custodian.client import Client
+from custodian.exceptions import QueryException
+from custodian.objects import Object
+from custodian.objects.fields import StringField
+from custodian.records.prefetch import RelatedRecordsPrefetcher
+
+RECORDS_DATA = [{'id': i, 'name': 'Person {:02d}'.format(i)} for i in range(1, 24)]
+
+
+def _respond(request, context):
+    # requests_mock lowercases query values
+    query_string = request.qs['q'][0]
+    records_data = RECORDS_DATA
+    for operator, value in re.findall(r'(ge|gt|lt|le)\(id,(\d+)\)', query_string):
+        value = int(value)
+        records_data = [x for x in records_data if {
+            'ge': x['id'] >= value, 'gt': x['id'] > value, 'lt': x['id'] < value, 'le': x['id'] <= value
+        }[operator]]
+    if 'sort(-id)' in query_string or 'sort(-name)' in query_string:
+        records_data = records_data[::-1]
+    offset, limit = map(int, re.search(r'limit\((\d+),(\d+)\)', query_string).groups())
+    return {'status': 'OK', 'data': records_data[offset:offset + limit]}
+
+
+def _scan(obj: Object, **kwargs):
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/data/bulk/person', json=_respond)
+        records = list(client.records.query(obj).parallel_scan(**kwargs))
+    return records, [x.qs['q'][0] for x in mocker.request_history]
+
+
+def test_parallel_scan_splits_key_ranges(person_object: Object):
+    records, queries = _scan(person_object, workers=3, chunk_size=4, ordered=True)
+    assert_that([x.id for x in records], equal_to(list(range(1, 24))))
+    assert_that(queries, has_items(
+        'sort(id),limit(0,1)', 'sort(-id),limit(0,1)',
+        'and(ge(id,1),lt(id,8)),sort(id),limit(0,4)', 'and(ge(id,1),lt(id,8),gt(id,4)),sort(id),limit(0,4)',
+        'and(ge(id,16),le(id,23)),sort(id),limit(0,4)'
+    ))
+
+
+def test_parallel_scan_bounds_retrieve_keys_only(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    query = client.records.query(person_object, depth=2).only('name').prefetch('address')
+    with requests_mock.Mocker() as mocker, mock.patch.object(RelatedRecordsPrefetcher, 'prefetch') as prefetch:
+        mocker.get('http://mocked/custodian/data/bulk/person', json=_respond)
+        records = list(query.parallel_scan(workers=3, chunk_size=4))
+    assert_that(records, has_length(23))
+    bound_requests = [
+        x for x in mocker.request_history if x.qs['q'][0] in ('sort(id),limit(0,1)', 'sort(-id),limit(0,1)')
+    ]
+    assert_that(bound_requests, has_length(2))
+    for request in bound_requests:
+        assert_that(request.qs, has_entries(only=['id'], depth=['1']))
+    assert_that(prefetch.call_count, equal_to(mocker.call_count - 2))
+
+
+def test_parallel_scan_unordered_yields_all_records(person_object: Object):
+    records, _ = _scan(person_object, workers=4, chunk_size=2)
+    assert_that(sorted(x.id for x in records), equal_to(list(range(1, 24))))
+
+
+def test_parallel_scan_splits_offsets_for_non_numeric_key(person_object: Object):
+    person_object.fields['id'] = StringField(name='id')
+    records, queries = _scan(person_object, workers=3, chunk_size=5, ordered=True)
+    assert_that([x.id for x in records], equal_to([str(x) for x in range(1, 24)]))
+    assert_that(queries, has_items('sort(id),limit(0,5)', 'sort(id),limit(5,5)', 'sort(id),limit(20,5)'))
+
+
+def test_parallel_scan_rejects_sliced_query(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    assert_that(calling(client.records.query(person_object)[0:10].parallel_scan), raises(QueryException))
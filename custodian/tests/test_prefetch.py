@@ -0,0 +1,94 @@
+import re
+
+import pytest
+import requests_mock
+from hamcrest import *
+
+from custodian.client import Client
+from custodian.exceptions import QueryException
+from custodian.objects import Object
+from custodian.objects.fields import IntegerField, StringField, RelatedObjectField, LINK_TYPES
+from custodian.objects.relations import RelationIndex
+
+PERSONS = [{'id': i, 'name': 'Person {}'.format(i), 'address': i % 3 + 1} for i in range(1, 11)]
+ADDRESSES = [{'id': i, 'street': 'Street {}'.format(i), 'owner': i, 'city': 1} for i in range(1, 4)]
+CITIES = [{'id': 1, 'name': 'Moscow'}]
+
+
+@pytest.fixture
+def objects(client: Client):
+    person = Object(name='person', key='id', cas=False, objects_manager=client.objects, fields=[
+        IntegerField(name='id'), StringField(name='name')
+    ])
+    city = Object(name='city', key='id', cas=False, objects_manager=client.objects, fields=[
+        IntegerField(name='id'), StringField(name='name')
+    ])
+    address = Object(name='address', key='id', cas=False, objects_manager=client.objects, fields=[
+        IntegerField(name='id'), StringField(name='street'),
+        RelatedObjectField(name='owner', obj=person, link_type=LINK_TYPES.INNER),
+        RelatedObjectField(name='city', obj=city, link_type=LINK_TYPES.INNER)
+    ])
+    person.fields['address'] = RelatedObjectField(name='address', obj=address, link_type=LINK_TYPES.INNER)
+    person.fields['owned_addresses'] = RelatedObjectField(
+        name='owned_addresses', obj=address, link_type=LINK_TYPES.OUTER, outer_link_field='owner', many=True,
+        optional=True
+    )
+    return person, address
+
+
+def _respond(records_data):
+    def respond(request, context):
+        match = re.search(r'in\((\w+),\(([\d,]+)\)\)', request.qs['q'][0])
+        if match is None:
+            return {'status': 'OK', 'data': records_data}
+        field_name, values = match.group(1), [int(x) for x in match.group(2).split(',')]
+        return {'status': 'OK', 'data': [x for x in records_data if x[field_name] in values]}
+
+    return respond
+
+
+@pytest.fixture
+def mocker():
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/data/bulk/person', json=_respond(PERSONS))
+        mocker.get('http://mocked/custodian/data/bulk/address', json=_respond(ADDRESSES))
+        mocker.get('http://mocked/custodian/data/bulk/city', json=_respond(CITIES))
+        yield mocker
+
+
+def test_prefetch_resolves_inner_links_with_bulk_requests(objects, mocker):
+    person, _ = objects
+    client = Client(server_url='http://mocked/custodian')
+    records = list(client.records.query(person).prefetch('address__city'))
+    assert_that(mocker.call_count, equal_to(3))
+    assert_that(mocker.request_history[1].qs['q'], equal_to(['in(id,(2,3,1))']))
+    assert_that([x.address.id for x in records], equal_to([x['address'] for x in PERSONS]))
+    assert_that(records[0].address, same_instance(records[3].address))
+    assert_that(records[0].address.city.name, equal_to('Moscow'))
+    assert_that(records[0].serialize(), has_entry('address', 2))
+
+
+def test_prefetch_groups_outer_links(objects, mocker):
+    person, _ = objects
+    client = Client(server_url='http://mocked/custodian')
+    records = list(client.records.query(person).prefetch('owned_addresses'))
+    assert_that(mocker.call_count, equal_to(2))
+    assert_that(mocker.last_request.qs['q'], equal_to(['in(owner,(1,2,3,4,5,6,7,8,9,10))']))
+    assert_that([x.id for x in records[0].owned_addresses], equal_to([1]))
+    assert_that(records[5].owned_addresses, equal_to([]))
+
+
+def test_prefetch_rejects_non_related_fields(objects, mocker):
+    person, _ = objects
+    client = Client(server_url='http://mocked/custodian')
+    assert_that(calling(list).with_args(client.records.query(person).prefetch('name')), raises(QueryException))
+
+
+def test_prefetch_uses_relation_index(objects, mocker, client: Client):
+    person, address = objects
+    client.objects.relation_index = RelationIndex([person, address])
+    # the outer link is resolved through the index rather than the field
+    person.fields['owned_addresses'].outer_link_field = None
+    records = list(Client(server_url='http://mocked/custodian').records.query(person).prefetch('owned_addresses'))
+    assert_that(mocker.last_request.qs['q'], equal_to(['in(owner,(1,2,3,4,5,6,7,8,9,10))']))
+    assert_that([x.id for x in records[0].owned_addresses], equal_to([1]))
@@ -45,7 +45,7 @@ def test_query(person_object: Object):
         .filter(address__city__name__eq='St. Petersburg')
     assert_that(
         query.to_string(),
-        equal_to('and(and(or(gt(age,18),lt(age,53)),eq(is_active,True)),eq(address.city.name,St. Petersburg))')
+        equal_to('and(or(gt(age,18),lt(age,53)),eq(is_active,True),eq(address.city.name,St. Petersburg))')
     )
 
 
@@ -86,3 +86,30 @@ def test_query_filter_operation_does_not_affect_existing_query(person_object: Ob
 def test_empty_query_with_limits_assembles_correct_expression(person_object: Object):
     base_query = Query(person_object, None)[:100]
     assert_that(base_query.to_string(), equal_to('limit(0,100)'))
+
+
+def test_q_is_immutable():
+    base = Q(age__gt=18)
+    combined = base & Q(is_active__eq=True)
+    inverted = ~base
+    assert_that(base.to_string(), equal_to('gt(age,18)'))
+    assert_that(combined.to_string(), equal_to('and(gt(age,18),eq(is_active,True))'))
+    assert_that(inverted.to_string(), equal_to('not(gt(age,18))'))
+    assert_that(~inverted, same_instance(base))
+
+
+def test_q_flattens_and_dedupes_operands():
+    queryset = (Q(age__gt=18) & Q(age__lt=53)) & (Q(age__gt=18) & (Q(name__eq='Ivan') | Q(name__eq='Petr')))
+    assert_that(queryset.to_string(), equal_to('and(gt(age,18),lt(age,53),or(eq(name,Ivan),eq(name,Petr)))'))
+    assert_that(Q(age__gt=18, age__lt=53).to_string(), equal_to('and(gt(age,18),lt(age,53))'))
+    assert_that((Q(age__gt=18) | Q(age__gt=18)).to_string(), equal_to('gt(age,18)'))
+
+
+def test_q_compiles_large_expressions_without_recursion():
+    queryset = Q(id__eq=0)
+    for i in range(1, 20000):
+        queryset = queryset | Q(id__eq=i)
+    query_string = queryset.to_string()
+    assert_that(query_string, starts_with('or(eq(id,0),eq(id,1),'))
+    assert_that(query_string.count('or('), equal_to(1))
+    assert_that(queryset.to_string(), same_instance(query_string))
@@ -0,0 +1,73 @@
+import requests_mock
+from hamcrest import *
+
+from custodian.client import Client
+from custodian.objects import Object
+from custodian.objects.fields import ArrayField
+from custodian.records.cache import QueryCache
+from custodian.records.model import Record
+
+
+def test_query_cache_evicts_least_recently_used_entries():
+    cache = QueryCache(max_entries=2)
+    cache.set(('person', 'a', ()), [1], 10)
+    cache.set(('person', 'b', ()), [2], 10)
+    assert_that(cache.get(('person', 'a', ())), equal_to([1]))
+    cache.set(('person', 'c', ()), [3], 10)
+    assert_that(cache.get(('person', 'b', ())), is_(None))
+    assert_that(cache.stats, has_entries(hits=1, misses=1, evictions=1, entries=2, size=20))
+
+
+def test_query_cache_respects_memory_cap_and_ttl():
+    cache = QueryCache(max_size=100)
+    cache.set(('person', 'a', ()), [1], 60)
+    cache.set(('person', 'b', ()), [2], 60)
+    assert_that(cache, has_length(1))
+    cache.set(('person', 'c', ()), [3], 101)
+    assert_that(cache.get(('person', 'c', ())), is_(None))
+    cache = QueryCache(ttl=0)
+    cache.set(('person', 'a', ()), [1], 10)
+    assert_that(cache.get(('person', 'a', ())), is_(None))
+
+
+def test_query_cache_skips_results_requested_before_invalidation():
+    cache = QueryCache()
+    generation = cache.get_generation('person')
+    cache.invalidate('person')
+    cache.set(('person', 'a', ()), [1], 10, generation=generation)
+    assert_that(cache, has_length(0))
+
+
+def test_records_manager_caches_queries_until_write(person_object: Object, person_record: Record):
+    client = Client(server_url='http://mocked/custodian')
+    client.records.cache = QueryCache()
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/data/bulk/person', json={
+            'status': 'OK', 'data': [person_record.serialize()]
+        })
+        mocker.post('http://mocked/custodian/data/single/person/1', json={
+            'status': 'OK', 'data': person_record.serialize()
+        })
+        query = client.records.query(person_object).filter(age__gt=18)
+        assert_that(list(query), has_length(1))
+        assert_that(list(client.records.query(person_object).filter(age__gt=18)), has_length(1))
+        assert_that(list(client.records.query(person_object, depth=2).filter(age__gt=18)), has_length(1))
+        assert_that(mocker.call_count, equal_to(2))
+        person_record.id = 1
+        client.records.update(person_record)
+        list(client.records.query(person_object).filter(age__gt=18))
+        assert_that(mocker.call_count, equal_to(4))
+    assert_that(client.records.cache.stats, has_entries(hits=1, misses=3, invalidations=2))
+
+
+def test_cached_results_are_not_shared_with_records(person_object: Object, person_record: Record):
+    client = Client(server_url='http://mocked/custodian')
+    client.records.cache = QueryCache()
+    person_object.fields['tags'] = ArrayField(name='tags', optional=True)
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/data/bulk/person', json={
+            'status': 'OK', 'data': [dict(person_record.serialize(), tags=['a'])]
+        })
+        list(client.records.query(person_object))[0].tags.append('b')
+        assert_that(list(client.records.query(person_object))[0].tags, equal_to(['a']))
+        assert_that(mocker.call_count, equal_to(1))
@@ -0,0 +1,59 @@
+import requests_mock
+from hamcrest import *
+
+from custodian.client import Client
+from custodian.objects import Object
+
+RECORDS_DATA = [{'id': i, 'name': 'Person {}'.format(i)} for i in range(1, 4)]
+
+
+def test_count_uses_total_count_reported_by_server(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/data/bulk/person', json={
+            'status': 'OK', 'data': RECORDS_DATA[:1], 'total_count': 42
+        })
+        query = client.records.query(person_object).filter(age__gt=18).order_by('name')
+        assert_that(query.count(), equal_to(42))
+        assert_that(query[40:50].count(), equal_to(2))
+    assert_that(mocker.last_request.qs['q'], equal_to(['gt(age,18),limit(0,1)']))
+
+
+def test_count_falls_back_to_raw_records(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/data/bulk/person', [
+            {'json': {'status': 'OK', 'data': RECORDS_DATA[:1]}},
+            {'json': {'status': 'OK', 'data': RECORDS_DATA}},
+        ])
+        assert_that(client.records.query(person_object).filter(age__gt=18).count(), equal_to(3))
+    assert_that(mocker.request_history[1].qs['q'], equal_to(['gt(age,18)']))
+
+
+def test_count_falls_back_to_raw_records_on_empty_response(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/data/bulk/person', [
+            {'status_code': 204},
+            {'json': {'status': 'OK', 'data': RECORDS_DATA}},
+        ])
+        assert_that(client.records.query(person_object).count(), equal_to(3))
+
+
+def test_exists_and_first_retrieve_single_record(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/data/bulk/person', json={'status': 'OK', 'data': RECORDS_DATA[:1]})
+        query = client.records.query(person_object).filter(age__gt=18)
+        assert_that(query.exists(), is_(True))
+        assert_that(mocker.last_request.qs['q'], equal_to(['gt(age,18),limit(0,1)']))
+        assert_that(query.first().id, equal_to(1))
+        assert_that(mocker.last_request.qs['q'], equal_to(['gt(age,18),sort(id),limit(0,1)']))
+        assert_that(query[5:10].first().id, equal_to(1))
+        assert_that(mocker.last_request.qs['q'], equal_to(['gt(age,18),sort(id),limit(5,1)']))
+        assert_that(query[5:5].exists(), is_(False))
+        assert_that(mocker.call_count, equal_to(3))
+
+        mocker.get('http://mocked/custodian/data/bulk/person', json={'status': 'OK', 'data': []})
+        assert_that(query.exists(), is_(False))
+        assert_that(query.first(), is_(None))
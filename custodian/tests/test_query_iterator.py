@@ -0,0 +1,104 @@
+import re
+
+import pytest
+import requests_mock
+from hamcrest import *
+
+from custodian.client import Client
+from custodian.exceptions import QueryException
+from custodian.objects import Object
+
+RECORDS_DATA = [{'id': i, 'name': 'Person {}'.format(i)} for i in range(1, 11)]
+
+
+def _respond_with_page(request, context):
+    offset, limit = map(int, re.search(r'limit\((\d+),(\d+)\)', request.qs['q'][0]).groups())
+    return {'status': 'OK', 'data': RECORDS_DATA[offset:offset + limit]}
+
+
+@pytest.fixture
+def mocker():
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/data/bulk/person', json=_respond_with_page)
+        yield mocker
+
+
+def test_iterator_walks_pages(person_object: Object, mocker):
+    client = Client(server_url='http://mocked/custodian')
+    records = list(client.records.query(person_object).filter(age__gt=18).iterator(chunk_size=4))
+    assert_that([x.id for x in records], equal_to(list(range(1, 11))))
+    assert_that([x.qs['q'][0] for x in mocker.request_history], equal_to([
+        'gt(age,18),sort(id),limit(0,4)', 'gt(age,18),sort(id),limit(4,4)', 'gt(age,18),sort(id),limit(8,4)'
+    ]))
+
+
+def test_iterator_keeps_ordering_and_slice(person_object: Object, mocker):
+    client = Client(server_url='http://mocked/custodian')
+    records = list(client.records.query(person_object).order_by('-name')[3:8].iterator(chunk_size=2))
+    assert_that([x.id for x in records], equal_to([4, 5, 6, 7, 8]))
+    assert_that([x.qs['q'][0] for x in mocker.request_history], equal_to([
+        'sort(-name),limit(3,2)', 'sort(-name),limit(5,2)', 'sort(-name),limit(7,1)'
+    ]))
+
+
+def test_iterator_requires_positive_chunk_size(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    assert_that(calling(client.records.query(person_object).iterator).with_args(chunk_size=0),
+                raises(QueryException))
+
+
+def test_keyset_iterator_seeks_by_key(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/data/bulk/person', [
+            {'json': {'status': 'OK', 'data': RECORDS_DATA[0:4]}},
+            {'json': {'status': 'OK', 'data': RECORDS_DATA[4:8]}},
+            {'json': {'status': 'OK', 'data': RECORDS_DATA[8:10]}},
+        ])
+        records = list(client.records.query(person_object).filter(age__gt=18).iterator(chunk_size=4, keyset=True))
+    assert_that([x.id for x in records], equal_to(list(range(1, 11))))
+    assert_that([x.qs['q'][0] for x in mocker.request_history], equal_to([
+        'gt(age,18),sort(id),limit(0,4)',
+        'and(gt(age,18),gt(id,4)),sort(id),limit(0,4)',
+        'and(gt(age,18),gt(id,8)),sort(id),limit(0,4)',
+    ]))
+
+
+def test_keyset_iterator_appends_key_to_orderings(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/data/bulk/person', [
+            {'json': {'status': 'OK', 'data': RECORDS_DATA[0:2]}},
+            {'json': {'status': 'OK', 'data': []}},
+        ])
+        records = list(client.records.query(person_object).order_by('-name').iterator(chunk_size=2, keyset=True))
+    assert_that(records, has_length(2))
+    # requests_mock lowercases query values
+    assert_that(mocker.request_history[1].qs['q'][0], equal_to(
+        'or(lt(name,person 2),and(eq(name,person 2),gt(id,2))),sort(-name, id),limit(0,2)'
+    ))
+
+
+def test_keyset_iterator_encodes_seek_values(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/data/bulk/person', [
+            {'json': {'status': 'OK', 'data': [
+                {'id': 1, 'name': 'Smith, John (Jr)', 'created_at': '2020-01-01T00:00:00+03:00'}
+            ]}},
+            {'json': {'status': 'OK', 'data': []}},
+        ])
+        query = client.records.query(person_object).order_by('name', 'created_at')
+        assert_that(list(query.iterator(chunk_size=1, keyset=True)), has_length(1))
+    assert_that(mocker.request_history[1].url, contains_string(
+        'gt(name,Smith%2C%20John%20%28Jr%29)'
+    ))
+    assert_that(mocker.request_history[1].url, contains_string(
+        'gt(created_at,2020-01-01T00%3A00%3A00%2B03%3A00)'
+    ))
+
+
+def test_keyset_iterator_requires_own_fields_ordering(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    query = client.records.query(person_object).order_by('address__city')
+    assert_that(calling(query.iterator).with_args(keyset=True), raises(QueryException))
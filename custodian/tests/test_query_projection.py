@@ -0,0 +1,42 @@
+import requests_mock
+from hamcrest import *
+
+from custodian.client import Client
+from custodian.exceptions import QueryException
+from custodian.objects import Object
+from custodian.records.model import Record
+
+
+def test_query_sends_projection_params(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/data/bulk/person', json={
+            'status': 'OK', 'data': [{'id': 1, 'name': 'Ivan'}]
+        })
+        records = list(client.records.query(person_object).only('name', 'address__city'))
+        assert_that(mocker.last_request.qs['only'], equal_to(['id', 'name', 'address.city']))
+        list(client.records.query(person_object).exclude('street'))
+        assert_that(mocker.last_request.qs['exclude'], equal_to(['street']))
+    assert_that(records[0].name, equal_to('Ivan'))
+    assert_that(calling(getattr).with_args(records[0], 'age'), raises(AttributeError, 'not loaded'))
+
+
+def test_partial_record_does_not_serialize_unloaded_fields(person_object: Object):
+    for lazy in (False, True):
+        record = Record.from_raw(person_object, {'id': 1, 'name': 'Ivan'}, lazy=lazy,
+                                 unloaded=frozenset(['age', 'street', 'is_active', 'created_at', 'cas']))
+        assert_that(record.serialize(), equal_to({'id': 1, 'name': 'Ivan'}))
+        record.age = 30
+        assert_that(record.serialize(), equal_to({'id': 1, 'name': 'Ivan', 'age': 30.0}))
+
+
+def test_get_with_projection(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/data/single/person/1', json={
+            'status': 'OK', 'data': {'id': 1, 'name': 'Ivan', 'age': 20}
+        })
+        record = client.records.get(person_object, 1, exclude=['street', 'is_active'])
+    assert_that(mocker.last_request.qs['exclude'], equal_to(['street', 'is_active']))
+    assert_that(record.serialize(), equal_to({'id': 1, 'name': 'Ivan', 'age': 20.0}))
+    assert_that(calling(client.records.get).with_args(person_object, 1, exclude=['id']), raises(QueryException))
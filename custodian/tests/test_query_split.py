@@ -0,0 +1,71 @@
+import re
+
+import requests_mock
+from hamcrest import *
+
+from custodian.client import Client
+from custodian.objects import Object
+
+RECORDS_DATA = [{'id': i, 'name': 'Person {}'.format(i), 'age': 20 + i % 4} for i in range(1, 13)]
+
+
+def respond(request, context):
+    """
+    Stands in for the Custodian: applies in(id,...), sort(...) and limit(...) of the query
+    """
+    query_string = request.qs['q'][0]
+    ids = re.search(r'in\(id,\(([^)]*)\)\)', query_string).group(1)
+    data = [x for x in RECORDS_DATA if str(x['id']) in ids.split(',')]
+    sorting = re.search(r'sort\(([^)]*)\)', query_string)
+    if sorting:
+        for ordering in reversed(sorting.group(1).split(', ')):
+            data.sort(key=lambda x: x[ordering.lstrip('-')], reverse=ordering.startswith('-'))
+    limit = re.search(r'limit\((\d+),(\d+)\)', query_string)
+    if limit:
+        offset, count = int(limit.group(1)), int(limit.group(2))
+        data = data[offset:offset + count]
+    return {'status': 'OK', 'data': data}
+
+
+def test_oversized_in_filter_is_split_into_chunks(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    client.records.max_in_size = 5
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/data/bulk/person', json=respond)
+        query = client.records.query(person_object).filter(id__in=list(range(1, 13)) + [1, 2], age__gt=18)
+        records = list(query)
+        assert_that(mocker.call_count, equal_to(3))
+        assert_that(
+            sorted(x.qs['q'][0] for x in mocker.request_history),
+            equal_to([
+                'and(gt(age,18),in(id,(1,2,3,4,5)))',
+                'and(gt(age,18),in(id,(11,12)))',
+                'and(gt(age,18),in(id,(6,7,8,9,10)))',
+            ])
+        )
+    assert_that([x.id for x in records], contains_inanyorder(*range(1, 13)))
+
+
+def test_split_results_keep_ordering_and_slice(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    client.records.max_in_size = 5
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/data/bulk/person', json=respond)
+        query = client.records.query(person_object).filter(id__in=list(range(1, 13))).order_by('-age', 'id')
+        expected = sorted(RECORDS_DATA, key=lambda x: (-x['age'], x['id']))
+        assert_that([x.id for x in query], equal_to([x['id'] for x in expected]))
+        assert_that([x.id for x in query[2:6]], equal_to([x['id'] for x in expected[2:6]]))
+        assert_that(mocker.last_request.qs['q'][0], ends_with('limit(0,6)'))
+        assert_that(query.first().id, equal_to(expected[0]['id']))
+        assert_that(query.count(), equal_to(12))
+        assert_that(query[10:20].count(), equal_to(2))
+        assert_that(query.exists(), is_(True))
+
+
+def test_in_filter_within_limit_is_sent_as_is(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/data/bulk/person', json=respond)
+        records = list(client.records.query(person_object).filter(id__in=list(range(1, 13))))
+        assert_that(mocker.call_count, equal_to(1))
+    assert_that(records, has_length(12))
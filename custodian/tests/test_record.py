@@ -0,0 +1,197 @@
+import copy
+import pickle
+from unittest import mock
+
+import requests_mock
+from hamcrest import *
+
+from custodian.client import Client
+from custodian.objects import Object
+from custodian.exceptions import FieldValidationException
+from custodian.objects.fields import StringField, IntegerField, ArrayField, ObjectField, DateField, \
+    RelatedObjectField, LINK_TYPES
+from custodian.records.model import Record, RecordClassFactory
+
+
+def test_record_is_instance_of_compiled_record_class(person_object: Object):
+    record = Record(obj=person_object, id=1, name='Ivan')
+    assert_that(record, instance_of(Record))
+    assert_that(type(record), same_instance(RecordClassFactory.get_record_class(person_object)))
+    assert_that(type(record).__name__, equal_to('PersonRecord'))
+    assert_that(hasattr(record, '__dict__'), is_(False))
+    assert_that(record.get_pk(), equal_to(1))
+    assert_that(record.age, is_(None))
+
+
+def test_record_class_is_compiled_again_when_fields_change(person_object: Object):
+    record_class = RecordClassFactory.get_record_class(person_object)
+    assert_that(RecordClassFactory.get_record_class(person_object), same_instance(record_class))
+    person_object.fields['last_name'] = StringField(name='last_name')
+    assert_that(RecordClassFactory.get_record_class(person_object), is_not(same_instance(record_class)))
+    assert_that(Record(obj=person_object, last_name='Petrov').last_name, equal_to('Petrov'))
+
+
+def test_records_manager_hydrates_compiled_record_class(person_object: Object, person_record: Record):
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/data/bulk/person', json={
+            'status': 'OK', 'data': [person_record.serialize(), person_record.serialize()]
+        })
+        records = list(client.records.query(person_object))
+    assert_that(records, has_length(2))
+    assert_that(records, only_contains(instance_of(RecordClassFactory.get_record_class(person_object))))
+
+
+def test_record_codec_converts_values(person_object: Object):
+    person_object.fields['tags'] = ArrayField(name='tags', optional=True)
+    person_object.fields['extra'] = ObjectField(name='extra', optional=True)
+    person_object.fields['birthday'] = DateField(name='birthday', optional=True)
+    record = Record(obj=person_object, id='1', name='Ivan', age=20, street='Street', is_active=False, tags=['a', 'b'],
+                    extra={'a': 1}, birthday='2000-01-31')
+    assert_that(record.id, equal_to(1))
+    assert_that(record.tags, equal_to(['a', 'b']))
+    assert_that(record.birthday.isoformat(), equal_to('2000-01-31'))
+    assert_that(record.serialize(), equal_to({
+        'id': 1, 'name': 'Ivan', 'age': 20.0, 'street': 'Street', 'is_active': False, 'tags': ['a', 'b'],
+        'extra': {'a': 1}, 'birthday': '2000-01-31'
+    }))
+
+
+def test_record_codec_validates_not_null_values(person_object: Object):
+    record = Record(obj=person_object, id=1)
+    assert_that(calling(record.serialize), raises(FieldValidationException, 'Null value in "name"'))
+
+
+def test_record_class_is_compiled_again_when_field_is_replaced(person_object: Object):
+    record_class = RecordClassFactory.get_record_class(person_object)
+    person_object.fields['name'] = IntegerField(name='name')
+    assert_that(RecordClassFactory.get_record_class(person_object), is_not(same_instance(record_class)))
+    record = Record(obj=person_object, id=1, name='5', age=20, street='Street', is_active=True)
+    assert_that(record.serialize(), has_entry('name', 5))
+
+
+def test_lazy_record_decodes_field_on_first_access(person_object: Object):
+    record = Record.from_raw(person_object, {'id': '1', 'name': 'Ivan', 'created_at': 'not a date'}, lazy=True)
+    with mock.patch.object(person_object.fields['id'], 'from_raw', return_value=1) as from_raw:
+        assert_that(record.id, equal_to(1))
+        assert_that(record.id, equal_to(1))
+    from_raw.assert_called_once_with('1')
+    assert_that(record.age, is_(None))
+    assert_that(calling(getattr).with_args(record, 'unknown'), raises(AttributeError))
+
+
+def test_lazy_record_serializes_untouched_raw_values(person_object: Object):
+    raw_data = {'id': 1, 'name': 'Ivan', 'age': 20, 'street': 'Street', 'is_active': True,
+                'created_at': '2018-03-01T12:30:00+03:00'}
+    record = Record.from_raw(person_object, raw_data, lazy=True)
+    record.name = 'Petr'
+    with mock.patch.object(person_object.fields['created_at'], 'from_raw') as from_raw:
+        assert_that(record.serialize(), equal_to(dict(raw_data, name='Petr')))
+    from_raw.assert_not_called()
+    assert_that(calling(Record.from_raw(person_object, {'id': 1}, lazy=True).serialize),
+                raises(FieldValidationException))
+
+
+def test_lazy_record_serializes_untouched_relation_fields_as_eager_one(client: Client):
+    person = Object(name='person', key='id', cas=False, objects_manager=client.objects, fields=[IntegerField(name='id'), StringField(name='name')])
+    address = Object(name='address', key='id', cas=False, objects_manager=client.objects, fields=[
+        IntegerField(name='id'), RelatedObjectField(name='owner', obj=person, link_type=LINK_TYPES.INNER)
+    ])
+    person.fields['addresses'] = RelatedObjectField(
+        name='addresses', obj=address, link_type=LINK_TYPES.OUTER, outer_link_field='owner', many=True,
+        optional=True
+    )
+    for obj, raw_data in [
+        (address, {'id': 1, 'owner': {'id': 5, 'name': 'Ivan'}}),
+        (address, {'id': 1, 'owner': '5'}),
+        (person, {'id': 5, 'name': 'Ivan', 'addresses': [1, 2]})
+    ]:
+        assert_that(
+            Record.from_raw(obj, raw_data, lazy=True).serialize(),
+            equal_to(Record.from_raw(obj, raw_data).serialize())
+        )
+    assert_that(Record.from_raw(address, {'id': 1, 'owner': {'id': 5}}, lazy=True).serialize(),
+                equal_to({'id': 1, 'owner': 5}))
+
+
+def test_query_hydration_mode(person_object: Object, person_record: Record):
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/data/bulk/person', json={
+            'status': 'OK', 'data': [person_record.serialize()]
+        })
+        record = client.records.query(person_object).lazy()[0]
+        assert_that(record._raw, is_not(None))
+        client.records.lazy = True
+        assert_that(client.records.query(person_object)[0]._raw, is_not(None))
+        assert_that(client.records.query(person_object).lazy(False)[0]._raw, is_(None))
+
+
+def test_records_can_be_pickled_and_copied():
+    obj = Object(name='person', key='id', cas=False, objects_manager=None, fields=[
+        IntegerField(name='id'), StringField(name='name'), DateField(name='birthday', optional=True)
+    ])
+    record = Record.from_raw(obj, {'id': 1, 'name': 'Ivan', 'birthday': '1990-05-01'})
+    record.name = 'Petr'
+    for restored in (pickle.loads(pickle.dumps(record)), copy.copy(record), copy.deepcopy(record)):
+        assert_that(type(restored).__name__, equal_to(type(record).__name__))
+        assert_that(restored.serialize(), equal_to(record.serialize()))
+        assert_that(restored.get_dirty_fields(), equal_to({'name'}))
+    constructed = Record(obj, id=2, name='Oleg')
+    assert_that(pickle.loads(pickle.dumps(constructed)).get_dirty_fields(), equal_to(set(obj.fields)))
+
+
+def test_copies_of_records_keep_related_records():
+    person = Object(name='person', key='id', cas=False, objects_manager=None, fields=[
+        IntegerField(name='id'), StringField(name='name'), ArrayField(name='tags', optional=True)
+    ])
+    address = Object(name='address', key='id', cas=False, objects_manager=None, fields=[
+        IntegerField(name='id'), RelatedObjectField(name='owner', obj=person, link_type=LINK_TYPES.INNER)
+    ])
+    person.fields['addresses'] = RelatedObjectField(
+        name='addresses', obj=address, link_type=LINK_TYPES.OUTER, outer_link_field='owner', many=True,
+        optional=True
+    )
+    owner = Record(person, id=1, name='Ivan', tags=['a'])
+    address_record = Record(address, id=2, owner=owner)
+    owner.addresses = [address_record]
+    for restored in (pickle.loads(pickle.dumps(address_record)), copy.deepcopy(address_record)):
+        assert_that(restored.owner, is_not(same_instance(owner)))
+        assert_that(restored.owner.name, equal_to('Ivan'))
+        assert_that(restored.owner.addresses[0], same_instance(restored))
+    assert_that(copy.deepcopy(owner).tags, is_not(same_instance(owner.tags)))
+    assert_that(copy.copy(owner).tags, same_instance(owner.tags))
+    assert_that(copy.copy(address_record).owner, same_instance(owner))
+
+    lazy_record = Record.from_raw(person, {'id': 1, 'name': 'Ivan', 'tags': ['a']}, lazy=True)
+    with mock.patch.object(person.fields['tags'], 'from_raw') as from_raw:
+        restored = copy.deepcopy(lazy_record)
+    from_raw.assert_not_called()
+    assert_that(restored.tags, equal_to(['a']))
+
+
+def test_records_of_retrieved_linked_objects_can_be_pickled():
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/meta/account', json={'status': 'OK', 'data': {
+            'name': 'account', 'key': 'id', 'cas': False, 'fields': [
+                {'name': 'id', 'type': 'number', 'optional': True},
+                {'name': 'owner', 'type': 'object', 'optional': False, 'linkMeta': 'person', 'linkType': 'inner'}
+            ]
+        }})
+        account_object = client.objects.get('account')
+    assert_that(account_object.fields['owner'].obj._evaluated, is_(False))
+    record = Record.from_raw(account_object, {'id': 1, 'owner': 5})
+    restored = pickle.loads(pickle.dumps(record))
+    assert_that(restored.serialize(), equal_to(record.serialize()))
+    assert_that(restored.obj.fields['owner'].obj.name, equal_to('person'))
+
+
+def test_records_of_projections_keep_unloaded_fields(person_object: Object):
+    record = Record.from_raw(
+        person_object, {'id': 1, 'name': 'Ivan', 'street': 'Street', 'is_active': True}, unloaded=frozenset({'age'})
+    )
+    restored = copy.deepcopy(record)
+    assert_that(restored.obj, same_instance(person_object))
+    assert_that(restored.serialize(), equal_to(record.serialize()))
+    assert_that(calling(getattr).with_args(restored, 'age'), raises(AttributeError, 'not loaded'))
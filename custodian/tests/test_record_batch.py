@@ -0,0 +1,60 @@
+import datetime
+
+import pytest
+import requests_mock
+from hamcrest import *
+
+from custodian.client import Client
+from custodian.objects import Object
+from custodian.records.batch import RecordBatch
+
+RECORDS_DATA = [
+    {'id': 1, 'name': 'Ivan', 'age': 20.5, 'is_active': True, 'created_at': '1970-01-01T03:00:01+03:00'},
+    {'id': 2, 'name': 'Petr', 'age': None, 'is_active': False, 'created_at': None},
+]
+
+
+def test_batch_keeps_typed_columns(person_object: Object):
+    batch = RecordBatch.from_records_data(person_object, RECORDS_DATA)
+    assert_that(batch, has_length(2))
+    assert_that(batch.column('id').typecode, equal_to('q'))
+    assert_that(list(batch['id']), equal_to([1, 2]))
+    assert_that(list(batch['age']), equal_to([20.5, 0]))
+    assert_that(batch.is_null('age', 1), is_(True))
+    assert_that(batch.is_null('age', 0), is_(False))
+    assert_that(list(batch['created_at']), equal_to([1000000, 0]))
+    assert_that(batch['name'], equal_to(['Ivan', 'Petr']))
+
+
+def test_batch_select_shares_columns(person_object: Object):
+    batch = RecordBatch.from_records_data(person_object, RECORDS_DATA)
+    selected = batch.select('id', 'age')
+    assert_that(selected.field_names, equal_to(['id', 'age']))
+    assert_that(selected['id'], same_instance(batch['id']))
+    assert_that(selected.is_null('age', 1), is_(True))
+
+
+def test_query_to_batch(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/data/bulk/person', json={'status': 'OK', 'data': RECORDS_DATA})
+        batch = client.records.query(person_object).filter(id__gt=0).to_batch('id', 'name')
+    assert_that(batch.field_names, equal_to(['id', 'name']))
+    assert_that(mocker.last_request.qs['q'], equal_to(['gt(id,0)']))
+
+
+def test_batch_to_numpy(person_object: Object):
+    numpy = pytest.importorskip('numpy')
+    batch = RecordBatch.from_records_data(person_object, RECORDS_DATA)
+    assert_that(batch.to_numpy('id').dtype, equal_to(numpy.dtype('int64')))
+    assert_that(batch.to_numpy('is_active').tolist(), equal_to([True, False]))
+    age = batch.to_numpy('age')
+    assert_that(age.mask.tolist(), equal_to([False, True]))
+    created_at = batch.to_numpy('created_at')
+    assert_that(created_at[0].item(), equal_to(datetime.datetime(1970, 1, 1, 0, 0, 1)))
+
+    structured = batch.to_numpy()
+    assert_that(structured.dtype.names, has_items('id', 'age', 'created_at', 'name'))
+    assert_that(numpy.isnan(structured['age'][1]), is_(True))
+    assert_that(numpy.isnat(structured['created_at'][1]), is_(True))
+    assert_that(structured['name'].tolist(), equal_to(['Ivan', 'Petr']))
@@ -0,0 +1,67 @@
+import requests_mock
+from hamcrest import *
+
+from custodian.client import Client
+from custodian.exceptions import FieldValidationException
+from custodian.objects import Object
+from custodian.records.model import Record
+
+RECORD_DATA = {'id': 1, 'name': 'Ivan', 'age': 20, 'cas': 3, 'street': 'Street', 'is_active': True}
+
+
+def test_received_record_tracks_changed_fields(person_object: Object):
+    record = Record.from_raw(person_object, RECORD_DATA)
+    assert_that(record.get_dirty_fields(), empty())
+    assert_that(record.serialize_changes(), equal_to({'id': 1, 'cas': 3}))
+    record.age = 21
+    record.created_at = None
+    assert_that(record.get_dirty_fields(), equal_to({'age', 'created_at'}))
+    assert_that(record.serialize_changes(), equal_to({'id': 1, 'cas': 3, 'age': 21, 'created_at': None}))
+    record.street = None
+    assert_that(calling(record.serialize_changes), raises(FieldValidationException))
+    record.street = 'Street'
+    record.mark_clean()
+    assert_that(record.serialize_changes(), equal_to({'id': 1, 'cas': 3}))
+
+
+def test_lazy_and_constructed_records(person_object: Object):
+    lazy_record = Record.from_raw(person_object, RECORD_DATA, lazy=True)
+    assert_that(lazy_record.name, equal_to('Ivan'))
+    assert_that(lazy_record.get_dirty_fields(), empty())
+    # changes of constructed records are not tracked, all values are sent
+    record = Record(person_object, **RECORD_DATA)
+    record.age = 21
+    assert_that(record.get_dirty_fields(), equal_to(set(person_object.fields)))
+    assert_that(record.serialize_changes(), equal_to(record.serialize()))
+
+
+def test_serialized_form_is_kept_until_change(person_object: Object):
+    record = Record.from_raw(person_object, {**RECORD_DATA, 'street': 'Nevsky'})
+    serialized = record.serialize()
+    assert_that(record._serialized, equal_to(serialized))
+    serialized['street'] = 'Liteyny'
+    assert_that(record.serialize(), has_entries(street='Nevsky'))
+    record.street = 'Liteyny'
+    assert_that(record._serialized, is_(None))
+    assert_that(record.serialize(), has_entries(street='Liteyny'))
+    record.mark_dirty('name')
+    assert_that(record.get_dirty_fields(), equal_to({'street', 'name'}))
+
+
+def test_update_sends_changed_fields_only(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    record = Record.from_raw(person_object, RECORD_DATA)
+    record.age = 21
+    with requests_mock.Mocker() as mocker:
+        mocker.post('http://mocked/custodian/data/single/person/1', json={
+            'status': 'OK', 'data': {**RECORD_DATA, 'age': 21, 'cas': 4}
+        })
+        client.records.update(record)
+        assert_that(mocker.last_request.json(), equal_to({'id': 1, 'cas': 3, 'age': 21}))
+        mocker.post('http://mocked/custodian/data/bulk/person', json={
+            'status': 'OK', 'data': [{**RECORD_DATA, 'age': 21, 'cas': 5}]
+        })
+        client.records.bulk_update(record)
+        assert_that(mocker.last_request.json(), equal_to([{'id': 1, 'cas': 4}]))
+    assert_that(record.cas, equal_to(5))
+    assert_that(record.get_dirty_fields(), empty())
@@ -0,0 +1,66 @@
+import threading
+
+import requests_mock
+from hamcrest import *
+
+from custodian.client import Client
+from custodian.objects import Object
+from custodian.records.loader import RecordLoader
+
+RECORDS_DATA = [{'id': i, 'name': 'Person {}'.format(i)} for i in range(1, 4)]
+
+
+def test_loader_batches_records_requested_within_scope(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    loader = RecordLoader(client.records)
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/data/bulk/person', json={'status': 'OK', 'data': RECORDS_DATA})
+        with loader.batch():
+            futures = [loader.load(person_object, x) for x in (1, 2, 2, '3', 4)]
+            assert_that(mocker.call_count, equal_to(0))
+        assert_that(mocker.call_count, equal_to(1))
+        assert_that(mocker.last_request.qs['q'], equal_to(['in(id,(1,2,3,4))']))
+    assert_that(futures[1], same_instance(futures[2]))
+    assert_that([x.result().id if x.result() else None for x in futures], equal_to([1, 2, 2, 3, None]))
+
+
+def test_waiting_within_scope_dispatches_pending_records(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    loader = RecordLoader(client.records)
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/data/bulk/person', json={'status': 'OK', 'data': RECORDS_DATA})
+        with loader.batch():
+            first = loader.load(person_object, 1)
+            assert_that(loader.load(person_object, 2).result().id, equal_to(2))
+            assert_that(first.done(), is_(True))
+        assert_that(mocker.call_count, equal_to(1))
+
+
+def test_manager_get_calls_are_batched_within_window(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    client.records.loader = RecordLoader(client.records, window=0.05)
+    results = {}
+
+    def get(record_id):
+        results[record_id] = client.records.get(person_object, record_id)
+
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/data/bulk/person', json={'status': 'OK', 'data': RECORDS_DATA})
+        threads = [threading.Thread(target=get, args=(x,)) for x in (1, 2, 3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert_that(mocker.call_count, equal_to(1))
+    assert_that({x: y.id for x, y in results.items()}, equal_to({1: 1, 2: 2, 3: 3}))
+
+
+def test_loader_propagates_errors_to_every_caller(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    loader = RecordLoader(client.records)
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/data/bulk/person', status_code=500)
+        with loader.batch():
+            futures = [loader.load(person_object, x) for x in (1, 2)]
+    for future in futures:
+        assert_that(calling(future.result), raises(Exception))
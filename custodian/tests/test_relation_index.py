@@ -0,0 +1,68 @@
+import requests_mock
+from hamcrest import *
+
+from custodian.client import Client
+from custodian.objects.fields import LINK_TYPES
+
+SCHEMA = [
+    {
+        'name': 'person', 'key': 'id', 'cas': False,
+        'fields': [
+            {'name': 'id', 'type': 'number', 'optional': True},
+            {'name': 'accounts', 'type': 'array', 'optional': True, 'linkMeta': 'account', 'linkType': 'outer',
+             'outerLinkField': 'owner'},
+            {'name': 'comment_set', 'type': 'generic', 'optional': True, 'linkMeta': 'comment', 'linkType': 'outer',
+             'outerLinkField': 'target'}
+        ]
+    },
+    {
+        'name': 'account', 'key': 'id', 'cas': False,
+        'fields': [
+            {'name': 'id', 'type': 'number', 'optional': True},
+            {'name': 'owner', 'type': 'object', 'optional': False, 'linkMeta': 'person', 'linkType': 'inner'}
+        ]
+    },
+    {
+        'name': 'comment', 'key': 'id', 'cas': False,
+        'fields': [
+            {'name': 'id', 'type': 'number', 'optional': True},
+            {'name': 'target', 'type': 'generic', 'optional': False, 'linkMetaList': ['person', 'account'],
+             'linkType': 'inner'}
+        ]
+    }
+]
+
+
+def test_relation_index_maps_inner_and_outer_links():
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/meta/', json={'status': 'OK', 'data': SCHEMA})
+        relation_index = client.objects.build_relation_index()
+        assert_that(mocker.call_count, equal_to(1))
+    assert_that(relation_index.get_reverse('account', 'owner').field_name, equal_to('accounts'))
+    assert_that(relation_index.get_reverse('person', 'accounts').field_name, equal_to('owner'))
+    assert_that(relation_index.get_reverse('comment', 'target').field_name, equal_to('comment_set'))
+    assert_that(relation_index.get_generic_targets('comment', 'target'), equal_to(['person', 'account']))
+    assert_that([x.field_name for x in relation_index.get_referencing_relations('person')],
+                equal_to(['owner', 'target']))
+    assert_that(relation_index.get('person', 'accounts').link_type, equal_to(LINK_TYPES.OUTER))
+
+
+def test_reverse_field_is_resolved_with_relation_index():
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/meta/', json={'status': 'OK', 'data': SCHEMA})
+        client.objects.build_relation_index()
+        owner_field = client.objects.get_reference('account').fields['owner']
+        assert_that(owner_field.reverse_field, same_instance(client.objects.get_reference('person').fields['accounts']))
+        assert_that(mocker.call_count, equal_to(1))
+
+
+def test_relation_index_is_dropped_on_schema_changes():
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/meta/', json={'status': 'OK', 'data': SCHEMA})
+        mocker.delete('http://mocked/custodian/meta/comment', json={'status': 'OK'})
+        client.objects.build_relation_index()
+        client.objects.delete(client.objects.get_reference('comment'))
+    assert_that(client.objects.relation_index, is_(None))
@@ -0,0 +1,62 @@
+import requests_mock
+from hamcrest import *
+
+from custodian.client import Client
+from custodian.objects import Object
+
+
+def test_object_definition_is_served_from_cache(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/meta/person', json={'status': 'OK', 'data': person_object.serialize()})
+        first = client.objects.get('person')
+        second = client.objects.get('person')
+        assert_that(mocker.call_count, equal_to(1))
+        assert_that(first, is_not(same_instance(second)))
+        assert_that(first.serialize(), equal_to(second.serialize()))
+        assert_that(client.objects.cache.stats, has_entries(hits=1, misses=1))
+
+
+def test_nonexistent_object_is_cached_too():
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/meta/person', json={'status': 'FAIL', 'error': {}})
+        assert_that(client.objects.get('person'), is_(None))
+        assert_that(client.objects.get('person'), is_(None))
+        assert_that(mocker.call_count, equal_to(1))
+
+
+def test_expired_definition_is_revalidated_with_etag(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    client.objects.cache.ttl = 0
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/meta/person', [
+            {'json': {'status': 'OK', 'data': person_object.serialize()}, 'headers': {'ETag': '"v1"'}},
+            {'status_code': 304, 'content': b''}
+        ])
+        client.objects.get('person')
+        obj = client.objects.get('person')
+        assert_that(mocker.request_history[1].headers['If-None-Match'], equal_to('"v1"'))
+        assert_that(obj.serialize(), equal_to(person_object.serialize()))
+        assert_that(client.objects.cache.stats, has_entries(hits=0, misses=2, revalidations=1))
+
+
+def test_object_update_invalidates_cached_definition(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    person_object._objects_manager = client.objects
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/meta/person', json={'status': 'OK', 'data': person_object.serialize()})
+        mocker.post('http://mocked/custodian/meta/person', json={'status': 'OK'})
+        client.objects.get('person')
+        client.objects.update(person_object)
+        client.objects.get('person')
+        assert_that([x.method for x in mocker.request_history], equal_to(['GET', 'POST', 'GET']))
+
+
+def test_list_of_objects_fills_cache(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/meta/', json={'status': 'OK', 'data': [person_object.serialize()]})
+        client.objects.get_all()
+        assert_that(client.objects.get('person'), instance_of(Object))
+        assert_that(mocker.call_count, equal_to(1))
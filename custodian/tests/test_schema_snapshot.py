@@ -0,0 +1,77 @@
+import json
+import os
+
+import requests_mock
+from hamcrest import *
+
+from custodian.client import Client
+from custodian.objects import Object
+from custodian.objects.fields import RelatedObjectField
+from custodian.objects.snapshot import SchemaSnapshot
+
+
+def _make_schema(person_object: Object):
+    return [
+        person_object.serialize(),
+        {
+            'name': 'account', 'key': 'id', 'cas': False,
+            'fields': [
+                {'name': 'id', 'type': 'number', 'optional': True},
+                {'name': 'person', 'type': 'object', 'optional': False, 'linkMeta': 'person', 'linkType': 'inner'}
+            ]
+        }
+    ]
+
+
+def test_schema_is_loaded_from_snapshot_without_requests(person_object: Object, tmpdir):
+    path = str(tmpdir.join('schema.json'))
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/meta/', json={'status': 'OK', 'data': _make_schema(person_object)})
+        Client(server_url='http://mocked/custodian').objects.save_snapshot(path)
+
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        assert_that(client.objects.load_snapshot(path, max_age=60))
+        account_object = client.objects.get('account')
+        assert_that(account_object.fields['person'], instance_of(RelatedObjectField))
+        assert_that(account_object.fields['person'].obj.serialize(), equal_to(person_object.serialize()))
+        assert_that(mocker.call_count, equal_to(0))
+
+
+def test_outdated_snapshot_is_not_loaded(person_object: Object, tmpdir):
+    path = str(tmpdir.join('schema.json'))
+    SchemaSnapshot(objects=_make_schema(person_object), created_at=0).dump(path)
+    client = Client(server_url='http://mocked/custodian')
+    assert_that(client.objects.load_snapshot(path, max_age=60), is_(False))
+    assert_that(client.objects.cache, has_length(0))
+
+
+def test_broken_snapshot_is_not_loaded(tmpdir):
+    path = str(tmpdir.join('schema.json'))
+    with open(path, 'w') as f:
+        json.dump({'version': 1, 'created_at': 0, 'fingerprint': 'abc', 'objects': []}, f)
+    client = Client(server_url='http://mocked/custodian')
+    assert_that(client.objects.load_snapshot(path), is_(False))
+    assert_that(client.objects.load_snapshot(os.path.join(str(tmpdir), 'missing.json')), is_(False))
+
+
+def test_snapshot_is_revalidated_with_etag(person_object: Object, tmpdir):
+    path = str(tmpdir.join('schema.json'))
+    SchemaSnapshot(objects=_make_schema(person_object), etag='"v1"').dump(path)
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/meta/', status_code=304, content=b'')
+        assert_that(client.objects.load_snapshot(path, revalidate=True))
+        assert_that(mocker.request_history[0].headers['If-None-Match'], equal_to('"v1"'))
+
+
+def test_changed_schema_replaces_snapshot_on_revalidation(person_object: Object, tmpdir):
+    path = str(tmpdir.join('schema.json'))
+    SchemaSnapshot(objects=_make_schema(person_object)[:1]).dump(path)
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://mocked/custodian/meta/', json={'status': 'OK', 'data': _make_schema(person_object)})
+        assert_that(client.objects.load_snapshot(path, revalidate=True), is_(False))
+        assert_that(client.objects.get('account'), instance_of(Object))
+        assert_that(SchemaSnapshot.load(path).objects, has_length(2))
+        assert_that(mocker.call_count, equal_to(1))
@@ -0,0 +1,148 @@
+import json
+
+import pytest
+import requests_mock
+from hamcrest import *
+
+from custodian.client import Client
+from custodian.exceptions import BulkOperationException, FieldValidationException
+from custodian.objects import Object
+from custodian.objects.fields import IntegerField, StringField, RelatedObjectField, LINK_TYPES
+from custodian.records.model import Record
+
+
+@pytest.fixture
+def address_object(person_object: Object):
+    return Object(name='address', key='id', cas=False, objects_manager=None, fields=[
+        IntegerField(name='id', optional=True), StringField(name='street'),
+        RelatedObjectField(name='person', obj=person_object, link_type=LINK_TYPES.INNER, optional=True)
+    ])
+
+
+def respond(request, context):
+    data = json.loads(request.body)
+    if request.method == 'PUT':
+        data = [{**x, 'id': 100 + i} for i, x in enumerate(data)]
+    return {'status': 'OK', 'data': data}
+
+
+def test_session_flushes_writes_in_dependency_order(person_object: Object, address_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    person = Record(person_object, name='Ivan', age=20, street='street', is_active=True)
+    address = Record(address_object, street='Nevsky', person=person)
+    first_update = Record(person_object, id=1, name='Petr', age=20, street='street', is_active=True)
+    second_update = Record(person_object, id=1, name='Petr', age=21, street='street', is_active=True)
+    deleted_person = Record(person_object, id=2, name='Oleg', age=20, street='street', is_active=True)
+    deleted_address = Record(address_object, id=3, street='Liteyny')
+    with requests_mock.Mocker() as mocker:
+        mocker.register_uri(requests_mock.ANY, requests_mock.ANY, json=respond)
+        with client.session() as session:
+            session.add(address)
+            session.create(person)
+            session.update(first_update)
+            session.update(second_update)
+            session.delete(deleted_person)
+            session.delete(deleted_address)
+            assert_that(session, has_length(5))
+            assert_that(mocker.call_count, equal_to(0))
+        history = [(x.method, x.path.rsplit('/', 1)[1], x.json()) for x in mocker.request_history]
+    assert_that([x[:2] for x in history], equal_to([
+        ('PUT', 'person'), ('POST', 'person'), ('PUT', 'address'), ('DELETE', 'address'), ('DELETE', 'person')
+    ]))
+    assert_that(history[1][2], equal_to([second_update.serialize()]))
+    assert_that(history[2][2][0], has_entries(person=100))
+    assert_that(address.id, equal_to(100))
+
+
+def test_session_flushes_on_threshold_and_discards_writes_on_error(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    records = [Record(person_object, name='Ivan', age=20, street='street', is_active=True) for _ in range(3)]
+    with requests_mock.Mocker() as mocker:
+        mocker.put('http://mocked/custodian/data/bulk/person', json=respond)
+        with pytest.raises(ValueError):
+            with client.session(flush_threshold=2) as session:
+                for record in records:
+                    session.create(record)
+                raise ValueError
+        assert_that(mocker.call_count, equal_to(1))
+        assert_that(mocker.last_request.json(), has_length(2))
+    assert_that(session, has_length(1))
+
+
+def test_session_keeps_writes_pending_after_failed_flush(person_object: Object, address_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    person = Record(person_object, name='Ivan', age=20, street='street', is_active=True)
+    address = Record(address_object, street='Nevsky', person=person)
+    updated_person = Record(person_object, id=1, name='Petr', age=20, street='street', is_active=True)
+    session = client.session()
+    session.create(person)
+    session.create(address)
+    session.update(updated_person)
+    with requests_mock.Mocker() as mocker:
+        mocker.put('http://mocked/custodian/data/bulk/person', json=respond)
+        mocker.post('http://mocked/custodian/data/bulk/person', json={'status': 'FAIL', 'error': {'msg': 'Failed'}})
+        with pytest.raises(BulkOperationException):
+            session.flush()
+        assert_that(mocker.call_count, equal_to(2))
+    assert_that(session, has_length(2))
+    with requests_mock.Mocker() as mocker:
+        mocker.register_uri(requests_mock.ANY, requests_mock.ANY, json=respond)
+        session.flush()
+        history = [(x.method, x.path.rsplit('/', 1)[1], x.json()) for x in mocker.request_history]
+    assert_that([x[:2] for x in history], equal_to([('POST', 'person'), ('PUT', 'address')]))
+    assert_that(history[1][2][0], has_entries(person=100))
+    assert_that(session, has_length(0))
+
+
+def test_session_does_not_create_records_again_after_failed_flush(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    records = [Record(person_object, name=x, age=20, street='street', is_active=True) for x in ('a', 'b', None)]
+    session = client.session(batch_size=1)
+    for record in records:
+        session.create(record)
+    with requests_mock.Mocker() as mocker:
+        mocker.put('http://mocked/custodian/data/bulk/person', [
+            {'json': respond},
+            {'json': {'status': 'OK', 'data': 'unexpected'}},
+            {'json': respond},
+            {'json': respond}
+        ])
+        with pytest.raises(FieldValidationException):
+            session.flush()
+        assert_that(mocker.call_count, equal_to(0))
+        assert_that(session, has_length(3))
+        records[2].name = 'c'
+        with pytest.raises(BulkOperationException):
+            session.flush()
+        assert_that(session, has_length(1))
+        session.flush()
+        assert_that(mocker.call_count, equal_to(4))
+        assert_that([x.json()[0]['name'] for x in mocker.request_history], equal_to(['a', 'b', 'c', 'b']))
+    assert_that(session, has_length(0))
+
+
+def test_session_merges_changes_of_record_instances(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    first_instance, second_instance = [
+        Record(person_object, id=1, name='Ivan', age=20, street='street', is_active=True) for _ in range(2)
+    ]
+    first_instance.mark_clean()
+    second_instance.mark_clean()
+    with requests_mock.Mocker() as mocker:
+        mocker.post('http://mocked/custodian/data/bulk/person', json=respond)
+        with client.session() as session:
+            first_instance.name = 'Petr'
+            session.update(first_instance)
+            second_instance.age = 21
+            session.update(second_instance)
+        assert_that(mocker.last_request.json(), equal_to([{'id': 1, 'name': 'Petr', 'age': 21}]))
+
+
+def test_session_cancels_creation_of_deleted_record(person_object: Object):
+    client = Client(server_url='http://mocked/custodian')
+    with requests_mock.Mocker() as mocker:
+        with client.session() as session:
+            record = Record(person_object, name='Ivan', age=20, street='street', is_active=True)
+            session.create(record)
+            session.delete(record)
+        assert_that(mocker.call_count, equal_to(0))
@@ -0,0 +1,60 @@
+import datetime
+from unittest import mock
+
+from hamcrest import *
+
+from custodian.objects.fields import DateTimeField, DateField, TimeField, TIMEZONE_POLICY
+from custodian.objects.temporal import ISO8601Parser
+
+
+def test_parser_parses_rfc3339_datetime():
+    value = ISO8601Parser.parse_datetime('2018-03-01T12:30:15.123+03:00')
+    assert_that(value, equal_to(datetime.datetime(
+        2018, 3, 1, 12, 30, 15, 123000, datetime.timezone(datetime.timedelta(hours=3))
+    )))
+    assert_that(ISO8601Parser.parse_datetime('2018-03-01T12:30:15Z').tzinfo, is_(datetime.timezone.utc))
+    assert_that(ISO8601Parser.parse_datetime('2018-03-01 12:30').tzinfo, is_(None))
+
+
+def test_parser_returns_none_for_non_conforming_input():
+    assert_that(ISO8601Parser.parse_datetime('1 March 2018'), is_(None))
+    assert_that(ISO8601Parser.parse_datetime('2018-02-30T12:30:00Z'), is_(None))
+    assert_that(ISO8601Parser.parse_date('2018-03-01T12:30:00Z'), is_(None))
+    assert_that(ISO8601Parser.parse_time('25:00'), is_(None))
+
+
+def test_datetime_field_does_not_call_dateparser_for_rfc3339_values():
+    with mock.patch('custodian.objects.fields.dateparser.parse') as parse:
+        value = DateTimeField(name='created_at').from_raw('2018-03-01T12:30:00.123456789-05:30')
+    parse.assert_not_called()
+    assert_that(value.microsecond, equal_to(123456))
+    assert_that(value.utcoffset(), equal_to(-datetime.timedelta(hours=5, minutes=30)))
+
+
+def test_datetime_field_falls_back_to_dateparser():
+    value = DateTimeField(name='created_at').from_raw('1 March 2018 12:30')
+    assert_that(value, equal_to(datetime.datetime(2018, 3, 1, 12, 30)))
+
+
+def test_datetime_field_timezone_policy():
+    raw_value = '2018-03-01T12:30:00+03:00'
+    assert_that(
+        DateTimeField(name='created_at', timezone_policy=TIMEZONE_POLICY.UTC).from_raw(raw_value),
+        equal_to(datetime.datetime(2018, 3, 1, 9, 30, tzinfo=datetime.timezone.utc))
+    )
+    naive_value = DateTimeField(name='created_at', timezone_policy=TIMEZONE_POLICY.NAIVE).from_raw(raw_value)
+    assert_that(naive_value, equal_to(datetime.datetime(2018, 3, 1, 9, 30)))
+    assert_that(
+        DateTimeField(name='created_at', timezone_policy=TIMEZONE_POLICY.UTC).from_raw('2018-03-01T12:30:00').tzinfo,
+        is_(datetime.timezone.utc)
+    )
+
+
+def test_date_and_time_fields_decode_their_types():
+    assert_that(DateField(name='birthday').from_raw('2018-03-01'), equal_to(datetime.date(2018, 3, 1)))
+    assert_that(DateField(name='birthday').from_raw('2018-03-01T00:00:00Z'), equal_to(datetime.date(2018, 3, 1)))
+    assert_that(TimeField(name='opens_at').from_raw('09:15:00'), equal_to(datetime.time(9, 15)))
+    assert_that(
+        TimeField(name='opens_at', timezone_policy=TIMEZONE_POLICY.UTC).from_raw('09:15:00+03:00'),
+        equal_to(datetime.time(6, 15, tzinfo=datetime.timezone.utc))
+    )